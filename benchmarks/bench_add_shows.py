@@ -0,0 +1,101 @@
+"""Per-show cost of adding shows to the database, one by one vs. in bulk.
+
+Usage: python benchmarks/bench_add_shows.py [--shows 10000] [--artists 200]
+"""
+
+import argparse
+import datetime
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from concert_checker.app.crud import (
+    bulk_upsert_shows,
+    get_or_create_artist,
+    get_or_create_concert,
+    get_or_create_venue,
+)
+from concert_checker.app.migrations import init_db
+from concert_checker.app.schemas import ArtistCreate, ConcertCreate, VenueCreate
+from concert_checker.common.dataclasses import ArtistShows, ShowDetails
+
+
+def make_shows(n_shows: int, n_artists: int) -> list[ArtistShows]:
+    start = datetime.date(2026, 1, 1)
+    per_artist = n_shows // n_artists
+    return [
+        ArtistShows(
+            artist_name=f"Artist {a}",
+            shows=[
+                ShowDetails(
+                    date=start + datetime.timedelta(days=s),
+                    city=f"City {s % 50}",
+                    state=None,
+                    country="France",
+                    country_code="FR",
+                    venue=f"Venue {s % 100}",
+                    source_url=f"https://artist{a}.com/tour",
+                )
+                for s in range(per_artist)
+            ],
+        )
+        for a in range(n_artists)
+    ]
+
+
+def add_one_by_one(db: Session, artist_shows: list[ArtistShows]):
+    """The previous implementation of `add_shows_to_db`."""
+    for artist_show in artist_shows:
+        artist = get_or_create_artist(db, ArtistCreate(name=artist_show.artist_name))
+        for show in artist_show.shows:
+            venue = get_or_create_venue(
+                db, VenueCreate(name=show.venue, city=show.city, country=show.country)
+            )
+            _ = get_or_create_concert(
+                db,
+                ConcertCreate(
+                    date=show.date,
+                    artist_id=artist.id,
+                    venue_id=venue.id,
+                    source_url=show.source_url,
+                    city=show.city,
+                    country=show.country,
+                ),
+            )
+
+
+def bench(name: str, add, artist_shows: list[ArtistShows], n_shows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'concerts.db'}")
+        init_db(engine)
+        for run in ("cold", "warm"):  # warm: every show already exists
+            with Session(engine) as db:
+                start = time.perf_counter()
+                add(db, artist_shows)
+                db.commit()
+                elapsed = time.perf_counter() - start
+            print(
+                f"{name:>12} {run}: {elapsed:8.3f} s total, "
+                f"{elapsed / n_shows * 1e6:8.1f} µs/show"
+            )
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--shows", type=int, default=10_000)
+    _ = parser.add_argument("--artists", type=int, default=200)
+    args = parser.parse_args()
+
+    artist_shows = make_shows(args.shows, args.artists)
+    n_shows = sum(len(a.shows) for a in artist_shows)
+    print(f"{n_shows} shows, {args.artists} artists")
+    bench("one by one", add_one_by_one, artist_shows, n_shows)
+    bench("bulk", bulk_upsert_shows, artist_shows, n_shows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Latency of `search_artists_by_name` with 100k artists.
+
+Usage: python benchmarks/bench_artist_search.py [--artists 100000]
+"""
+
+import argparse
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from concert_checker.app.crud import search_artists_by_name
+from concert_checker.app.migrations import init_db
+from concert_checker.app.models import Artist
+from concert_checker.common.utils import normalize_artist_name
+
+QUERIES = {
+    "exact": "The Xylophones",
+    "substring": "ylophon",
+    "accents": "THE XYLÓPHONES",
+    "typo": "xylofones",
+    "short": "xy",
+}
+
+
+def random_name(rng: random.Random) -> str:
+    words = rng.randint(1, 3)
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))).title()
+        for _ in range(words)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--artists", type=int, default=100_000)
+    _ = parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = {random_name(rng) for _ in range(args.artists)} | {"The Xylophones"}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'concerts.db'}")
+        init_db(engine)
+        with engine.begin() as conn:
+            _ = conn.exec_driver_sql(
+                "INSERT INTO artists (name, search_name) VALUES (?, ?)",
+                [(name, normalize_artist_name(name)) for name in names],
+            )
+
+        print(f"{len(names)} artists")
+        with Session(engine) as db:
+            for label, query in QUERIES.items():
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    results = search_artists_by_name(db, query)
+                    db.expunge_all()
+                elapsed = (time.perf_counter() - start) / args.repeat
+                top = results[0].name if results else None
+                print(
+                    f"{label:>10} {query!r:>18}: {elapsed * 1e3:7.3f} ms, top={top!r}"
+                )
+
+            # The previous implementation, for reference.
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                _ = db.query(Artist).filter(Artist.name.ilike("%ylophon%")).all()
+                db.expunge_all()
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f"{'ilike':>10} {'ylophon'!r:>18}: {elapsed * 1e3:7.3f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Tokens saved by the pruning of page content, and recall of shows, on labelled pages.
+
+A show is recalled if all its labelled parts (date, venue) are still in the pruned
+content; links are the links to tour pages or tickets that must be kept as well.
+Recall must stay at 100%.
+
+Usage: python benchmarks/bench_content_pruning.py [--budget 3000] [-v]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from concert_checker.common.constants import PAGE_CONTENT_TOKEN_BUDGET
+from concert_checker.common.content_pruning import prune_page_content
+
+PAGES = Path(__file__).parent.parent / "tests" / "fixtures" / "pages" / "pruning"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--pages", type=Path, default=PAGES)
+    _ = parser.add_argument("--budget", type=int, default=PAGE_CONTENT_TOKEN_BUDGET)
+    _ = parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    labels = json.loads((args.pages / "labels.json").read_text())
+    original_tokens = pruned_tokens = shows = recalled = 0
+    elapsed = 0.0
+    for name, label in labels.items():
+        content = (args.pages / name).read_text()
+        start = time.perf_counter()
+        pruned = prune_page_content(content, label["url"], token_budget=args.budget)
+        elapsed += time.perf_counter() - start
+
+        missed_shows = [
+            " @ ".join(show)
+            for show in label["shows"]
+            if not all(part in pruned.text for part in show)
+        ]
+        missed = missed_shows + [
+            link for link in label["links"] if link not in pruned.text
+        ]
+        original_tokens += pruned.original_tokens
+        pruned_tokens += pruned.tokens
+        shows += len(label["shows"])
+        recalled += len(label["shows"]) - len(missed_shows)
+        mark = "!" if missed else " "
+        print(
+            f"{mark} {Path(name).stem:<24} {pruned.original_tokens:6} -> "
+            f"{pruned.tokens:5} tokens ({pruned.tokens / pruned.original_tokens:.0%})"
+            f"  {len(label['shows'])} shows"
+        )
+        for item in missed:
+            print(f"    missed: {item}")
+        if args.verbose:
+            print(pruned.text, end="\n\n")
+
+    print(
+        f"{len(labels)} pages: {original_tokens} -> {pruned_tokens} tokens "
+        f"({1 - pruned_tokens / original_tokens:.1%} saved), "
+        f"show recall {recalled / max(shows, 1):.1%} ({recalled}/{shows})"
+    )
+    print(f"{elapsed / len(labels) * 1e6:.0f} µs per page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Precision/recall of the email pre-classifier on the labelled fixture corpora.
+
+"Positive" means "announces shows" (the email is sent to the model). Recall is the
+share of show emails that are kept, and must stay at 100%; "model calls saved" is the
+share of all emails that are dropped.
+
+The weights were tuned on `corpus.jsonl`, so its figures are optimistic. The emails of
+`heldout.jsonl` were labelled without looking at the weights: their figures are the
+ones to expect on a real inbox.
+
+Usage: python benchmarks/bench_email_classifier.py [--corpus tests/fixtures/emails/corpus.jsonl ...] [-v]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from concert_checker.common.dataclasses import EmailContent
+from concert_checker.common.email_classifier import classify_email
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures" / "emails"
+CORPORA = [FIXTURES / "corpus.jsonl", FIXTURES / "heldout.jsonl"]
+
+
+def load_corpus(path: Path) -> list[tuple[str, str, EmailContent]]:
+    """Return `(id, label, email)` for each email of the corpus."""
+    corpus: list[tuple[str, str, EmailContent]] = []
+    for line in path.read_text().splitlines():
+        entry = json.loads(line)
+        email = EmailContent(
+            subject=entry["subject"],
+            from_addr=entry["from_addr"],
+            to_addr="",
+            date="",
+            body=entry["body"],
+        )
+        corpus.append((entry["id"], entry["label"], email))
+    return corpus
+
+
+def evaluate(path: Path, verbose: bool):
+    """Print the precision/recall of the classifier on the corpus at `path`."""
+    print(f"== {path.name}")
+    corpus = load_corpus(path)
+    true_positives = false_positives = false_negatives = true_negatives = 0
+    start = time.perf_counter()
+    classifications = [classify_email(email) for _, _, email in corpus]
+    elapsed = (time.perf_counter() - start) / len(corpus)
+
+    for (email_id, label, _), classification in zip(
+        corpus, classifications, strict=True
+    ):
+        is_show = label == "show"
+        if classification.is_show and is_show:
+            true_positives += 1
+        elif classification.is_show:
+            false_positives += 1
+        elif is_show:
+            false_negatives += 1
+        else:
+            true_negatives += 1
+        if verbose or classification.is_show != is_show:
+            mark = " " if classification.is_show == is_show else "!"
+            print(
+                f"{mark} {label:>5} {email_id:<28} {classification.score:6.1f}  "
+                f"{', '.join(classification.reasons)}"
+            )
+
+    precision = true_positives / max(true_positives + false_positives, 1)
+    recall = true_positives / max(true_positives + false_negatives, 1)
+    dropped = true_negatives + false_negatives
+    print(
+        f"{len(corpus)} emails ({true_positives + false_negatives} shows): "
+        f"precision {precision:.1%}, recall {recall:.1%}"
+    )
+    print(
+        f"model calls saved: {dropped / len(corpus):.1%} of all emails, "
+        f"{true_negatives / max(true_negatives + false_positives, 1):.1%} "
+        "of non-show emails"
+    )
+    print(f"{elapsed * 1e6:.0f} µs per email")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--corpus", type=Path, nargs="+", default=CORPORA)
+    _ = parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    for path in args.corpus:
+        evaluate(path, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Latency of the `get_or_create_*` lookups as the concerts table grows.
+
+Compares the indexed schema with the same tables without their indexes.
+
+Usage: python benchmarks/bench_lookups.py [--sizes 1000 10000 100000 1000000]
+"""
+
+import argparse
+import datetime
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from concert_checker.app.crud import (
+    get_or_create_artist,
+    get_or_create_concert,
+    get_or_create_venue,
+)
+from concert_checker.app.migrations import init_db
+from concert_checker.app.schemas import ArtistCreate, ConcertCreate, VenueCreate
+
+CONCERTS_PER_ARTIST = 100
+LOOKUPS = 200
+
+
+def populate(engine, n_concerts: int):
+    n_artists = max(n_concerts // CONCERTS_PER_ARTIST, 1)
+    start = datetime.date(2000, 1, 1)
+    with engine.begin() as conn:
+        _ = conn.exec_driver_sql(
+            "INSERT INTO artists (id, name) VALUES (?, ?)",
+            [(a, f"Artist {a}") for a in range(1, n_artists + 1)],
+        )
+        _ = conn.exec_driver_sql(
+            "INSERT INTO venues (id, name, city) VALUES (?, ?, ?)",
+            [(v, f"Venue {v}", f"City {v % 500}") for v in range(1, n_artists + 1)],
+        )
+        _ = conn.exec_driver_sql(
+            "INSERT INTO concerts (date, city, source_url, artist_id, venue_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    (start + datetime.timedelta(days=c)).isoformat(),
+                    "Paris",
+                    "https://example.com",
+                    a,
+                    a,
+                )
+                for a in range(1, n_artists + 1)
+                for c in range(CONCERTS_PER_ARTIST)
+            ],
+        )
+    return n_artists
+
+
+def time_lookups(engine, n_artists: int) -> dict[str, float]:
+    rng = random.Random(0)
+    artists = [rng.randint(1, n_artists) for _ in range(LOOKUPS)]
+    days = [rng.randrange(CONCERTS_PER_ARTIST) for _ in range(LOOKUPS)]
+    start = datetime.date(2000, 1, 1)
+    lookups = {
+        "artist": lambda db, a, _: get_or_create_artist(
+            db, ArtistCreate(name=f"Artist {a}")
+        ),
+        "venue": lambda db, a, _: get_or_create_venue(
+            db, VenueCreate(name=f"Venue {a}", city=f"City {a % 500}")
+        ),
+        "concert": lambda db, a, d: get_or_create_concert(
+            db,
+            ConcertCreate(
+                date=start + datetime.timedelta(days=d),
+                artist_id=a,
+                city="Paris",
+                source_url="https://example.com",
+            ),
+        ),
+    }
+    timings = {}
+    with Session(engine) as db:
+        for name, lookup in lookups.items():
+            begin = time.perf_counter()
+            for a, d in zip(artists, days, strict=True):
+                _ = lookup(db, a, d)
+                db.expunge_all()
+            timings[name] = (time.perf_counter() - begin) / LOOKUPS * 1e6
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    _ = parser.add_argument("--no-unindexed", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'concerts':>9} {'schema':>10}  µs/lookup: artist    venue  concert")
+    for size in args.sizes:
+        for indexed in (True, False) if not args.no_unindexed else (True,):
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = create_engine(f"sqlite:///{Path(tmp) / 'concerts.db'}")
+                init_db(engine)
+                if not indexed:
+                    with engine.begin() as conn:
+                        for index in (
+                            "ix_artists_name",
+                            "ix_venues_name_city",
+                            "ix_concerts_artist_id_date",
+                        ):
+                            _ = conn.execute(text(f"DROP INDEX {index}"))
+                n_artists = populate(engine, size)
+                timings = time_lookups(engine, n_artists)
+                engine.dispose()
+            print(
+                f"{size:>9} {'indexed' if indexed else 'unindexed':>10}  "
+                f"{timings['artist']:16.1f} {timings['venue']:8.1f} "
+                f"{timings['concert']:8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
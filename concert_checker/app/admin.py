@@ -1,66 +1,122 @@
+import datetime
+import hashlib
 import os
+from collections.abc import Iterator
+from html import escape
+from itertools import batched
 
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from sqladmin import Admin, ModelView
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-
-from concert_checker.app.database import Base, SessionLocal, engine
+from sqlalchemy import Select
+from sqlalchemy.engine import Row
+
+from concert_checker.app.api import decode_cursor, encode_cursor
+from concert_checker.app.api import router as api_router
+from concert_checker.app.async_crud import get_concerts_version, list_concerts
+from concert_checker.app.crud import artist_search_filter
+from concert_checker.app.database import AsyncSessionLocal, engine
+from concert_checker.app.migrations import init_db
 from concert_checker.app.models import Artist, Concert, PageCache, Venue
 
-Base.metadata.create_all(bind=engine)
+init_db()
 
 app = FastAPI()
+app.include_router(api_router)
 admin = Admin(app, engine)
 
 
-@app.get("/", response_class=HTMLResponse)
-def landing_page() -> str:
-    with SessionLocal() as db:
-        artists = db.scalars(
-            select(Artist)
-            .options(selectinload(Artist.concerts).selectinload(Concert.venue))
-            .order_by(Artist.name)
-        ).all()
-
-    rows = ""
-    for artist in artists:
-        concerts = sorted(artist.concerts, key=lambda c: c.date)
-        for i, concert in enumerate(concerts):
-            artist_cell = (
-                f"<td rowspan='{len(concerts)}'><strong>{artist.name}</strong></td>"
-                if i == 0
-                else ""
-            )
-            venue = concert.venue.name if concert.venue else ""
-            location = ", ".join(filter(None, [concert.city, concert.country]))
-            rows += (
-                f"<tr>{artist_cell}"
-                f"<td>{concert.date}</td>"
-                f"<td>{venue}</td>"
-                f"<td>{location}</td></tr>\n"
-            )
-        if not concerts:
-            rows += f"<tr><td><strong>{artist.name}</strong></td><td colspan='3'><em>No concerts</em></td></tr>\n"
-
-    return f"""<!DOCTYPE html>
+LANDING_PAGE_SIZE = 100
+
+
+def _render_landing_page(
+    rows: list[Row], artist: str | None, past: bool, next_url: str | None
+) -> Iterator[str]:
+    yield f"""<!DOCTYPE html>
 <html>
 <head><title>Concert Checker</title></head>
 <body>
 <h1>Concerts</h1>
+<form method="get">
+<input name="artist" placeholder="Artist" value="{escape(artist or "")}">
+<label><input type="checkbox" name="past" value="true"{" checked" if past else ""}>
+Include past concerts</label>
+<button type="submit">Filter</button>
+</form>
 <table border="1" cellpadding="4" cellspacing="0">
-<tr><th>Artist</th><th>Date</th><th>Venue</th><th>Location</th></tr>
-{rows}
-</table>
-</body>
-</html>"""
+<tr><th>Date</th><th>Artist</th><th>Venue</th><th>Location</th></tr>
+"""
+    for batch in batched(rows, 50, strict=False):
+        yield "".join(
+            f"<tr><td>{row.date}</td>"
+            f"<td><strong>{escape(row.artist)}</strong></td>"
+            f"<td>{escape(row.venue or '')}</td>"
+            f"<td>{escape(', '.join(filter(None, [row.city, row.country])))}</td>"
+            "</tr>\n"
+            for row in batch
+        )
+    if not rows:
+        yield "<tr><td colspan='4'><em>No concerts</em></td></tr>\n"
+    yield "</table>\n"
+    if next_url:
+        yield f"<p><a href='{escape(next_url)}'>Next page</a></p>\n"
+    yield "</body>\n</html>"
+
+
+@app.get("/", response_class=HTMLResponse)
+async def landing_page(
+    request: Request,
+    artist: str | None = None,
+    past: bool = False,
+    after: str | None = None,
+) -> Response:
+    """Upcoming concerts in chronological order (all concerts with `past=true`).
+
+    Pages are keyset-paginated (see `list_concerts`), and repeat visits get a `304`
+    until a concert changes.
+    """
+    cursor = decode_cursor(after) if after else None
+    async with AsyncSessionLocal() as db:
+        version = await get_concerts_version(db)
+        # Upcoming concerts also change when the day changes.
+        etag = '"{}"'.format(
+            hashlib.sha256(
+                f"{version}|{datetime.date.today()}|{request.url.query}".encode()
+            ).hexdigest()[:32]
+        )
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        rows = await list_concerts(
+            db,
+            after=cursor,
+            start_date=None if past else datetime.date.today(),
+            artist_query=artist,
+            limit=LANDING_PAGE_SIZE + 1,
+        )
+
+    next_url = None
+    if len(rows) > LANDING_PAGE_SIZE:
+        rows = rows[:LANDING_PAGE_SIZE]
+        last = rows[-1]
+        next_url = str(
+            request.url.include_query_params(after=encode_cursor(last.date, last.id))
+        )
+
+    return StreamingResponse(
+        _render_landing_page(rows, artist, past, next_url),
+        media_type="text/html",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
 
 
 class ArtistAdmin(ModelView, model=Artist):
     column_list = [Artist.id, Artist.name, Artist.website_base_url, Artist.songkick_url]
     column_searchable_list = [Artist.name]
 
+    def search_query(self, stmt: Select, term: str) -> Select:
+        return stmt.filter(artist_search_filter(engine.dialect.name, term))
+
 
 class VenueAdmin(ModelView, model=Venue):
     column_list = [Venue.id, Venue.name, Venue.city, Venue.country]
@@ -0,0 +1,160 @@
+"""Read-only JSON API, for dashboards.
+
+Every list is keyset-paginated: each page comes with a `next_cursor` to pass as
+`after` to get the next page (`null` on the last page). Use `fields` to only get some
+of the fields of each item.
+"""
+
+import datetime
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+from concert_checker.app.async_crud import list_artists, list_concerts, list_venues
+from concert_checker.app.database import AsyncSessionLocal
+
+router = APIRouter(prefix="/api")
+
+CONCERT_FIELDS = (
+    "id",
+    "date",
+    "artist",
+    "venue",
+    "city",
+    "country",
+    "country_code",
+    "source_url",
+)
+ARTIST_FIELDS = ("id", "name", "website_base_url", "songkick_url")
+VENUE_FIELDS = ("id", "name", "city", "state", "country", "country_code")
+
+Limit = Annotated[int, Query(ge=1, le=1000)]
+Fields = Annotated[str | None, Query(description="Comma-separated fields to return")]
+
+
+def encode_cursor(concert_date: datetime.date, concert_id: int) -> str:
+    return f"{concert_date}.{concert_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.date, int]:
+    """Parse a `<date>.<id>` cursor (see `encode_cursor`)."""
+    try:
+        concert_date, concert_id = cursor.split(".")
+        return datetime.date.fromisoformat(concert_date), int(concert_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from None
+
+
+def _select_fields(fields: str | None, available: tuple[str, ...]) -> list[str]:
+    if not fields:
+        return list(available)
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    if unknown := set(selected) - set(available):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Available fields: {', '.join(available)}.",
+        )
+    return selected
+
+
+def _page(
+    items: list[Any],
+    fields: list[str],
+    limit: int,
+    cursor: Callable[[Any], str],
+) -> Response:
+    """Serialize a page of items.
+
+    `items` are fetched with `limit + 1`: the extra one tells whether there's a next
+    page.
+    """
+    next_cursor = cursor(items[limit - 1]) if len(items) > limit else None
+    payload = {
+        "items": [
+            {field: getattr(item, field) for field in fields} for item in items[:limit]
+        ],
+        "next_cursor": next_cursor,
+    }
+    # `pydantic_core` serializes straight to JSON bytes (dates included), without
+    # going through FastAPI's `jsonable_encoder`.
+    return Response(content=to_json(payload), media_type="application/json")
+
+
+@router.get("/concerts")
+async def get_concerts(
+    after: str | None = None,
+    start_date: datetime.date | None = None,
+    end_date: datetime.date | None = None,
+    country: str | None = None,
+    artist: str | None = None,
+    artist_id: int | None = None,
+    fields: Fields = None,
+    limit: Limit = 100,
+) -> Response:
+    """Concerts in chronological order, paginated on `(date, id)`.
+
+    `country` is a country name or ISO code, `artist` a (partial) artist name.
+    """
+    selected = _select_fields(fields, CONCERT_FIELDS)
+    async with AsyncSessionLocal() as db:
+        rows = await list_concerts(
+            db,
+            after=decode_cursor(after) if after else None,
+            start_date=start_date,
+            end_date=end_date,
+            artist_query=artist,
+            artist_id=artist_id,
+            country=country,
+            limit=limit + 1,
+        )
+    return _page(rows, selected, limit, lambda row: encode_cursor(row.date, row.id))
+
+
+def _decode_id_cursor(cursor: str | None) -> int | None:
+    if cursor is None:
+        return None
+    try:
+        return int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from None
+
+
+@router.get("/artists")
+async def get_artists(
+    after: str | None = None,
+    name: str | None = None,
+    fields: Fields = None,
+    limit: Limit = 100,
+) -> Response:
+    """Artists by id. `name` is a (partial) artist name."""
+    selected = _select_fields(fields, ARTIST_FIELDS)
+    async with AsyncSessionLocal() as db:
+        artists = await list_artists(
+            db, after_id=_decode_id_cursor(after), name_query=name, limit=limit + 1
+        )
+        return _page(artists, selected, limit, lambda artist: str(artist.id))
+
+
+@router.get("/venues")
+async def get_venues(
+    after: str | None = None,
+    country: str | None = None,
+    city: str | None = None,
+    fields: Fields = None,
+    limit: Limit = 100,
+) -> Response:
+    """Venues by id. `country` is a country name or ISO code."""
+    selected = _select_fields(fields, VENUE_FIELDS)
+    async with AsyncSessionLocal() as db:
+        venues = await list_venues(
+            db,
+            after_id=_decode_id_cursor(after),
+            country=country,
+            city=city,
+            limit=limit + 1,
+        )
+        return _page(venues, selected, limit, lambda venue: str(venue.id))
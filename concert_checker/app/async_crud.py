@@ -0,0 +1,282 @@
+"""Async variants of `concert_checker.app.crud`, for code running in the event loop.
+
+Each function runs its sync counterpart on the async connection of the session
+(`AsyncSession.run_sync`), so waiting on the database doesn't block the event loop.
+
+An `AsyncSession` doesn't support concurrent operations. Calls on the same session
+are serialized instead, so that one session can be shared by concurrent tasks, as
+sources do when they check their pages. Code sharing a session must go through these
+functions (including `commit` and `rollback`) rather than call the session directly.
+
+Sessions flagged with `db.info["commit_each_call"] = True` commit after every call.
+SQLite has a single writer: a session that keeps a write transaction open while
+fetching pages blocks every other process writing to the database (see `worker`).
+"""
+
+import asyncio
+import datetime
+from collections.abc import Callable
+from typing import Concatenate
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from concert_checker.app import crud
+from concert_checker.app.models import (
+    Artist,
+    ArtistUrlResolution,
+    ExtractionCache,
+    PageCache,
+    SeenEmail,
+    SourceSchedule,
+    Venue,
+)
+from concert_checker.app.schemas import ArtistCreate, ArtistUpdate, PageCacheCreate
+from concert_checker.common.dataclasses import (
+    ArtistShows,
+    EmailSignature,
+    MailboxCursor,
+)
+
+
+def _lock(db: AsyncSession) -> asyncio.Lock:
+    return db.info.setdefault("lock", asyncio.Lock())
+
+
+async def run_sync[T, **P](
+    db: AsyncSession,
+    fn: Callable[Concatenate[Session, P], T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """Run `fn(session, *args, **kwargs)` with the sync session behind `db`."""
+    async with _lock(db):
+        result = await db.run_sync(fn, *args, **kwargs)
+        if db.info.get("commit_each_call"):
+            await db.commit()
+        return result
+
+
+async def commit(db: AsyncSession):
+    async with _lock(db):
+        await db.commit()
+
+
+async def rollback(db: AsyncSession):
+    async with _lock(db):
+        await db.rollback()
+
+
+async def get_or_create_artist(db: AsyncSession, artist_data: ArtistCreate) -> Artist:
+    return await run_sync(db, crud.get_or_create_artist, artist_data)
+
+
+async def update_artist(db: AsyncSession, artist_data: ArtistUpdate) -> Artist:
+    return await run_sync(db, crud.update_artist, artist_data)
+
+
+async def get_artist_names(db: AsyncSession) -> list[str]:
+    return await run_sync(db, crud.get_artist_names)
+
+
+async def get_artists_to_resolve(
+    db: AsyncSession, kind: str, now: datetime.datetime, artist_id: int | None = None
+) -> list[Row]:
+    return await run_sync(db, crud.get_artists_to_resolve, kind, now, artist_id)
+
+
+async def save_url_resolution(
+    db: AsyncSession,
+    artist_id: int,
+    kind: str,
+    status: str,
+    url: str | None,
+    misses: int,
+    next_check_at: datetime.datetime | None,
+) -> ArtistUrlResolution:
+    return await run_sync(
+        db,
+        crud.save_url_resolution,
+        artist_id,
+        kind,
+        status,
+        url,
+        misses,
+        next_check_at,
+    )
+
+
+async def search_artists_by_name(
+    db: AsyncSession, name_query: str, limit: int = 20
+) -> list[Artist]:
+    return await run_sync(db, crud.search_artists_by_name, name_query, limit)
+
+
+async def bulk_upsert_shows(
+    db: AsyncSession, artist_shows: list[ArtistShows]
+) -> crud.UpsertResult:
+    return await run_sync(db, crud.bulk_upsert_shows, artist_shows)
+
+
+async def list_concerts(db: AsyncSession, **filters) -> list[Row]:
+    """See `crud.list_concerts` for the filters."""
+    return await run_sync(db, lambda session: crud.list_concerts(session, **filters))
+
+
+async def list_artists(db: AsyncSession, **filters) -> list[Artist]:
+    """See `crud.list_artists` for the filters."""
+    return await run_sync(db, lambda session: crud.list_artists(session, **filters))
+
+
+async def list_venues(db: AsyncSession, **filters) -> list[Venue]:
+    """See `crud.list_venues` for the filters."""
+    return await run_sync(db, lambda session: crud.list_venues(session, **filters))
+
+
+async def get_concerts_version(db: AsyncSession) -> str:
+    return await run_sync(db, crud.get_concerts_version)
+
+
+async def get_or_create_page_cache(
+    db: AsyncSession, page_cache_data: PageCacheCreate
+) -> PageCache:
+    return await run_sync(db, crud.get_or_create_page_cache, page_cache_data)
+
+
+async def get_artist_page_urls(
+    db: AsyncSession, artist_id: int, source: str
+) -> list[str]:
+    return await run_sync(db, crud.get_artist_page_urls, artist_id, source)
+
+
+async def set_artist_pages(
+    db: AsyncSession, artist_id: int, source: str, urls: set[str]
+):
+    await run_sync(db, crud.set_artist_pages, artist_id, source, urls)
+
+
+async def get_due_checks(
+    db: AsyncSession, sources: list[str], now: datetime.datetime, limit: int
+) -> list[Row]:
+    return await run_sync(db, crud.get_due_checks, sources, now, limit)
+
+
+async def get_source_schedule(
+    db: AsyncSession, artist_id: int, source: str
+) -> SourceSchedule | None:
+    return await run_sync(db, crud.get_source_schedule, artist_id, source)
+
+
+async def get_last_page_update(
+    db: AsyncSession, artist_id: int, source: str
+) -> datetime.datetime | None:
+    return await run_sync(db, crud.get_last_page_update, artist_id, source)
+
+
+async def get_next_concert_date(
+    db: AsyncSession, artist_id: int, today: datetime.date
+) -> datetime.date | None:
+    return await run_sync(db, crud.get_next_concert_date, artist_id, today)
+
+
+async def set_source_schedule(
+    db: AsyncSession,
+    artist_id: int,
+    source: str,
+    checked_at: datetime.datetime,
+    changed: bool,
+    next_check_at: datetime.datetime,
+) -> SourceSchedule:
+    return await run_sync(
+        db,
+        crud.set_source_schedule,
+        artist_id,
+        source,
+        checked_at,
+        changed,
+        next_check_at,
+    )
+
+
+async def enqueue_jobs(
+    db: AsyncSession,
+    checks: list[tuple[int | None, str]],
+    now: datetime.datetime,
+    finished_before: datetime.datetime,
+) -> int:
+    return await run_sync(db, crud.enqueue_jobs, checks, now, finished_before)
+
+
+async def claim_job(
+    db: AsyncSession,
+    worker: str,
+    now: datetime.datetime,
+    lease_expires_at: datetime.datetime,
+) -> Row | None:
+    return await run_sync(db, crud.claim_job, worker, now, lease_expires_at)
+
+
+async def extend_job_lease(
+    db: AsyncSession, job_id: int, worker: str, lease_expires_at: datetime.datetime
+) -> bool:
+    return await run_sync(db, crud.extend_job_lease, job_id, worker, lease_expires_at)
+
+
+async def finish_job(
+    db: AsyncSession, job_id: int, worker: str, now: datetime.datetime
+) -> bool:
+    return await run_sync(db, crud.finish_job, job_id, worker, now)
+
+
+async def fail_job(
+    db: AsyncSession,
+    job_id: int,
+    worker: str,
+    now: datetime.datetime,
+    error: str,
+    retry_at: datetime.datetime | None,
+) -> bool:
+    return await run_sync(db, crud.fail_job, job_id, worker, now, error, retry_at)
+
+
+async def get_extraction_cache(db: AsyncSession, key: str) -> ExtractionCache | None:
+    return await run_sync(db, crud.get_extraction_cache, key)
+
+
+async def create_extraction_cache(
+    db: AsyncSession, key: str, model_name: str, prompt_version: str, output: str
+) -> ExtractionCache:
+    return await run_sync(
+        db, crud.create_extraction_cache, key, model_name, prompt_version, output
+    )
+
+
+async def evict_extraction_caches(
+    db: AsyncSession, created_before: datetime.datetime, max_entries: int
+) -> int:
+    return await run_sync(db, crud.evict_extraction_caches, created_before, max_entries)
+
+
+async def get_mailbox_cursors(
+    db: AsyncSession, host: str, user: str
+) -> dict[str, MailboxCursor]:
+    return await run_sync(db, crud.get_mailbox_cursors, host, user)
+
+
+async def set_mailbox_cursors(
+    db: AsyncSession, host: str, user: str, cursors: dict[str, MailboxCursor]
+):
+    await run_sync(db, crud.set_mailbox_cursors, host, user, cursors)
+
+
+async def find_seen_emails(
+    db: AsyncSession, signature: EmailSignature, since: datetime.datetime
+) -> list[SeenEmail]:
+    return await run_sync(db, crud.find_seen_emails, signature, since)
+
+
+async def create_seen_email(
+    db: AsyncSession, signature: EmailSignature, subject: str
+) -> SeenEmail:
+    return await run_sync(db, crud.create_seen_email, signature, subject)
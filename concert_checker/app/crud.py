@@ -1,6 +1,42 @@
-from sqlalchemy.orm import Session
+import datetime
+from collections.abc import Callable, Iterable, Iterator
+from itertools import batched
+from typing import Any, NamedTuple
 
-from concert_checker.app.models import Artist, Concert, PageCache, Venue
+import logfire
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    and_,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.orm import Session, aliased
+
+from concert_checker.app.models import (
+    Artist,
+    ArtistPage,
+    ArtistUrlResolution,
+    Concert,
+    ExtractionCache,
+    Job,
+    MailboxSyncState,
+    PageCache,
+    SeenEmail,
+    SourceSchedule,
+    Venue,
+)
 from concert_checker.app.schemas import (
     ArtistCreate,
     ArtistUpdate,
@@ -8,10 +44,56 @@ from concert_checker.app.schemas import (
     PageCacheCreate,
     VenueCreate,
 )
+from concert_checker.common.dataclasses import (
+    ArtistShows,
+    EmailSignature,
+    MailboxCursor,
+    ShowDetails,
+)
+from concert_checker.common.utils import normalize_artist_name
 
 # TODO: add logging.
 
 
+# Writes rely on `INSERT ... ON CONFLICT`, which only these databases support.
+_INSERTS: dict[str, Callable[[Any], Insert]] = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def check_database_supported(engine: Engine):
+    """Fail early on databases the writes don't support (checked by `init_db`).
+
+    Raises:
+        RuntimeError: If the database isn't SQLite or PostgreSQL.
+    """
+    if engine.dialect.name not in _INSERTS:
+        raise RuntimeError(
+            f"Unsupported database: {engine.dialect.name}. Concert Checker needs "
+            f"INSERT ... ON CONFLICT, supported on: {', '.join(_INSERTS)}."
+        )
+
+
+def _insert(db: Session, table: Any) -> Insert:
+    """An INSERT statement supporting `ON CONFLICT` on the current database."""
+    return _INSERTS[db.get_bind().dialect.name](table)
+
+
+def _get_or_insert[T](db: Session, model: type[T], values: dict, **key) -> T:
+    """Get the row matching `key`, inserting it (atomically) if it doesn't exist.
+
+    `key` must match a unique index of the table: if a concurrent writer inserts the
+    same row in between, the INSERT is a no-op and its row is returned.
+    """
+    if (row := db.scalars(select(model).filter_by(**key)).first()) is not None:
+        return row
+    _ = db.execute(
+        _insert(db, model.__table__).values(**values).on_conflict_do_nothing()
+    )
+    return db.scalars(select(model).filter_by(**key)).one()
+
+
 def get_or_create_artist(db: Session, artist_data: ArtistCreate) -> Artist:
     """Get an existing Artist by name or create a new one if it doesn't exist.
 
@@ -23,13 +105,17 @@ def get_or_create_artist(db: Session, artist_data: ArtistCreate) -> Artist:
     Returns:
         Artist: The existing or newly created Artist object.
     """
-    artist = db.query(Artist).filter_by(name=artist_data.name).first()
-    if not artist:
-        artist = Artist(**artist_data.model_dump())
-        db.add(artist)
-        db.flush()
+    return _get_or_insert(
+        db,
+        Artist,
+        artist_data.model_dump()
+        | {"search_name": normalize_artist_name(artist_data.name)},
+        name=artist_data.name,
+    )
 
-    return artist
+
+def get_artist_names(db: Session) -> list[str]:
+    return list(db.scalars(select(Artist.name).order_by(Artist.name)))
 
 
 def update_artist(db: Session, artist_data: ArtistUpdate) -> Artist:
@@ -45,6 +131,92 @@ def update_artist(db: Session, artist_data: ArtistUpdate) -> Artist:
     return artist
 
 
+# Columns of `Artist` holding the URLs found by `common.url_resolution`, by kind.
+ARTIST_URL_COLUMNS = {
+    "website": Artist.website_base_url,
+    "songkick": Artist.songkick_url,
+}
+
+
+def get_artists_to_resolve(
+    db: Session, kind: str, now: datetime.datetime, artist_id: int | None = None
+) -> list[Row]:
+    """Return the artists whose URL of `kind` is unknown, and due for a search.
+
+    Artists that were never searched come first, then the ones searched the longest
+    ago.
+
+    Args:
+        db (Session): The database session to use.
+        kind (str): The kind of URL, a key of `ARTIST_URL_COLUMNS`.
+        now (datetime.datetime): Artists whose next check is after this aren't due.
+        artist_id (int | None): Only look at this artist.
+
+    Returns:
+        list[Row]: The `id`, `name` and `misses` (searches in a row that didn't find
+            the URL) of the artists.
+    """
+    stmt = (
+        select(
+            Artist.id,
+            Artist.name,
+            func.coalesce(ArtistUrlResolution.misses, 0).label("misses"),
+        )
+        .outerjoin(
+            ArtistUrlResolution,
+            and_(
+                ArtistUrlResolution.artist_id == Artist.id,
+                ArtistUrlResolution.kind == kind,
+            ),
+        )
+        .where(
+            ARTIST_URL_COLUMNS[kind].is_(None),
+            or_(
+                ArtistUrlResolution.next_check_at.is_(None),
+                ArtistUrlResolution.next_check_at <= now,
+            ),
+        )
+        .order_by(ArtistUrlResolution.checked_at.asc().nulls_first(), Artist.name)
+    )
+    if artist_id is not None:
+        stmt = stmt.where(Artist.id == artist_id)
+    return list(db.execute(stmt))
+
+
+def save_url_resolution(
+    db: Session,
+    artist_id: int,
+    kind: str,
+    status: str,
+    url: str | None,
+    misses: int,
+    next_check_at: datetime.datetime | None,
+) -> ArtistUrlResolution:
+    """Record the outcome of a search for a URL of an artist.
+
+    A URL that was found is also set on the artist.
+    """
+    resolution = db.scalars(
+        select(ArtistUrlResolution).filter_by(artist_id=artist_id, kind=kind)
+    ).first()
+    if resolution is None:
+        resolution = ArtistUrlResolution(artist_id=artist_id, kind=kind)
+        db.add(resolution)
+    resolution.status = status
+    resolution.url = url
+    resolution.misses = misses
+    resolution.checked_at = datetime.datetime.now()
+    resolution.next_check_at = next_check_at
+    if url is not None:
+        _ = db.execute(
+            update(Artist)
+            .where(Artist.id == artist_id)
+            .values({ARTIST_URL_COLUMNS[kind].key: url})
+        )
+    db.flush()
+    return resolution
+
+
 def get_or_create_venue(db: Session, venue_data: VenueCreate) -> Venue:
     """Get an existing Venue by name and city or create a new one if it doesn't exist.
 
@@ -55,15 +227,13 @@ def get_or_create_venue(db: Session, venue_data: VenueCreate) -> Venue:
     Returns:
         Venue: The existing or newly created Venue object.
     """
-    venue = (
-        db.query(Venue).filter_by(name=venue_data.name, city=venue_data.city).first()
+    return _get_or_insert(
+        db,
+        Venue,
+        venue_data.model_dump(),
+        name=venue_data.name,
+        city=venue_data.city,
     )
-    if not venue:
-        venue = Venue(**venue_data.model_dump())
-        db.add(venue)
-        db.flush()
-
-    return venue
 
 
 def get_or_create_concert(db: Session, concert_data: ConcertCreate) -> Concert:
@@ -76,21 +246,288 @@ def get_or_create_concert(db: Session, concert_data: ConcertCreate) -> Concert:
     Returns:
         Concert: The existing or newly created Concert object.
     """
-    concert = (
-        db.query(Concert)
-        .filter_by(
-            date=concert_data.date,
-            artist_id=concert_data.artist_id,
-            # No need to check the venue. We assume that an artist has only 1 show per day.
+    return _get_or_insert(
+        db,
+        Concert,
+        concert_data.model_dump(),
+        date=concert_data.date,
+        artist_id=concert_data.artist_id,
+        # No need to check the venue. We assume that an artist has only 1 show per day.
+    )
+
+
+# Keeps `IN (...)` lists below SQLite's limit on the number of bound parameters.
+IN_CLAUSE_BATCH_SIZE = 500
+
+
+class UpsertResult(NamedTuple):
+    inserted: int
+    updated: int
+
+
+def _in_batches[T](values: Iterable[T]) -> Iterator[list[T]]:
+    for batch in batched(values, IN_CLAUSE_BATCH_SIZE, strict=False):
+        yield list(batch)
+
+
+def bulk_upsert_shows(db: Session, artist_shows: list[ArtistShows]) -> UpsertResult:
+    """Add the shows of several artists to the database, in a constant number of queries.
+
+    Artists and venues are resolved with one `IN` query each (and created with one
+    INSERT each if needed). New concerts are added with a single INSERT. Existing ones
+    (same artist and date) only get the details they were missing (e.g. the venue):
+    sources disagreeing on a detail (a venue spelling, a ticket URL) would otherwise
+    overwrite each other on every run. As with `get_or_create_concert`, an artist is
+    assumed to have at most one show per day: the first one wins.
+
+    Args:
+        db (Session): The database session to use.
+        artist_shows (list[ArtistShows]): The shows to add.
+
+    Returns:
+        UpsertResult: The number of inserted concerts, and of existing concerts that
+            got missing details.
+    """
+    # Shows with a date that couldn't be parsed are skipped.
+    shows_by_key: dict[tuple[str, datetime.date], ShowDetails] = {}
+    for artist_show in artist_shows:
+        for show in artist_show.shows:
+            if not isinstance(show.date, datetime.date):
+                logfire.warning("Need to implement the date parsing logic")
+                continue
+            show_date = (
+                show.date.date()
+                if isinstance(show.date, datetime.datetime)
+                else show.date
+            )
+            _ = shows_by_key.setdefault((artist_show.artist_name, show_date), show)
+
+    artist_ids = _resolve_artist_ids(db, {a.artist_name for a in artist_shows})
+    venue_ids = _resolve_venue_ids(
+        db,
+        {
+            (show.venue, show.city): VenueCreate(
+                name=show.venue,
+                city=show.city,
+                country=show.country,
+                country_code=show.country_code,
+            )
+            for show in shows_by_key.values()
+            if show.venue
+        },
+    )
+    if not shows_by_key:
+        return UpsertResult(inserted=0, updated=0)
+
+    rows = {
+        (artist_ids[artist_name], show_date): {
+            "date": show_date,
+            "artist_id": artist_ids[artist_name],
+            "venue_id": venue_ids.get((show.venue, show.city)) if show.venue else None,
+            "source_url": show.source_url,
+            "city": show.city,
+            "country": show.country,
+            "country_code": show.country_code,
+        }
+        for (artist_name, show_date), show in shows_by_key.items()
+    }
+    existing = {
+        (concert.artist_id, concert.date): concert
+        for batch in _in_batches(rows)
+        for concert in db.scalars(
+            select(Concert).where(tuple_(Concert.artist_id, Concert.date).in_(batch))
+        )
+    }
+
+    new_rows = [row for key, row in rows.items() if key not in existing]
+    changed_rows = [
+        {"id": concert.id} | missing
+        for key, row in rows.items()
+        if (concert := existing.get(key)) is not None
+        and (
+            missing := {
+                field: value
+                for field, value in row.items()
+                if value is not None and getattr(concert, field) is None
+            }
+        )
+    ]
+
+    inserted = 0
+    if new_rows:
+        # `DO NOTHING`: a concurrent writer may have added the same concert meanwhile.
+        inserted = db.execute(
+            _insert(db, Concert.__table__).on_conflict_do_nothing(), new_rows
+        ).rowcount
+    if changed_rows:
+        _ = db.execute(update(Concert), changed_rows)
+    return UpsertResult(inserted=inserted, updated=len(changed_rows))
+
+
+def _resolve_artist_ids(db: Session, names: set[str]) -> dict[str, int]:
+    """Map artist names to ids, creating the missing artists."""
+    if not names:
+        return {}
+
+    def lookup(names: Iterable[str]) -> dict[str, int]:
+        return {
+            name: artist_id
+            for batch in _in_batches(names)
+            for name, artist_id in db.execute(
+                select(Artist.name, Artist.id).where(Artist.name.in_(batch))
+            )
+        }
+
+    ids = lookup(names)
+    if missing := names - ids.keys():
+        _ = db.execute(
+            _insert(db, Artist.__table__).on_conflict_do_nothing(),
+            [
+                {"name": name, "search_name": normalize_artist_name(name)}
+                for name in sorted(missing)
+            ],
+        )
+        ids |= lookup(missing)
+    return ids
+
+
+def _resolve_venue_ids(
+    db: Session, venues: dict[tuple[str, str], VenueCreate]
+) -> dict[tuple[str, str], int]:
+    """Map `(name, city)` pairs to venue ids, creating the missing venues."""
+    if not venues:
+        return {}
+
+    def lookup(keys: Iterable[tuple[str, str]]) -> dict[tuple[str, str], int]:
+        return {
+            (name, city): venue_id
+            for batch in _in_batches(keys)
+            for name, city, venue_id in db.execute(
+                select(Venue.name, Venue.city, Venue.id).where(
+                    tuple_(Venue.name, Venue.city).in_(batch)
+                )
+            )
+        }
+
+    ids = lookup(venues)
+    if missing := venues.keys() - ids.keys():
+        _ = db.execute(
+            _insert(db, Venue.__table__).on_conflict_do_nothing(),
+            [venues[key].model_dump() for key in sorted(missing)],
         )
-        .first()
+        ids |= lookup(missing)
+    return ids
+
+
+def list_concerts(
+    db: Session,
+    after: tuple[datetime.date, int] | None = None,
+    start_date: datetime.date | None = None,
+    end_date: datetime.date | None = None,
+    artist_query: str | None = None,
+    artist_id: int | None = None,
+    country: str | None = None,
+    limit: int = 100,
+) -> list[Row]:
+    """List concerts in chronological order, one page at a time.
+
+    Pages are keyset-paginated on `(date, id)`: pass the `(date, id)` of the last
+    concert of a page as `after` to get the next one. Unlike OFFSET, this costs the
+    same whatever the page.
+
+    Args:
+        db (Session): The database session to use.
+        after (tuple[datetime.date, int] | None): The `(date, id)` to start after.
+        start_date (datetime.date | None): Only concerts on or after this date.
+        end_date (datetime.date | None): Only concerts on or before this date.
+        artist_query (str | None): Only concerts of artists matching this name (see
+            `search_artists_by_name`).
+        artist_id (int | None): Only concerts of this artist.
+        country (str | None): Only concerts in this country (name or ISO code).
+        limit (int): The maximum number of concerts to return.
+
+    Returns:
+        list[Row]: Rows with the `id`, `date`, `artist`, `venue`, `city`, `country`,
+            `country_code` and `source_url` of the concerts.
+    """
+    stmt = (
+        select(
+            Concert.id,
+            Concert.date,
+            Artist.name.label("artist"),
+            Venue.name.label("venue"),
+            Concert.city,
+            Concert.country,
+            Concert.country_code,
+            Concert.source_url,
+        )
+        .join(Concert.artist)
+        .outerjoin(Concert.venue)
+        .order_by(Concert.date, Concert.id)
+        .limit(limit)
     )
-    if not concert:
-        concert = Concert(**concert_data.model_dump())
-        db.add(concert)
-        db.flush()
+    if after is not None:
+        stmt = stmt.where(tuple_(Concert.date, Concert.id) > tuple_(*after))
+    if start_date is not None:
+        stmt = stmt.where(Concert.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(Concert.date <= end_date)
+    if artist_query:
+        stmt = stmt.where(
+            artist_search_filter(db.get_bind().dialect.name, artist_query)
+        )
+    if artist_id is not None:
+        stmt = stmt.where(Concert.artist_id == artist_id)
+    if country:
+        stmt = stmt.where(_country_filter(Concert, country))
+    return list(db.execute(stmt))
+
 
-    return concert
+def _country_filter(model: type[Concert] | type[Venue], country: str):
+    if len(country) == 2:
+        return model.country_code == country.upper()
+    return func.lower(model.country) == country.lower()
+
+
+def list_artists(
+    db: Session,
+    after_id: int | None = None,
+    name_query: str | None = None,
+    limit: int = 100,
+) -> list[Artist]:
+    """List artists by id, one page at a time (keyset pagination on `id`)."""
+    stmt = select(Artist).order_by(Artist.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(Artist.id > after_id)
+    if name_query:
+        stmt = stmt.where(artist_search_filter(db.get_bind().dialect.name, name_query))
+    return list(db.scalars(stmt))
+
+
+def list_venues(
+    db: Session,
+    after_id: int | None = None,
+    country: str | None = None,
+    city: str | None = None,
+    limit: int = 100,
+) -> list[Venue]:
+    """List venues by id, one page at a time (keyset pagination on `id`)."""
+    stmt = select(Venue).order_by(Venue.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(Venue.id > after_id)
+    if country:
+        stmt = stmt.where(_country_filter(Venue, country))
+    if city:
+        stmt = stmt.where(func.lower(Venue.city) == city.lower())
+    return list(db.scalars(stmt))
+
+
+def get_concerts_version(db: Session) -> str:
+    """A string that changes whenever a concert is added, updated or deleted."""
+    count, max_id, max_updated_at = db.execute(
+        select(func.count(), func.max(Concert.id), func.max(Concert.updated_at))
+    ).one()
+    return f"{count}-{max_id}-{max_updated_at}"
 
 
 def get_or_create_page_cache(
@@ -105,5 +542,495 @@ def get_or_create_page_cache(
     return page_cache
 
 
-def search_artists_by_name(db: Session, name_query: str) -> list[Artist]:
-    return db.query(Artist).filter(Artist.name.ilike(f"%{name_query}%")).all()
+def get_artist_page_urls(db: Session, artist_id: int, source: str) -> list[str]:
+    """Get the URLs of the pages where `source` found shows of an artist last time."""
+    return list(
+        db.scalars(
+            select(PageCache.url)
+            .join(ArtistPage, ArtistPage.page_cache_id == PageCache.id)
+            .filter(ArtistPage.artist_id == artist_id, ArtistPage.source == source)
+            .order_by(PageCache.url)
+        )
+    )
+
+
+def set_artist_pages(db: Session, artist_id: int, source: str, urls: set[str]):
+    """Replace the pages where `source` found shows of an artist.
+
+    Args:
+        db (Session): The database session to use.
+        artist_id (int): The id of the artist.
+        source (str): The name of the source (`Source.name`).
+        urls (set[str]): The URLs of the pages that produced shows.
+    """
+    db.query(ArtistPage).filter_by(artist_id=artist_id, source=source).delete()
+    for url in sorted(urls):
+        page_cache = get_or_create_page_cache(db, PageCacheCreate(url=url))
+        db.add(
+            ArtistPage(artist_id=artist_id, source=source, page_cache_id=page_cache.id)
+        )
+    db.flush()
+
+
+def get_due_checks(
+    db: Session, sources: list[str], now: datetime.datetime, limit: int
+) -> list[Row]:
+    """Return the (artist, source) pairs due for a check, the most overdue first.
+
+    Pairs that were never checked (including new artists) come first.
+
+    Args:
+        db (Session): The database session to use.
+        sources (list[str]): The names of the sources (`Source.name`).
+        now (datetime.datetime): Pairs whose next check is after this aren't due.
+        limit (int): The maximum number of pairs to return.
+
+    Returns:
+        list[Row]: The `artist_id`, `artist_name` and `source` of the pairs.
+    """
+    for source in sources:
+        _ = db.execute(
+            _insert(db, SourceSchedule)
+            .from_select(
+                ["artist_id", "source"],
+                select(Artist.id, literal(source)).where(
+                    ~exists().where(
+                        SourceSchedule.artist_id == Artist.id,
+                        SourceSchedule.source == source,
+                    )
+                ),
+            )
+            .on_conflict_do_nothing()
+        )
+    return list(
+        db.execute(
+            select(
+                Artist.id.label("artist_id"),
+                Artist.name.label("artist_name"),
+                SourceSchedule.source,
+            )
+            .join(Artist, Artist.id == SourceSchedule.artist_id)
+            .where(
+                SourceSchedule.source.in_(sources),
+                or_(
+                    SourceSchedule.next_check_at.is_(None),
+                    SourceSchedule.next_check_at <= now,
+                ),
+            )
+            .order_by(SourceSchedule.next_check_at.asc().nulls_first(), Artist.name)
+            .limit(limit)
+        )
+    )
+
+
+def get_source_schedule(
+    db: Session, artist_id: int, source: str
+) -> SourceSchedule | None:
+    return db.scalars(
+        select(SourceSchedule).filter_by(artist_id=artist_id, source=source)
+    ).first()
+
+
+def get_last_page_update(
+    db: Session, artist_id: int, source: str
+) -> datetime.datetime | None:
+    """When a page where `source` found shows of an artist last changed."""
+    return db.scalar(
+        select(func.max(PageCache.last_updated_at))
+        .join(ArtistPage, ArtistPage.page_cache_id == PageCache.id)
+        .filter(ArtistPage.artist_id == artist_id, ArtistPage.source == source)
+    )
+
+
+def get_next_concert_date(
+    db: Session, artist_id: int, today: datetime.date
+) -> datetime.date | None:
+    return db.scalar(
+        select(func.min(Concert.date)).filter(
+            Concert.artist_id == artist_id, Concert.date >= today
+        )
+    )
+
+
+def set_source_schedule(
+    db: Session,
+    artist_id: int,
+    source: str,
+    checked_at: datetime.datetime,
+    changed: bool,
+    next_check_at: datetime.datetime,
+) -> SourceSchedule:
+    """Record a check of an artist by a source, and when to check it next."""
+    schedule = get_source_schedule(db, artist_id, source)
+    if schedule is None:
+        schedule = SourceSchedule(artist_id=artist_id, source=source)
+        db.add(schedule)
+    schedule.last_checked_at = checked_at
+    if changed:
+        schedule.last_changed_at = checked_at
+    schedule.next_check_at = next_check_at
+    db.flush()
+    return schedule
+
+
+def job_key(source: str, artist_id: int | None) -> str:
+    return source if artist_id is None else f"{source}:{artist_id}"
+
+
+def enqueue_jobs(
+    db: Session,
+    checks: list[tuple[int | None, str]],
+    now: datetime.datetime,
+    finished_before: datetime.datetime,
+) -> int:
+    """Queue a job per `(artist id, source)` pair, the artist id being None for
+    sources that aren't bound to an artist.
+
+    Jobs that are already queued or running are left as they are, and so are the ones
+    that finished after `finished_before`.
+
+    Returns:
+        int: The number of jobs that were queued.
+    """
+    queued = 0
+    for batch in _in_batches(checks):
+        stmt = _insert(db, Job).values(
+            [
+                {
+                    "key": job_key(source, artist_id),
+                    "artist_id": artist_id,
+                    "source": source,
+                    "state": "pending",
+                    "attempts": 0,
+                    "run_after": now,
+                }
+                for artist_id, source in batch
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Job.key],
+            set_={
+                "state": "pending",
+                "attempts": 0,
+                "run_after": now,
+                "worker": None,
+                "lease_expires_at": None,
+                "last_error": None,
+            },
+            where=and_(
+                Job.state.in_(["done", "failed"]),
+                or_(Job.finished_at.is_(None), Job.finished_at <= finished_before),
+            ),
+        )
+        queued += db.execute(stmt).rowcount
+    return queued
+
+
+def claim_job(
+    db: Session,
+    worker: str,
+    now: datetime.datetime,
+    lease_expires_at: datetime.datetime,
+) -> Row | None:
+    """Claim the next job that is due, or whose worker's lease expired.
+
+    The job is picked and leased in a single UPDATE: concurrent workers (even in other
+    processes) never claim the same job. The caller must commit straight away.
+
+    Returns:
+        Row | None: The `id`, `source`, `attempts` and `artist_name` (None for sources
+            not bound to an artist) of the job, or None if no job is due.
+    """
+    candidate = aliased(Job)
+    job_id = (
+        select(candidate.id)
+        .where(
+            or_(
+                and_(candidate.state == "pending", candidate.run_after <= now),
+                and_(candidate.state == "running", candidate.lease_expires_at < now),
+            )
+        )
+        .order_by(candidate.run_after, candidate.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    claimed_id = db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(
+            state="running",
+            worker=worker,
+            lease_expires_at=lease_expires_at,
+            attempts=Job.attempts + 1,
+        )
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if claimed_id is None:
+        return None
+    return db.execute(
+        select(Job.id, Job.source, Job.attempts, Artist.name.label("artist_name"))
+        .outerjoin(Artist, Artist.id == Job.artist_id)
+        .where(Job.id == claimed_id)
+    ).one()
+
+
+def _update_leased_job(db: Session, job_id: int, worker: str, **values) -> bool:
+    """Update a job, if `worker` still holds it. Returns whether it did."""
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.worker == worker, Job.state == "running")
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def extend_job_lease(
+    db: Session, job_id: int, worker: str, lease_expires_at: datetime.datetime
+) -> bool:
+    return _update_leased_job(db, job_id, worker, lease_expires_at=lease_expires_at)
+
+
+def finish_job(db: Session, job_id: int, worker: str, now: datetime.datetime) -> bool:
+    return _update_leased_job(
+        db,
+        job_id,
+        worker,
+        state="done",
+        lease_expires_at=None,
+        finished_at=now,
+        last_error=None,
+    )
+
+
+def fail_job(
+    db: Session,
+    job_id: int,
+    worker: str,
+    now: datetime.datetime,
+    error: str,
+    retry_at: datetime.datetime | None,
+) -> bool:
+    """Release a job that failed, to be retried at `retry_at` (or never if None)."""
+    if retry_at is not None:
+        values = {"state": "pending", "run_after": retry_at}
+    else:
+        values = {"state": "failed", "finished_at": now}
+    return _update_leased_job(
+        db, job_id, worker, lease_expires_at=None, last_error=error, **values
+    )
+
+
+def get_extraction_cache(db: Session, key: str) -> ExtractionCache | None:
+    return db.query(ExtractionCache).filter_by(key=key).first()
+
+
+def create_extraction_cache(
+    db: Session, key: str, model_name: str, prompt_version: str, output: str
+) -> ExtractionCache:
+    now = datetime.datetime.now()
+    extraction_cache = ExtractionCache(
+        key=key,
+        model_name=model_name,
+        prompt_version=prompt_version,
+        output=output,
+        created_at=now,
+        last_used_at=now,
+        hits=0,
+    )
+    db.add(extraction_cache)
+    db.flush()
+    return extraction_cache
+
+
+def evict_extraction_caches(
+    db: Session, created_before: datetime.datetime, max_entries: int
+) -> int:
+    """Delete the expired cached extractions, then the least recently used ones.
+
+    Args:
+        db (Session): The database session to use.
+        created_before (datetime.datetime): Entries created before this are expired.
+        max_entries (int): The maximum number of entries to keep.
+
+    Returns:
+        int: The number of deleted entries.
+    """
+    deleted = db.execute(
+        delete(ExtractionCache).where(ExtractionCache.created_at < created_before)
+    ).rowcount
+
+    excess = db.scalar(select(func.count(ExtractionCache.id))) - max_entries
+    if excess > 0:
+        oldest_ids = (
+            select(ExtractionCache.id)
+            .order_by(ExtractionCache.last_used_at)
+            .limit(excess)
+        )
+        deleted += db.execute(
+            delete(ExtractionCache).where(ExtractionCache.id.in_(oldest_ids))
+        ).rowcount
+    return deleted
+
+
+def artist_search_filter(dialect_name: str, name_query: str) -> ColumnElement[bool]:
+    """A filter on artists whose (normalized) name contains `name_query`.
+
+    Backed by the trigram index on `artists.search_name`: FTS5 on SQLite, `pg_trgm` on
+    PostgreSQL (see `concert_checker.app.migrations`).
+    """
+    search_name = normalize_artist_name(name_query)
+    if dialect_name == "sqlite" and len(search_name) >= 3:
+        # Trigrams can't match fewer than 3 characters: shorter queries are scanned.
+        return Artist.id.in_(
+            select(literal_column("rowid"))
+            .select_from(table("artists_fts"))
+            .where(
+                text("artists_fts MATCH :match").bindparams(
+                    match=_fts_phrase(search_name)
+                )
+            )
+        )
+    return Artist.search_name.contains(search_name, autoescape=True)
+
+
+def _fts_phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def get_mailbox_cursors(db: Session, host: str, user: str) -> dict[str, MailboxCursor]:
+    states = db.scalars(select(MailboxSyncState).filter_by(host=host, user=user))
+    return {
+        state.mailbox: MailboxCursor(
+            uid_validity=state.uid_validity,
+            last_uid=state.last_uid,
+            failed_uid=state.failed_uid,
+            fetch_attempts=state.fetch_attempts or 0,
+        )
+        for state in states
+    }
+
+
+def set_mailbox_cursors(
+    db: Session, host: str, user: str, cursors: dict[str, MailboxCursor]
+):
+    now = datetime.datetime.now()
+    states = {
+        state.mailbox: state
+        for state in db.scalars(
+            select(MailboxSyncState).filter_by(host=host, user=user)
+        )
+    }
+    for mailbox, cursor in cursors.items():
+        if (state := states.get(mailbox)) is None:
+            state = MailboxSyncState(host=host, user=user, mailbox=mailbox)
+            db.add(state)
+        state.uid_validity = cursor.uid_validity
+        state.last_uid = cursor.last_uid
+        state.failed_uid = cursor.failed_uid
+        state.fetch_attempts = cursor.fetch_attempts
+        state.synced_at = now
+    db.flush()
+
+
+def find_seen_emails(
+    db: Session, signature: EmailSignature, since: datetime.datetime
+) -> list[SeenEmail]:
+    """Return the seen emails that may be copies of an email.
+
+    Candidates share the Message-ID or the body hash of the email, or were sent by the
+    same sender since `since`. `email_dedup.is_duplicate` tells which ones actually
+    are copies.
+    """
+    conditions = [
+        SeenEmail.body_hash == signature.body_hash,
+        and_(SeenEmail.sender == signature.sender, SeenEmail.seen_at >= since),
+    ]
+    if signature.message_id:
+        conditions.append(SeenEmail.message_id == signature.message_id)
+    return list(db.scalars(select(SeenEmail).where(or_(*conditions))))
+
+
+def create_seen_email(
+    db: Session, signature: EmailSignature, subject: str
+) -> SeenEmail:
+    seen_email = SeenEmail(
+        message_id=signature.message_id,
+        sender=signature.sender,
+        subject=subject,
+        body_hash=signature.body_hash,
+        dates_hash=signature.dates_hash,
+        simhash=signature.simhash,
+        seen_at=datetime.datetime.now(),
+    )
+    db.add(seen_email)
+    db.flush()
+    return seen_email
+
+
+def search_artists_by_name(
+    db: Session, name_query: str, limit: int = 20
+) -> list[Artist]:
+    """Search artists by name, ignoring case, accents, punctuation and "The" prefixes.
+
+    Exact matches come first, then names starting with the query, then shorter names.
+    If no name contains the query, falls back to names sharing the most trigrams with
+    it, which tolerates typos.
+
+    Args:
+        db (Session): The database session to use.
+        name_query (str): The artist name (or partial name) to search for.
+        limit (int): The maximum number of artists to return.
+
+    Returns:
+        list[Artist]: The matching artists, best matches first.
+    """
+    search_name = normalize_artist_name(name_query)
+    if not search_name:
+        return []
+
+    dialect_name = db.get_bind().dialect.name
+    artists = db.scalars(
+        select(Artist)
+        .where(artist_search_filter(dialect_name, name_query))
+        .order_by(
+            (Artist.search_name == search_name).desc(),
+            Artist.search_name.startswith(search_name, autoescape=True).desc(),
+            func.length(Artist.search_name),
+            Artist.name,
+        )
+        .limit(limit)
+    ).all()
+    if artists or len(search_name) < 3:
+        return list(artists)
+
+    match dialect_name:
+        case "sqlite":
+            trigrams = {search_name[i : i + 3] for i in range(len(search_name) - 2)}
+            ids = db.scalars(
+                text(
+                    "SELECT rowid FROM artists_fts WHERE artists_fts MATCH :match "
+                    "ORDER BY rank LIMIT :limit"
+                ),
+                {
+                    "match": " OR ".join(map(_fts_phrase, sorted(trigrams))),
+                    "limit": limit,
+                },
+            ).all()
+            by_id = {
+                a.id: a for a in db.scalars(select(Artist).where(Artist.id.in_(ids)))
+            }
+            return [by_id[id_] for id_ in ids if id_ in by_id]
+        case "postgresql":
+            return list(
+                db.scalars(
+                    select(Artist)
+                    .where(Artist.search_name.op("%")(search_name))
+                    .order_by(func.similarity(Artist.search_name, search_name).desc())
+                    .limit(limit)
+                )
+            )
+        case _:
+            return []
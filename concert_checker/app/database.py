@@ -1,16 +1,41 @@
 import os
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///concerts.db")
 
+# Async drivers of the supported databases. `asyncpg` has to be installed separately
+# to use PostgreSQL.
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def to_async_url(url: str) -> str:
+    """Use the async driver of the database of `url`.
+
+    "sqlite:///concerts.db" -> "sqlite+aiosqlite:///concerts.db"
+    """
+    parsed = make_url(url)
+    drivername = _ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.environ.get(
+    "ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL)
+)
+
+_IS_SQLITE = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "sqlite"
+
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if _IS_SQLITE else {},
 )
+# Same database, for code running in the event loop (see
+# `concert_checker.app.async_crud`).
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
 
 
-@event.listens_for(engine, "connect")
 def _set_sqlite_pragma(dbapi_connection, connection_record):
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA journal_mode=WAL")
@@ -18,7 +43,15 @@ def _set_sqlite_pragma(dbapi_connection, connection_record):
     cursor.close()
 
 
+# Other databases don't know about pragmas.
+for _engine in (engine, async_engine.sync_engine):
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", _set_sqlite_pragma)
+
+
 SessionLocal = sessionmaker(bind=engine)
+# Objects aren't expired on commit: reloading them would need an `await`.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
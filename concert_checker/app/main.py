@@ -1,7 +1,8 @@
-from concert_checker.app.database import Base, SessionLocal, engine
+from concert_checker.app.database import SessionLocal
+from concert_checker.app.migrations import init_db
 from concert_checker.app.models import Artist, Concert, Venue  # noqa: F401
 
-Base.metadata.create_all(bind=engine)
+init_db()
 
 db = SessionLocal()
 
@@ -0,0 +1,198 @@
+import logfire
+from sqlalchemy import (
+    Connection,
+    Engine,
+    Table,
+    and_,
+    bindparam,
+    delete,
+    func,
+    inspect,
+    select,
+    text,
+    update,
+)
+
+from concert_checker.app import models  # Also registers the tables
+from concert_checker.app.crud import check_database_supported
+from concert_checker.app.database import Base
+from concert_checker.app.database import engine as default_engine
+from concert_checker.common.utils import normalize_artist_name
+
+
+def init_db(engine: Engine = default_engine):
+    """Create missing tables, and bring existing ones up to date with the models.
+
+    `create_all` only creates tables that don't exist yet. Existing `concerts.db`
+    files are upgraded in place by the lightweight migrations below.
+    """
+    check_database_supported(engine)
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    _add_missing_indexes(engine)
+    _create_artist_search_index(engine)
+
+
+def _add_missing_columns(engine: Engine):
+    """Add the nullable columns that were added to the models after table creation."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise RuntimeError(
+                        f"Cannot add non-nullable column {table.name}.{column.name} "
+                        "to an existing table."
+                    )
+
+                column_type = column.type.compile(dialect=engine.dialect)
+                logfire.info(
+                    "Adding column {table}.{column}",
+                    table=table.name,
+                    column=column.name,
+                )
+                _ = conn.execute(
+                    text(
+                        f'ALTER TABLE "{table.name}" '
+                        f'ADD COLUMN "{column.name}" {column_type}'
+                    )
+                )
+
+
+def _add_missing_indexes(engine: Engine):
+    """Create the indexes that were added to the models after table creation.
+
+    Rows that would violate a new unique index are merged first (see
+    `_merge_duplicates`).
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                if index.unique:
+                    _merge_duplicates(
+                        conn, table, [column.name for column in index.columns]
+                    )
+                logfire.info("Creating index {index}", index=index.name)
+                index.create(conn)
+
+
+def _merge_duplicates(conn: Connection, table: Table, columns: list[str]):
+    """Keep the oldest row of each group of rows sharing the same `columns`.
+
+    Rows referencing a dropped duplicate are moved to the kept row. Tables are
+    migrated parents first, so the duplicates this creates in child tables are merged
+    when their own unique indexes are created.
+    """
+    key = [table.c[name] for name in columns]
+    groups = conn.execute(
+        select(func.min(table.c.id), *key).group_by(*key).having(func.count() > 1)
+    ).all()
+    references = [
+        foreign_key.parent
+        for other in Base.metadata.sorted_tables
+        for foreign_key in other.foreign_keys
+        if foreign_key.column is table.c.id
+    ]
+    for kept_id, *values in groups:
+        duplicate_ids = conn.scalars(
+            select(table.c.id).where(
+                and_(
+                    *(
+                        column == value
+                        for column, value in zip(key, values, strict=True)
+                    )
+                ),
+                table.c.id != kept_id,
+            )
+        ).all()
+        logfire.warning(
+            "Merging {count} duplicates of {table} {kept_id}",
+            count=len(duplicate_ids),
+            table=table.name,
+            kept_id=kept_id,
+        )
+        for column in references:
+            # A referencing row that already exists for the kept row is dropped.
+            _ = conn.execute(
+                update(column.table)
+                .where(column.in_(duplicate_ids))
+                .values({column.name: kept_id})
+                .prefix_with("OR IGNORE", dialect="sqlite")
+            )
+            _ = conn.execute(delete(column.table).where(column.in_(duplicate_ids)))
+        _ = conn.execute(delete(table).where(table.c.id.in_(duplicate_ids)))
+
+
+# Trigram index on `artists.search_name`, kept in sync by triggers so that every write
+# path (ORM, Core INSERTs, ON CONFLICT upserts) is covered.
+_SQLITE_ARTIST_SEARCH_INDEX = [
+    (
+        "CREATE VIRTUAL TABLE artists_fts USING fts5("
+        "search_name, content='artists', content_rowid='id', tokenize='trigram')"
+    ),
+    (
+        "CREATE TRIGGER artists_fts_insert AFTER INSERT ON artists BEGIN "
+        "INSERT INTO artists_fts(rowid, search_name) VALUES (new.id, new.search_name); "
+        "END"
+    ),
+    (
+        "CREATE TRIGGER artists_fts_delete AFTER DELETE ON artists BEGIN "
+        "INSERT INTO artists_fts(artists_fts, rowid, search_name) "
+        "VALUES ('delete', old.id, old.search_name); "
+        "END"
+    ),
+    (
+        "CREATE TRIGGER artists_fts_update AFTER UPDATE OF search_name ON artists BEGIN "
+        "INSERT INTO artists_fts(artists_fts, rowid, search_name) "
+        "VALUES ('delete', old.id, old.search_name); "
+        "INSERT INTO artists_fts(rowid, search_name) VALUES (new.id, new.search_name); "
+        "END"
+    ),
+    "INSERT INTO artists_fts(artists_fts) VALUES ('rebuild')",
+]
+_POSTGRESQL_ARTIST_SEARCH_INDEX = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    (
+        "CREATE INDEX IF NOT EXISTS ix_artists_search_name_trgm "
+        "ON artists USING gin (search_name gin_trgm_ops)"
+    ),
+]
+
+
+def _create_artist_search_index(engine: Engine):
+    """Fill in `artists.search_name` where missing, and create its trigram index."""
+    with engine.begin() as conn:
+        missing = conn.execute(
+            select(models.Artist.id, models.Artist.name).where(
+                models.Artist.search_name.is_(None)
+            )
+        ).all()
+        if missing:
+            _ = conn.execute(
+                update(models.Artist)
+                .where(models.Artist.id == bindparam("artist_id"))
+                .values(search_name=bindparam("search_name")),
+                [
+                    {"artist_id": id_, "search_name": normalize_artist_name(name)}
+                    for id_, name in missing
+                ],
+            )
+
+        match engine.dialect.name:
+            case "sqlite" if not inspect(conn).has_table("artists_fts"):
+                statements = _SQLITE_ARTIST_SEARCH_INDEX
+            case "postgresql":
+                statements = _POSTGRESQL_ARTIST_SEARCH_INDEX
+            case _:
+                statements = []
+        if statements:
+            logfire.info("Creating the artist search index")
+        for statement in statements:
+            _ = conn.execute(text(statement))
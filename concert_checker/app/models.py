@@ -1,23 +1,56 @@
 import datetime
 
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from concert_checker.app.database import Base
+from concert_checker.common.utils import normalize_artist_name
 
 
 class Artist(Base):
     __tablename__ = "artists"
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column()
+    name: Mapped[str] = mapped_column(unique=True, index=True)
+    # `normalize_artist_name(name)`, indexed for search (see
+    # `concert_checker.app.migrations`). Set by the ORM when the name is set; Core
+    # INSERTs must set it themselves.
+    search_name: Mapped[str | None] = mapped_column()
     concerts: Mapped[list["Concert"]] = relationship(back_populates="artist")
 
     website_base_url: Mapped[str | None] = mapped_column()
     songkick_url: Mapped[str | None] = mapped_column()
 
+    @validates("name")
+    def _set_search_name(self, _key: str, name: str) -> str:
+        self.search_name = normalize_artist_name(name)
+        return name
+
+
+class ArtistUrlResolution(Base):
+    """The last search for a URL of an artist (see `common.url_resolution`)."""
+
+    __tablename__ = "artist_url_resolutions"
+    __table_args__ = (
+        Index(
+            "ix_artist_url_resolutions_artist_kind", "artist_id", "kind", unique=True
+        ),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    artist_id: Mapped[int] = mapped_column(ForeignKey("artists.id"))
+    kind: Mapped[str] = mapped_column()  # A key of `crud.ARTIST_URL_COLUMNS`
+    status: Mapped[str] = mapped_column()  # "found", "not_found" or "error"
+    url: Mapped[str | None] = mapped_column()
+    # Searches in a row that didn't find the URL
+    misses: Mapped[int] = mapped_column(default=0)
+    checked_at: Mapped[datetime.datetime] = mapped_column()
+    next_check_at: Mapped[datetime.datetime | None] = mapped_column()
+
 
 class Venue(Base):
     __tablename__ = "venues"
+    # Unique indexes rather than constraints: SQLite can't add constraints to existing
+    # tables, but can create indexes (see `concert_checker.app.migrations`).
+    __table_args__ = (Index("ix_venues_name_city", "name", "city", unique=True),)
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column()
     city: Mapped[str] = mapped_column()
@@ -28,6 +61,12 @@ class Venue(Base):
 
 class Concert(Base):
     __tablename__ = "concerts"
+    # We assume that an artist has only 1 show per day.
+    __table_args__ = (
+        Index("ix_concerts_artist_id_date", "artist_id", "date", unique=True),
+        # Listing concerts in chronological order (keyset pagination).
+        Index("ix_concerts_date_id", "date", "id"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     # TODO: have `date` and `time` as separate fields to avoid situation where we
     # compare a datetime with a date.
@@ -39,6 +78,11 @@ class Concert(Base):
         mapped_column()
     )  # URL of the page where the show details were found
     # TODO: add a `date_added` field to know when the show was added to the database.
+    # Set on insert and update, also by Core statements. Used as a version of the
+    # concerts (e.g. for ETags).
+    updated_at: Mapped[datetime.datetime | None] = mapped_column(
+        default=datetime.datetime.now, onupdate=datetime.datetime.now, index=True
+    )
 
     artist_id: Mapped[int] = mapped_column(ForeignKey("artists.id"))
     venue_id: Mapped[int | None] = mapped_column(ForeignKey("venues.id"))
@@ -51,5 +95,110 @@ class PageCache(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     url: Mapped[str] = mapped_column(unique=True)
     content_hash: Mapped[str | None] = mapped_column()
+    # HTTP validators, sent back as `If-None-Match`/`If-Modified-Since` to find out
+    # whether the page changed without rendering it.
+    etag: Mapped[str | None] = mapped_column()
+    last_modified: Mapped[str | None] = mapped_column()
     last_fetched_at: Mapped[datetime.datetime | None] = mapped_column()
     last_updated_at: Mapped[datetime.datetime | None] = mapped_column()
+
+
+class ArtistPage(Base):
+    """A page where a source found shows of an artist during its last extraction."""
+
+    __tablename__ = "artist_pages"
+    __table_args__ = (UniqueConstraint("artist_id", "source", "page_cache_id"),)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    artist_id: Mapped[int] = mapped_column(ForeignKey("artists.id"))
+    source: Mapped[str] = mapped_column()  # `Source.name`
+    page_cache_id: Mapped[int] = mapped_column(ForeignKey("page_caches.id"))
+    page_cache: Mapped["PageCache"] = relationship()
+
+
+class SourceSchedule(Base):
+    """When a source should next check an artist (see `common.scheduling`)."""
+
+    __tablename__ = "source_schedules"
+    __table_args__ = (
+        Index("ix_source_schedules_artist_source", "artist_id", "source", unique=True),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    artist_id: Mapped[int] = mapped_column(ForeignKey("artists.id"))
+    source: Mapped[str] = mapped_column()  # `Source.name`
+    # None: never checked, due straight away
+    next_check_at: Mapped[datetime.datetime | None] = mapped_column(index=True)
+    last_checked_at: Mapped[datetime.datetime | None] = mapped_column()
+    # Last check that added or updated shows
+    last_changed_at: Mapped[datetime.datetime | None] = mapped_column()
+
+
+class Job(Base):
+    """A check of an artist by a source, queued for the workers (see `worker`)."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_state_run_after", "state", "run_after"),)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # "<source>:<artist id>", or "<source>" for sources not bound to an artist
+    key: Mapped[str] = mapped_column(unique=True)
+    artist_id: Mapped[int | None] = mapped_column(ForeignKey("artists.id"))
+    source: Mapped[str] = mapped_column()  # `Source.name`
+    state: Mapped[str] = mapped_column()  # "pending", "running", "done" or "failed"
+    # Attempts since the job was queued
+    attempts: Mapped[int] = mapped_column(default=0)
+    # Pending jobs aren't claimed before this (retries are delayed)
+    run_after: Mapped[datetime.datetime] = mapped_column()
+    # The worker running the job, which holds it until the lease expires
+    worker: Mapped[str | None] = mapped_column()
+    lease_expires_at: Mapped[datetime.datetime | None] = mapped_column()
+    finished_at: Mapped[datetime.datetime | None] = mapped_column()
+    last_error: Mapped[str | None] = mapped_column()
+
+
+class ExtractionCache(Base):
+    """The output of an LLM extraction, keyed by model, prompt and input content."""
+
+    __tablename__ = "extraction_caches"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    key: Mapped[str] = mapped_column(unique=True)
+    model_name: Mapped[str] = mapped_column()
+    prompt_version: Mapped[str] = mapped_column()
+    output: Mapped[str] = mapped_column()  # JSON
+    created_at: Mapped[datetime.datetime] = mapped_column()
+    last_used_at: Mapped[datetime.datetime] = mapped_column(index=True)
+    hits: Mapped[int] = mapped_column(default=0)
+
+
+class MailboxSyncState(Base):
+    """Position of the last sync of an IMAP mailbox (see `tools.email`)."""
+
+    __tablename__ = "mailbox_sync_states"
+    __table_args__ = (
+        Index("ix_mailbox_sync_states_account", "host", "user", "mailbox", unique=True),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    host: Mapped[str] = mapped_column()
+    user: Mapped[str] = mapped_column()
+    mailbox: Mapped[str] = mapped_column()
+    uid_validity: Mapped[int] = mapped_column()
+    last_uid: Mapped[int] = mapped_column()
+    failed_uid: Mapped[int | None] = mapped_column()
+    fetch_attempts: Mapped[int | None] = mapped_column()
+    synced_at: Mapped[datetime.datetime] = mapped_column()
+
+
+class SeenEmail(Base):
+    """An email handed to the extraction, to skip its copies (see `email_dedup`)."""
+
+    __tablename__ = "seen_emails"
+    __table_args__ = (Index("ix_seen_emails_sender_seen_at", "sender", "seen_at"),)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    message_id: Mapped[str | None] = mapped_column(index=True)
+    sender: Mapped[str] = mapped_column()  # Lower-cased address of the sender
+    subject: Mapped[str] = mapped_column()
+    # Hash of the normalized body, without links
+    body_hash: Mapped[str] = mapped_column(index=True)
+    # Hash of the dates mentioned in the body: near-duplicates must share them
+    dates_hash: Mapped[str] = mapped_column()
+    # 64-bit SimHash of the body, signed to fit SQLite integers
+    simhash: Mapped[int] = mapped_column()
+    seen_at: Mapped[datetime.datetime] = mapped_column()
@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+
+
+class ByteLRUCache:
+    """An in-memory LRU cache of strings, bounded by their total size in bytes.
+
+    Entries also expire `ttl_seconds` after being stored, so the cache only
+    deduplicates work within a run and never serves stale content across runs.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size_bytes = 0
+        self._entries: OrderedDict[str, tuple[str, int, float]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, _, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        size = len(value.encode())
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            # Would evict everything else and still not fit.
+            return
+
+        self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
@@ -17,3 +17,147 @@ IMAP_TO_ADDRESSES = [
 IMAP_MAILBOXES = [
     m.strip() for m in os.environ.get("IMAP_MAILBOXES", "INBOX").split(",") if m.strip()
 ]
+# Emails fetched per IMAP command
+IMAP_FETCH_BATCH_SIZE = int(os.environ.get("IMAP_FETCH_BATCH_SIZE", "100"))
+# "text": only fetch the text part of emails (see BODYSTRUCTURE), "full": whole emails
+IMAP_FETCH_MODE = os.environ.get("IMAP_FETCH_MODE", "text")
+# Text parts are truncated beyond this size (huge HTML newsletters)
+IMAP_MAX_BODY_BYTES = int(os.environ.get("IMAP_MAX_BODY_BYTES", str(512 * 1024)))
+# How far back the first sync of a mailbox goes
+IMAP_INITIAL_SYNC_DAYS = int(os.environ.get("IMAP_INITIAL_SYNC_DAYS", "30"))
+# Syncs in which an email that can't be fetched is retried, before it's skipped
+IMAP_MAX_FETCH_ATTEMPTS = int(os.environ.get("IMAP_MAX_FETCH_ATTEMPTS", "3"))
+
+# Email extraction (see `concert_checker.sources.email`)
+# Drop emails that don't announce shows before the model sees them (see
+# `concert_checker.common.email_classifier`)
+EMAIL_PRECLASSIFIER_ENABLED = (
+    os.environ.get("EMAIL_PRECLASSIFIER_ENABLED", "true").lower() == "true"
+)
+EMAIL_EXTRACTION_CONCURRENCY = int(os.environ.get("EMAIL_EXTRACTION_CONCURRENCY", "8"))
+# Emails packed into a single model call (1: one call per email)
+EMAIL_EXTRACTION_BATCH_SIZE = int(os.environ.get("EMAIL_EXTRACTION_BATCH_SIZE", "1"))
+# Only emails shorter than this (in characters) are packed with others
+EMAIL_EXTRACTION_BATCH_MAX_CHARS = int(
+    os.environ.get("EMAIL_EXTRACTION_BATCH_MAX_CHARS", "6000")
+)
+
+# Scraping concurrency
+MAX_CONCURRENT_TASKS = int(os.environ.get("MAX_CONCURRENT_TASKS", "8"))
+MAX_CONCURRENT_TASKS_PER_SOURCE = int(
+    os.environ.get("MAX_CONCURRENT_TASKS_PER_SOURCE", "4")
+)
+
+# Adaptive scheduling of the checks (see `concert_checker.common.scheduling`)
+# Time between two cycles of `concert-checker schedule`
+SCHEDULER_TICK_SECONDS = float(os.environ.get("SCHEDULER_TICK_SECONDS", "600"))
+# Checks per cycle at most; the rest are done in the next cycles, most overdue first
+SCHEDULER_MAX_CHECKS_PER_CYCLE = int(
+    os.environ.get("SCHEDULER_MAX_CHECKS_PER_CYCLE", "200")
+)
+SCHEDULER_MIN_INTERVAL_SECONDS = float(
+    os.environ.get("SCHEDULER_MIN_INTERVAL_SECONDS", "3600")
+)
+SCHEDULER_MAX_INTERVAL_SECONDS = float(
+    os.environ.get("SCHEDULER_MAX_INTERVAL_SECONDS", str(7 * 24 * 3600))
+)
+# Artists are checked after this fraction of the time since their shows last changed
+SCHEDULER_CHANGE_AGE_FACTOR = float(
+    os.environ.get("SCHEDULER_CHANGE_AGE_FACTOR", "0.1")
+)
+# Intervals are randomly stretched or shrunk by up to this fraction
+SCHEDULER_JITTER = float(os.environ.get("SCHEDULER_JITTER", "0.1"))
+
+# Worker pool sharing a queue of checks (see `concert_checker.worker`)
+WORKER_PROCESSES = int(os.environ.get("WORKER_PROCESSES", "2"))
+# Jobs run at the same time by each worker process
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", "4"))
+# Time between two looks at the queue, when it's empty
+WORKER_POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", "5"))
+# Jobs of a worker that stopped renewing its leases (e.g. it crashed) are run by
+# another worker after this delay
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_DELAY_SECONDS = float(
+    os.environ.get("JOB_RETRY_BASE_DELAY_SECONDS", "60")
+)
+JOB_RETRY_MAX_DELAY_SECONDS = float(
+    os.environ.get("JOB_RETRY_MAX_DELAY_SECONDS", "3600")
+)
+
+# Searches of artist URLs (see `concert_checker.common.url_resolution`)
+URL_RESOLUTION_CONCURRENCY = int(os.environ.get("URL_RESOLUTION_CONCURRENCY", "4"))
+# URLs that weren't found are searched again after this delay, doubled after each miss
+URL_RECHECK_BASE_SECONDS = float(
+    os.environ.get("URL_RECHECK_BASE_SECONDS", str(24 * 3600))
+)
+URL_RECHECK_MAX_SECONDS = float(
+    os.environ.get("URL_RECHECK_MAX_SECONDS", str(30 * 24 * 3600))
+)
+
+# Headless browser pool (see `concert_checker.common.crawler_pool`)
+CRAWLER_POOL_BROWSERS = int(os.environ.get("CRAWLER_POOL_BROWSERS", "2"))
+CRAWLER_POOL_TABS_PER_BROWSER = int(
+    os.environ.get("CRAWLER_POOL_TABS_PER_BROWSER", "4")
+)
+CRAWLER_POOL_MAX_PAGES_PER_BROWSER = int(
+    os.environ.get("CRAWLER_POOL_MAX_PAGES_PER_BROWSER", "100")
+)
+
+# Politeness towards the websites we fetch (see `concert_checker.common.rate_limit`)
+# Requests per second to each registrable domain (e.g. songkick.com), per process
+RATE_LIMIT_REQUESTS_PER_SECOND = float(
+    os.environ.get("RATE_LIMIT_REQUESTS_PER_SECOND", "1")
+)
+# Requests sent back to back to a domain before the rate applies
+RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", "2"))
+# Rates of specific domains, e.g. "songkick.com=0.5 bandsintown.com=2"
+RATE_LIMIT_DOMAIN_RATES = {
+    d.strip(): float(r)
+    for d, _, r in (
+        i.partition("=")
+        for i in os.environ.get("RATE_LIMIT_DOMAIN_RATES", "songkick.com=0.5").split()
+    )
+}
+# Crawl-delays of robots.txt files are honored up to this value (0: ignored)
+RATE_LIMIT_MAX_CRAWL_DELAY_SECONDS = float(
+    os.environ.get("RATE_LIMIT_MAX_CRAWL_DELAY_SECONDS", "30")
+)
+# Pause of a domain answering 429 without a Retry-After, doubled while it keeps doing so
+RATE_LIMIT_BACKOFF_SECONDS = float(os.environ.get("RATE_LIMIT_BACKOFF_SECONDS", "30"))
+RATE_LIMIT_MAX_BACKOFF_SECONDS = float(
+    os.environ.get("RATE_LIMIT_MAX_BACKOFF_SECONDS", "600")
+)
+# Requests answered with 429 are sent again this many times
+RATE_LIMIT_MAX_RETRIES = int(os.environ.get("RATE_LIMIT_MAX_RETRIES", "2"))
+
+# In-run cache of fetched page content (see `concert_checker.tools.web`)
+PAGE_CONTENT_CACHE_MAX_BYTES = int(
+    os.environ.get("PAGE_CONTENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+PAGE_CONTENT_CACHE_TTL_SECONDS = float(
+    os.environ.get("PAGE_CONTENT_CACHE_TTL_SECONDS", "900")
+)
+
+# Page content given to the model (see `concert_checker.common.content_pruning`)
+# Only keep the parts of pages that are likely to hold shows
+PAGE_CONTENT_PRUNING_ENABLED = (
+    os.environ.get("PAGE_CONTENT_PRUNING_ENABLED", "true").lower() == "true"
+)
+# Tokens of each page given to the model at most, once pruned
+PAGE_CONTENT_TOKEN_BUDGET = int(os.environ.get("PAGE_CONTENT_TOKEN_BUDGET", "3000"))
+
+# Retries of LLM calls that are rate limited (see `concert_checker.common.llm_calls`)
+LLM_MAX_ATTEMPTS = int(os.environ.get("LLM_MAX_ATTEMPTS", "6"))
+LLM_RETRY_BASE_DELAY_SECONDS = float(
+    os.environ.get("LLM_RETRY_BASE_DELAY_SECONDS", "2")
+)
+LLM_RETRY_MAX_DELAY_SECONDS = float(os.environ.get("LLM_RETRY_MAX_DELAY_SECONDS", "60"))
+
+# Persistent cache of LLM extractions (see `concert_checker.common.llm_cache`)
+EXTRACTION_CACHE_TTL_SECONDS = float(
+    os.environ.get("EXTRACTION_CACHE_TTL_SECONDS", str(30 * 24 * 3600))
+)
+EXTRACTION_CACHE_MAX_ENTRIES = int(
+    os.environ.get("EXTRACTION_CACHE_MAX_ENTRIES", "10000")
+)
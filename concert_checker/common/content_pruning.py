@@ -0,0 +1,320 @@
+"""Pruning of page content to the parts that can hold shows, before the model reads it.
+
+Most of the markdown of a page is navigation, bios, discographies, merch, lyrics and
+cookie banners. Sending all of it to the model makes every extraction slower and more
+expensive, and doesn't help it find shows. Pages are therefore split into blocks
+(paragraphs, lists, tables, headings), and each block is scored from cheap local
+features:
+- dates (`DATE_PATTERN`),
+- tour cities and venue words (`concert_checker.common.gazetteer`),
+- links to ticketing platforms, and links to pages that may list shows ("Tour",
+  "Live"...), which the model may follow,
+- the heading of its section ("Tour dates" vs "Merch", "Fans also like"...). Only
+  recommendation rails outweigh a date and a place: their shows are other artists'.
+
+The best blocks are kept, in page order and along with their headings, until the page
+fits in `PAGE_CONTENT_TOKEN_BUDGET`. Each kept block records where it comes from in
+the original content. Pages where nothing looks like shows are only truncated.
+
+Run `benchmarks/bench_content_pruning.py` after changing a weight.
+"""
+
+import bisect
+import math
+import re
+from dataclasses import dataclass, field
+
+from concert_checker.common.constants import PAGE_CONTENT_TOKEN_BUDGET
+from concert_checker.common.gazetteer import (
+    CITY_PATTERN,
+    VENUE_PATTERN,
+    is_ticketing_link,
+)
+from concert_checker.common.rate_limit import registrable_domain
+from concert_checker.common.utils import DATE_PATTERN
+
+# Blocks scoring below this are dropped.
+MIN_BLOCK_SCORE = 1.5
+
+DATE_WEIGHT = 1.5
+MAX_DATES = 20
+PLACE_WEIGHT = 1.0
+MAX_PLACES = 20
+TICKETING_LINK_WEIGHT = 2.0
+TICKET_WORDS_WEIGHT = 1.0
+SHOW_LINK_WEIGHT = 1.5
+SHOW_SECTION_WEIGHT = 1.0
+OFF_TOPIC_SECTION_WEIGHT = -4.0
+
+# Rough size of a token, in characters.
+CHARS_PER_TOKEN = 4
+# Longer blocks (e.g. a whole page without blank lines) are split into lines.
+MAX_BLOCK_CHARS = 1500
+# Stands for the content that was skipped between two kept blocks.
+SKIPPED_MARKER = "[…]"
+
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+_LINE = re.compile(r"[^\n]*\n?")
+_LIST_ITEM = re.compile(r"^\s*(?:[*+-]|\d+[.)])\s")
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-{3,}")
+_URL = re.compile(r"https?://[^\s)>\]\"']+")
+_SHOW_WORDS = (
+    r"tour(?:s|née)?|shows?|concerts?|live|dates|events?|gigs?|agenda|calendar"
+)
+# Links whose text mentions shows, e.g. "[Tour](...)", "[See all dates](...)".
+_SHOW_LINK = re.compile(rf"\[[^\]]*\b(?:{_SHOW_WORDS})\b[^\]]*\]\(", re.IGNORECASE)
+_TICKET_WORDS = re.compile(
+    r"\b(?:tickets?|billets?|sold out|on sale|presale|pre-sale)\b", re.IGNORECASE
+)
+_SHOW_SECTION = re.compile(
+    rf"\b(?:{_SHOW_WORDS}|upcoming|on the road|en concert|termine)\b", re.IGNORECASE
+)
+# Headings of recommendation rails: their dates are other artists' shows.
+_OTHER_ARTISTS_SECTION = re.compile(
+    r"\b(?:similar artists|fans also (?:like|track)|you (?:may|might) also like"
+    r"|recommended|related|trending|popular)\b",
+    re.IGNORECASE,
+)
+# Headings of sections about something else than shows, on whole words ("Workshop"
+# isn't a shop). Headings that also mention shows ("Tour dates & merch") aren't.
+_OFF_TOPIC_SECTION = re.compile(
+    r"\b(?:news|newsletters?|sign up|cookies?|adverts?|advertisements?|sponsored"
+    r"|merch(?:andise)?|shop|store|lyrics|videos?|discography|bio(?:graphy)?|footer"
+    r"|follow us)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class Block:
+    """A paragraph, list item, table row or heading of a page: `content[start:end]`."""
+
+    start: int
+    end: int
+    text: str
+    is_heading: bool
+    # Index of the block that gives context to this one, kept along with it: the
+    # header of its table, or else the heading of its section.
+    context: int | None
+    score: float = 0.0
+
+
+@dataclass
+class PrunedContent:
+    text: str
+    # `(start, end)` of each kept block in the original content, in page order.
+    spans: list[tuple[int, int]]
+    original_tokens: int
+    tokens: int
+    # Offset in `text` of each span.
+    text_offsets: list[int] = field(default_factory=list)
+
+    def original_offset(self, offset: int) -> int:
+        """Map an offset in `text` to the offset of the same character in the original
+        content (offsets in a skipped marker map to the start of the next block)."""
+        i = max(bisect.bisect_right(self.text_offsets, offset) - 1, 0)
+        start, end = self.spans[i]
+        return min(start + max(offset - self.text_offsets[i], 0), end)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_blocks(content: str) -> list[Block]:
+    """Split markdown into headings, list items, table rows, and paragraphs (separated
+    by blank lines)."""
+    blocks: list[Block] = []
+    heading: int | None = None
+    # `(start, end)` of the lines of the current paragraph.
+    lines: list[tuple[int, int]] = []
+
+    def add(start: int, end: int, context: int | None):
+        blocks.append(Block(start, end, content[start:end], False, context))
+
+    def flush():
+        first_line = content[lines[0][0] : lines[0][1]] if lines else ""
+        if _LIST_ITEM.match(first_line):
+            # Items are scored on their own: a menu with a "Tour" link doesn't hold
+            # shows, the link does.
+            item_start = lines[0][0]
+            for (start, end), (_, previous_end) in zip(lines[1:], lines, strict=False):
+                if _LIST_ITEM.match(content[start:end]):
+                    add(item_start, previous_end, heading)
+                    item_start = start
+            add(item_start, lines[-1][1], heading)
+            lines.clear()
+        elif first_line.lstrip().startswith("|"):
+            # So are rows, with the header of the table.
+            context = heading
+            if len(lines) > 1 and _TABLE_SEPARATOR.match(
+                content[lines[1][0] : lines[1][1]]
+            ):
+                add(lines[0][0], lines[1][1], heading)
+                context = len(blocks) - 1
+                del lines[:2]
+            for start, end in lines:
+                add(start, end, context)
+            lines.clear()
+        # Oversized paragraphs (e.g. a page without blank lines) are split into runs
+        # of lines.
+        while lines:
+            start, end = lines[0]
+            taken = 1
+            while taken < len(lines) and lines[taken][1] - start <= MAX_BLOCK_CHARS:
+                end = lines[taken][1]
+                taken += 1
+            add(start, end, heading)
+            del lines[:taken]
+
+    for match in _LINE.finditer(content):
+        if not match[0]:
+            break
+        start, end = match.start(), match.start() + len(match[0].rstrip("\n"))
+        line = content[start:end]
+        if not line.strip():
+            flush()
+        elif _HEADING.match(line):
+            flush()
+            heading = len(blocks)
+            blocks.append(Block(start, end, line, True, None))
+        else:
+            lines.append((start, end))
+    flush()
+    return blocks
+
+
+def score_block(text: str, heading: str, page_domain: str) -> float:
+    """Score how likely a block is to hold shows, or lead to them.
+
+    Args:
+        text (str): The markdown of the block.
+        heading (str): The heading of the block's section ("" if there is none).
+        page_domain (str): The registrable domain of the page, whose own links don't
+            count as ticketing links (every link of a ticketing platform would).
+    """
+    score = 0.0
+    dates = {match[0].lower() for match in DATE_PATTERN.finditer(text)}
+    score += DATE_WEIGHT * min(len(dates), MAX_DATES)
+    places = set(CITY_PATTERN.findall(text)) | {
+        match[0].lower() for match in VENUE_PATTERN.finditer(text)
+    }
+    score += PLACE_WEIGHT * min(len(places), MAX_PLACES)
+    if any(
+        is_ticketing_link(url) and registrable_domain(url) != page_domain
+        for url in _URL.findall(text)
+    ):
+        score += TICKETING_LINK_WEIGHT
+    if _TICKET_WORDS.search(text):
+        score += TICKET_WORDS_WEIGHT
+    if _SHOW_LINK.search(text):
+        score += SHOW_LINK_WEIGHT
+    if heading and _OTHER_ARTISTS_SECTION.search(heading):
+        score += OFF_TOPIC_SECTION_WEIGHT
+    elif heading and _SHOW_SECTION.search(heading):
+        score += SHOW_SECTION_WEIGHT
+    elif heading and _OFF_TOPIC_SECTION.search(heading) and not (dates and places):
+        # A date and a place are stronger evidence than the heading.
+        score += OFF_TOPIC_SECTION_WEIGHT
+    return score
+
+
+def _section_heading(blocks: list[Block], i: int) -> str:
+    context = blocks[i].context
+    while context is not None and not blocks[context].is_heading:
+        context = blocks[context].context
+    return blocks[context].text if context is not None else ""
+
+
+def _truncate(content: str, token_budget: int) -> PrunedContent:
+    max_chars = token_budget * CHARS_PER_TOKEN
+    end = len(content)
+    if end > max_chars:
+        # Cut at the end of a line if possible.
+        end = content.rfind("\n", 0, max_chars)
+        if end <= 0:
+            end = max_chars
+    text = content[:end] + (f"\n\n{SKIPPED_MARKER}" if end < len(content) else "")
+    return PrunedContent(
+        text=text,
+        spans=[(0, end)],
+        original_tokens=estimate_tokens(content),
+        tokens=estimate_tokens(text),
+        text_offsets=[0],
+    )
+
+
+def prune_page_content(
+    content: str, url: str, token_budget: int = PAGE_CONTENT_TOKEN_BUDGET
+) -> PrunedContent:
+    """Keep the blocks of a page that are likely to hold shows, within a token budget.
+
+    Args:
+        content (str): The markdown of the page.
+        url (str): The URL of the page.
+        token_budget (int): The maximum number of tokens of the pruned content.
+
+    Returns:
+        PrunedContent: The kept blocks, in page order, separated by `SKIPPED_MARKER`
+            where content was dropped, and their offsets in `content`.
+    """
+    blocks = split_blocks(content)
+    page_domain = registrable_domain(url)
+    for i, block in enumerate(blocks):
+        if not block.is_heading:
+            heading = _section_heading(blocks, i)
+            block.score = score_block(block.text, heading, page_domain)
+
+    candidates = sorted(
+        (i for i, block in enumerate(blocks) if block.score >= MIN_BLOCK_SCORE),
+        key=lambda i: (-blocks[i].score, i),
+    )
+    if not candidates:
+        return _truncate(content, token_budget)
+
+    kept: set[int] = set()
+    used = 0
+    for i in candidates:
+        needed = [i]
+        context = blocks[i].context
+        while context is not None and context not in kept:
+            needed.append(context)
+            context = blocks[context].context
+        cost = sum(estimate_tokens(blocks[j].text) + 1 for j in needed)
+        if used + cost <= token_budget:
+            kept.update(needed)
+            used += cost
+    if not kept:
+        return _truncate(content, token_budget)
+
+    parts: list[str] = []
+    spans: list[tuple[int, int]] = []
+    text_offsets: list[int] = []
+    length = 0
+    previous: int | None = None
+    for i in sorted(kept):
+        block = blocks[i]
+        if previous is not None and i == previous + 1:
+            separator = content[blocks[previous].end : block.start]
+        elif i == 0:
+            separator = ""
+        elif previous is None:
+            separator = f"{SKIPPED_MARKER}\n\n"
+        else:
+            separator = f"\n\n{SKIPPED_MARKER}\n\n"
+        parts += [separator, block.text]
+        text_offsets.append(length + len(separator))
+        spans.append((block.start, block.end))
+        length += len(separator) + len(block.text)
+        previous = i
+    if previous != len(blocks) - 1:
+        parts.append(f"\n\n{SKIPPED_MARKER}")
+
+    text = "".join(parts)
+    return PrunedContent(
+        text=text,
+        spans=spans,
+        original_tokens=estimate_tokens(content),
+        tokens=estimate_tokens(text),
+        text_offsets=text_offsets,
+    )
@@ -0,0 +1,160 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import logfire
+from crawl4ai import AsyncWebCrawler
+from playwright.async_api import Error as PlaywrightError
+
+from concert_checker.common.constants import (
+    CRAWLER_POOL_BROWSERS,
+    CRAWLER_POOL_MAX_PAGES_PER_BROWSER,
+    CRAWLER_POOL_TABS_PER_BROWSER,
+)
+
+
+class _Browser:
+    """One headless browser of the pool, and its bookkeeping."""
+
+    def __init__(self):
+        self.crawler = AsyncWebCrawler()
+        self.started = False
+        self.active_leases = 0
+        self.pages_served = 0
+        self.retired = False
+
+    def is_healthy(self) -> bool:
+        if not self.started:
+            return True
+        if not self.crawler.ready:
+            return False
+        browser_manager = getattr(
+            self.crawler.crawler_strategy, "browser_manager", None
+        )
+        browser = getattr(browser_manager, "browser", None)
+        return browser is None or browser.is_connected()
+
+
+class CrawlerPool:
+    """A pool of long-lived headless browsers shared by every fetch in the process.
+
+    Launching Chromium is the most expensive part of fetching a page, so browsers are
+    started lazily and then reused. Each browser serves up to `tabs_per_browser`
+    concurrent pages, and is recycled once it has served `max_pages_per_browser` pages
+    (to keep memory leaks in check) or when it stops responding.
+
+    Usage:
+        async with get_crawler_pool().lease() as crawler:
+            result = await crawler.arun(url)
+    """
+
+    def __init__(
+        self,
+        browsers: int = CRAWLER_POOL_BROWSERS,
+        tabs_per_browser: int = CRAWLER_POOL_TABS_PER_BROWSER,
+        max_pages_per_browser: int = CRAWLER_POOL_MAX_PAGES_PER_BROWSER,
+    ):
+        self.tabs_per_browser = tabs_per_browser
+        self.max_pages_per_browser = max_pages_per_browser
+
+        self._browsers = [_Browser() for _ in range(browsers)]
+        self._slots = asyncio.Semaphore(browsers * tabs_per_browser)
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[AsyncWebCrawler]:
+        """Lease a tab on one of the pool's browsers for the duration of the block."""
+        async with self._slots:
+            browser = await self._acquire_browser()
+            try:
+                yield browser.crawler
+            finally:
+                await self._release_browser(browser)
+
+    async def close(self):
+        """Close every browser of the pool.
+
+        Browsers that are still leased are closed once their last lease is released.
+        """
+        async with self._lock:
+            self._closed = True
+            browsers, self._browsers = self._browsers, []
+            for browser in browsers:
+                browser.retired = True
+                if browser.active_leases == 0:
+                    await self._close_browser(browser)
+
+    async def _acquire_browser(self) -> _Browser:
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("The crawler pool is closed")
+            for i, browser in enumerate(self._browsers):
+                if not browser.is_healthy():
+                    logfire.warning("Replacing unhealthy browser")
+                    self._browsers[i] = self._retire(browser)
+                    if browser.active_leases == 0:
+                        await self._close_browser(browser)
+
+            # The slots semaphore guarantees that at least one browser has a free tab.
+            browser = min(self._browsers, key=lambda b: b.active_leases)
+            if not browser.started:
+                _ = await browser.crawler.start()
+                browser.started = True
+            browser.active_leases += 1
+            return browser
+
+    async def _release_browser(self, browser: _Browser):
+        async with self._lock:
+            browser.active_leases -= 1
+            browser.pages_served += 1
+            if (
+                not browser.retired
+                and browser in self._browsers
+                and browser.pages_served >= self.max_pages_per_browser
+            ):
+                logfire.info(
+                    "Recycling browser after {pages_served} pages",
+                    pages_served=browser.pages_served,
+                )
+                self._browsers[self._browsers.index(browser)] = self._retire(browser)
+
+            if browser.retired and browser.active_leases == 0:
+                await self._close_browser(browser)
+
+    def _retire(self, browser: _Browser) -> _Browser:
+        """Stop handing out `browser` and return its replacement.
+
+        The retired browser is closed once its last lease is released.
+        """
+        browser.retired = True
+        return _Browser()
+
+    async def _close_browser(self, browser: _Browser):
+        if not browser.started:
+            return
+        browser.started = False
+        try:
+            await browser.crawler.close()
+        except (PlaywrightError, OSError):
+            # e.g. the browser already crashed.
+            logfire.exception("Failed to close browser")
+
+
+_crawler_pool: CrawlerPool | None = None
+
+
+def get_crawler_pool() -> CrawlerPool:
+    """Return the process-wide crawler pool, creating it if needed."""
+    global _crawler_pool
+    if _crawler_pool is None:
+        _crawler_pool = CrawlerPool()
+    return _crawler_pool
+
+
+async def close_crawler_pool():
+    """Close the process-wide crawler pool, if it was ever used."""
+    global _crawler_pool
+    if _crawler_pool is not None:
+        pool, _crawler_pool = _crawler_pool, None
+        await pool.close()
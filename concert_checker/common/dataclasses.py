@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from datetime import date, datetime
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # AI? Is this `dataclasses` file really the best place where to put these "I/O"
 # dataclasses for agents?
@@ -34,6 +34,14 @@ class ArtistShows:
     shows: list[ShowDetails]
 
 
+@dataclass
+class EmailShows:
+    """The shows of one email of a batch, identified by its number in the prompt."""
+
+    email_number: int
+    artist_shows: ArtistShows | None
+
+
 @dataclass
 class EmailContent:
     subject: str
@@ -41,8 +49,33 @@ class EmailContent:
     to_addr: str
     date: str
     body: str
+    message_id: str = ""
+
+
+@dataclass
+class MailboxCursor:
+    """Position of the last sync of an IMAP mailbox."""
+
+    uid_validity: int
+    last_uid: int
+    # The email right after `last_uid`, if it couldn't be fetched, and in how many
+    # syncs in a row.
+    failed_uid: int | None = None
+    fetch_attempts: int = 0
+
+
+@dataclass(frozen=True)
+class EmailSignature:
+    """What identifies an email and its copies (see `common.email_dedup`)."""
+
+    message_id: str | None
+    sender: str
+    body_hash: str
+    dates_hash: str
+    simhash: int  # Signed 64-bit integer
+    word_count: int
 
 
 @dataclass
 class AgentDependency:
-    db: Session
+    db: AsyncSession
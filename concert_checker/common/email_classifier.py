@@ -0,0 +1,114 @@
+"""Local pre-classification of emails, to skip the ones that can't announce shows.
+
+Most newsletters are about merch, records, videos or streams, and don't need a model
+call to be told apart from show announcements. The classifier is a small linear model
+over deterministic features:
+- dates mentioned in the email,
+- venue words ("arena", "ballroom", "doors"...),
+- links to ticketing platforms,
+- weighted keywords ("presale" vs "vinyl", "tour" vs "stream"...).
+
+It is tuned for recall: missing a show costs more than an extra model call, so only
+emails with no sign of a show are dropped. Run `benchmarks/bench_email_classifier.py`
+after changing a weight.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+import logfire
+
+from concert_checker.common.dataclasses import EmailContent
+from concert_checker.common.gazetteer import VENUE_PATTERN, is_ticketing_link
+from concert_checker.common.utils import DATE_PATTERN
+
+# Emails scoring below this are not about shows.
+SHOW_SCORE_THRESHOLD = 1.5
+
+DATE_WEIGHT = 1.5
+MAX_DATES = 4
+VENUE_WEIGHT = 1.0
+MAX_VENUES = 2
+TICKETING_LINK_WEIGHT = 2.5
+
+KEYWORD_WEIGHTS: dict[str, float] = {
+    # Shows
+    r"\btour(?:s|ing|née)?\b": 2.0,
+    r"\btickets?\b|\bbillets?\b": 1.5,
+    r"\bpre-?sale\b": 2.0,
+    r"\b(?:on|general) sale\b|\ben vente\b": 1.5,
+    r"\bsold out\b": 1.5,
+    r"\b(?:shows?|concerts?|gigs?|live|dj set|residency)\b": 1.0,
+    r"\bfestivals?\b|\blineup\b": 1.5,
+    r"\b(?:headlin\w+|support(?:ing)?|special guests?|opening for)\b": 1.0,
+    r"\b(?:dates?|tonight|this (?:week|saturday|friday))\b": 1.0,
+    r"\b(?:rescheduled|postponed|moved|upgraded|added)\b": 0.5,
+    # Everything else
+    r"\bmerch(?:andise)?\b": -2.0,
+    r"\b(?:vinyl|cassette|cd|lp|box set|test pressing|reissue|remaster\w*)\b": -1.5,
+    r"\bpre-?order\b": -1.5,
+    r"\b(?:album|single|ep|song|record|remix(?:es)?|demos?)\b": -0.5,
+    r"\b(?:stream(?:s|ing)?|listen(?:ing|ers)?|spotify|apple music|bandcamp)\b": -1.0,
+    r"\b(?:video|youtube|netflix|documentary|podcast|instagram)\b": -1.0,
+    r"\b(?:store|shop|t-?shirts?|hoodie|tote bag|posters?|prints?|gift cards?)\b": -1.5,
+    r"\b(?:\d+% off|discount|free shipping|checkout|shipped|order #?\d+)\b": -1.5,
+    r"\b(?:password|refund|survey|membership|auction)\b": -1.5,
+}
+_KEYWORDS = [
+    (re.compile(pattern, re.IGNORECASE), weight)
+    for pattern, weight in KEYWORD_WEIGHTS.items()
+]
+_URL = re.compile(r"https?://[^\s)>\]\"']+")
+
+
+@dataclass
+class EmailClassification:
+    is_show: bool
+    score: float
+    # Features that contributed to the score, e.g. ["2 date(s)", "tour"]
+    reasons: list[str] = field(default_factory=list)
+
+
+def classify_email(email: EmailContent) -> EmailClassification:
+    """Tell whether an email may announce shows, from cheap local features."""
+    text = f"{email.subject}\n{email.body}"
+    score = 0.0
+    reasons: list[str] = []
+
+    if dates := {match[0].lower() for match in DATE_PATTERN.finditer(text)}:
+        score += DATE_WEIGHT * min(len(dates), MAX_DATES)
+        reasons.append(f"{len(dates)} date(s)")
+    if venues := {match[0].lower() for match in VENUE_PATTERN.finditer(text)}:
+        score += VENUE_WEIGHT * min(len(venues), MAX_VENUES)
+        reasons.append(f"venue: {', '.join(sorted(venues))}")
+    if any(is_ticketing_link(url) for url in _URL.findall(text)):
+        score += TICKETING_LINK_WEIGHT
+        reasons.append("ticketing link")
+    for pattern, weight in _KEYWORDS:
+        if match := pattern.search(text):
+            score += weight
+            reasons.append(f"{match[0].lower()} ({weight:+g})")
+
+    return EmailClassification(
+        is_show=score >= SHOW_SCORE_THRESHOLD, score=score, reasons=reasons
+    )
+
+
+def drop_non_show_emails(emails: list[EmailContent]) -> list[EmailContent]:
+    """Drop the emails that don't announce shows, logging each decision."""
+    show_emails: list[EmailContent] = []
+    for email in emails:
+        classification = classify_email(email)
+        # Logged at info level when dropped, to audit the emails that were missed.
+        log = logfire.debug if classification.is_show else logfire.info
+        log(
+            "{decision} email {subject!r} from {from_addr} (score {score:.1f}: {reasons})",
+            decision="Keeping" if classification.is_show else "Dropping",
+            subject=email.subject,
+            from_addr=email.from_addr,
+            score=classification.score,
+            reasons=", ".join(classification.reasons),
+        )
+        if classification.is_show:
+            show_emails.append(email)
+    return show_emails
@@ -0,0 +1,148 @@
+"""Detection of copies of emails that were already extracted.
+
+The same newsletter reaches us several times: sent to several aliases, filed in
+several folders, or re-sent with new tracking links and unsubscribe tokens. Emails are
+compared on their Message-ID, on a hash of their normalized body, and, to catch
+near-duplicates, on a SimHash of that body against the recent emails of the same
+sender. Near-duplicates must also mention the exact same dates, so that a newsletter
+re-sent with an added show is still extracted.
+"""
+
+import hashlib
+import re
+from datetime import datetime, timedelta
+from email.utils import parseaddr
+
+import logfire
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from concert_checker.app.async_crud import create_seen_email, find_seen_emails
+from concert_checker.app.models import SeenEmail
+from concert_checker.common.dataclasses import EmailContent, EmailSignature
+from concert_checker.common.fingerprint import normalize_text
+from concert_checker.common.utils import DATE_PATTERN
+
+# Up to this many differing bits out of 64, two bodies are near-duplicates. A one-word
+# change flips ~5 bits on a 100-word email, ~2 on a 1000-word one.
+NEAR_DUPLICATE_MAX_DISTANCE = 6
+# Near-duplicates are looked for among the emails of the sender in this window.
+NEAR_DUPLICATE_WINDOW = timedelta(days=90)
+# SimHash isn't reliable on short texts, which are only compared on their hash.
+NEAR_DUPLICATE_MIN_WORDS = 50
+
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_URL = re.compile(r"\b(?:https?://|mailto:|www\.)\S+", re.IGNORECASE)
+# Footer lines that carry per-recipient tokens.
+_RECIPIENT_LINES = re.compile(
+    r"unsubscribe|view (this email )?in (your |a )?browser|manage (your )?preferences"
+    r"|update (your )?(preferences|profile)|was sent to|you are receiving",
+    re.IGNORECASE,
+)
+_WORD = re.compile(r"\w+")
+
+
+def _body_text(body: str) -> str:
+    """Normalize a body, dropping links and recipient-specific lines."""
+    text = _MARKDOWN_LINK.sub(r"\1", normalize_text(body))
+    text = _URL.sub("", text)
+    lines = [line for line in text.splitlines() if not _RECIPIENT_LINES.search(line)]
+    return " ".join(" ".join(lines).lower().split())
+
+
+def simhash(words: list[str]) -> int:
+    """64-bit SimHash of the 3-grams of a list of words."""
+    shingles = [" ".join(words[i : i + 3]) for i in range(max(len(words) - 2, 1))]
+    weights = [0] * 64
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest)
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def email_signature(email: EmailContent) -> EmailSignature:
+    text = _body_text(email.body)
+    dates = sorted({match[0].lower() for match in DATE_PATTERN.finditer(text)})
+    words = _WORD.findall(text)
+    return EmailSignature(
+        message_id=email.message_id.strip() or None,
+        sender=parseaddr(email.from_addr)[1].lower() or email.from_addr,
+        body_hash=hashlib.sha256(text.encode()).hexdigest(),
+        dates_hash=hashlib.sha256("\n".join(dates).encode()).hexdigest(),
+        simhash=_to_signed(simhash(words)),
+        word_count=len(words),
+    )
+
+
+def is_duplicate(signature: EmailSignature, seen_email: SeenEmail) -> bool:
+    if signature.message_id and signature.message_id == seen_email.message_id:
+        return True
+    if signature.body_hash == seen_email.body_hash:
+        return True
+    distance = (signature.simhash ^ seen_email.simhash) & ((1 << 64) - 1)
+    return (
+        signature.word_count >= NEAR_DUPLICATE_MIN_WORDS
+        and signature.dates_hash == seen_email.dates_hash
+        and distance.bit_count() <= NEAR_DUPLICATE_MAX_DISTANCE
+    )
+
+
+async def drop_seen_emails(
+    db: AsyncSession, emails: list[EmailContent]
+) -> list[EmailContent]:
+    """Drop the copies of emails seen before (or earlier in `emails`).
+
+    The emails that are kept must be recorded with `record_seen_emails` once they are
+    extracted: if the extraction fails, they are kept again on the next run.
+    """
+    new_emails: list[EmailContent] = []
+    new_seen_emails: list[SeenEmail] = []
+    for email in emails:
+        signature = email_signature(email)
+        candidates = await find_seen_emails(
+            db, signature, since=datetime.now() - NEAR_DUPLICATE_WINDOW
+        )
+        # Same candidates as `find_seen_emails`, among the emails kept so far.
+        candidates += [
+            seen
+            for seen in new_seen_emails
+            if seen.sender == signature.sender
+            or seen.body_hash == signature.body_hash
+            or (signature.message_id and seen.message_id == signature.message_id)
+        ]
+        if duplicate := next(
+            (seen for seen in candidates if is_duplicate(signature, seen)), None
+        ):
+            logfire.debug(
+                "Skipping {subject!r}, a copy of {original!r}",
+                subject=email.subject,
+                original=duplicate.subject,
+            )
+            continue
+        new_emails.append(email)
+        # Not added to the session: only compared with the next emails.
+        new_seen_emails.append(
+            SeenEmail(
+                message_id=signature.message_id,
+                sender=signature.sender,
+                subject=email.subject,
+                body_hash=signature.body_hash,
+                dates_hash=signature.dates_hash,
+                simhash=signature.simhash,
+            )
+        )
+
+    if skipped := len(emails) - len(new_emails):
+        logfire.info("Skipped {skipped} duplicate email(s)", skipped=skipped)
+    return new_emails
+
+
+async def record_seen_emails(db: AsyncSession, emails: list[EmailContent]):
+    """Record emails as seen, so that their copies are dropped from now on."""
+    for email in emails:
+        _ = await create_seen_email(db, email_signature(email), email.subject)
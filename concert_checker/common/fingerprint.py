@@ -0,0 +1,201 @@
+"""Stable fingerprints of page content.
+
+Hashing the raw markdown of a page doesn't tell whether its shows changed: ads,
+timestamps, "fans also like" rails and tracking query strings change on every load.
+Pages are therefore normalized first, and only the sections that can hold shows are
+hashed.
+"""
+
+import hashlib
+import re
+from collections.abc import Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from concert_checker.common.utils import DATE_PATTERN
+
+_TRACKING_PARAMS = re.compile(
+    r"^(utm_\w+|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|_ga|_gl|igshid|si|ref|ref_src"
+    r"|referrer|source|campaign|affiliate|aff_id|cb|cachebuster|_|ts|timestamp"
+    r"|session|sessionid|sid)$",
+    re.IGNORECASE,
+)
+
+_MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MARKDOWN_LINK_URL = re.compile(r"\]\((<?)([^)\s>]+)(>?)((?:\s+\"[^\"]*\")?)\)")
+_BARE_URL = re.compile(r"(?<![(<])\bhttps?://[^\s)>\]]+")
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+
+# Tokens that are unique per page load: nonces, session ids, cache busters...
+_OPAQUE_TOKEN = re.compile(
+    r"\b(?:[0-9a-f]{24,}|(?=\w*[A-Z])(?=\w*[a-z])(?=\w*\d)[A-Za-z0-9_]{20,})\b"
+)
+_CLOCK_TIME = re.compile(
+    r"\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[ap]\.?m\.?)?\b", re.IGNORECASE
+)
+
+_VOLATILE_LINES = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
+        r"\b\d+\s+(seconds?|minutes?|hours?|days?|weeks?)\s+ago\b",
+        r"^\W*(last\s+)?(updated|refreshed|generated)\b",
+        r"^\W*(advertisement|sponsored|ad)\W*$",
+        # Cookie banners, but not the shows of e.g. "Milk & Cookies".
+        (
+            r"\b(?:uses?|utilise)\s+(?:des\s+)?cookies\b"
+            r"|\b(?:accept|reject)(?:\s+all)?\s+cookies\b"
+            r"|\bcookies?\s+(?:settings|policy|preferences|consent)\b"
+        ),
+        r"\b[\d,.]+k?\s+(people|fans|users)\s+(are\s+)?(going|interested|tracking)\b",
+        r"\b(tracking|trackers?)\b.*\b[\d,.]+k?\b",
+        r"^\W*(skip to (main )?content|back to top)\W*$",
+    ]
+]
+
+# Headings of sections that usually don't hold the artist's own shows. Matched on
+# whole words ("Workshop" isn't a shop). A heading can also mention shows ("Tour dates
+# & merch"): sections are only dropped if they don't contain any date.
+VOLATILE_SECTIONS = re.compile(
+    r"\b(similar artists|fans also (like|track)|you (may|might) also like|recommended"
+    r"|related|trending|popular|news|newsletters?|sign up|cookies?|adverts?"
+    r"|advertisements?|sponsored|merch(andise)?|shop|lyrics|videos?|discography"
+    r"|footer|follow us)\b",
+    re.IGNORECASE,
+)
+
+
+def canonicalize_url(url: str) -> str:
+    """Drop fragments and tracking parameters, and normalize what's left of a URL."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(key)
+    )
+    path = (parts.path.rstrip("/") or "/") if parts.netloc else parts.path
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), "")
+    )
+
+
+def _canonicalize_links(text: str) -> str:
+    text = _MARKDOWN_IMAGE.sub("", text)
+    text = _MARKDOWN_LINK_URL.sub(
+        lambda m: f"]({m[1]}{canonicalize_url(m[2])}{m[3]})", text
+    )
+    return _BARE_URL.sub(lambda m: canonicalize_url(m[0]), text)
+
+
+def _normalize_lines(text: str) -> list[str]:
+    lines: list[str] = []
+    for line in text.splitlines():
+        if any(pattern.search(line) for pattern in _VOLATILE_LINES):
+            continue
+        line = _OPAQUE_TOKEN.sub("", line)
+        line = re.sub(r"\s+", " ", line).strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _split_sections(lines: list[str]) -> list[tuple[str, list[str]]]:
+    """Split markdown lines into `(heading, lines)` sections."""
+    sections: list[tuple[str, list[str]]] = [("", [])]
+    for line in lines:
+        if match := _HEADING.match(line):
+            sections.append((match[1], [line]))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _keep_event_sections(lines: list[str]) -> list[str]:
+    """Keep the sections that look like they contain shows (generic rule).
+
+    Sections with a date are always kept, whatever their heading. Falls back to every
+    non-volatile section if no section mentions a date, so that changes to pages
+    without any show are still detected.
+    """
+    sections = _split_sections(lines)
+    event_sections = [
+        section_lines
+        for _, section_lines in sections
+        if any(DATE_PATTERN.search(line) for line in section_lines)
+    ]
+    if not event_sections:
+        event_sections = [
+            section_lines
+            for heading, section_lines in sections
+            if not VOLATILE_SECTIONS.search(heading)
+        ]
+    return [line for section_lines in event_sections for line in section_lines]
+
+
+def _songkick_rule(lines: list[str]) -> list[str]:
+    """Songkick calendars: only keep the "Upcoming concerts" section(s).
+
+    Past concerts only move when an upcoming concert becomes a past one, which also
+    changes the upcoming section.
+    """
+    kept: list[str] = []
+    in_upcoming = False
+    for heading, section_lines in _split_sections(lines):
+        if heading:
+            in_upcoming = bool(
+                re.search(r"upcoming|tour dates", heading, re.IGNORECASE)
+            ) or (
+                in_upcoming
+                and not re.search(r"past|previous", heading, re.IGNORECASE)
+                and not VOLATILE_SECTIONS.search(heading)
+            )
+        if in_upcoming:
+            # The number of concerts in the heading is redundant with the list itself.
+            kept.extend(re.sub(r"\(\d+\)", "", line).strip() for line in section_lines)
+
+    return kept or _keep_event_sections(lines)
+
+
+# Rules are looked up by domain suffix, e.g. "songkick.com" also covers
+# "www.songkick.com".
+DOMAIN_RULES: dict[str, Callable[[list[str]], list[str]]] = {
+    "songkick.com": _songkick_rule,
+}
+
+
+def _rule_for_url(url: str) -> Callable[[list[str]], list[str]]:
+    host = urlsplit(url).hostname or ""
+    for domain, rule in DOMAIN_RULES.items():
+        if host == domain or host.endswith(f".{domain}"):
+            return rule
+    return _keep_event_sections
+
+
+def normalize_text(content: str) -> str:
+    """Normalize markdown without dropping any section.
+
+    Removes images, tracking parameters, per-load tokens and volatile lines, and
+    collapses whitespace. Used for content that isn't split into sections, such as
+    emails.
+    """
+    return "\n".join(_normalize_lines(_canonicalize_links(content)))
+
+
+def normalize_page_content(content: str, url: str) -> str:
+    """Reduce the markdown of a page to the parts that can hold shows.
+
+    Images, tracking parameters, per-load tokens, clock times and volatile lines (ads,
+    "updated 3 minutes ago", cookie banners, "1.2k fans tracking"...) are removed, then
+    the domain's rule (or the generic one) picks the event-bearing sections.
+    """
+    text = _canonicalize_links(content)
+    text = _CLOCK_TIME.sub("", text)
+    lines = _normalize_lines(text)
+    return "\n".join(_rule_for_url(url)(lines))
+
+
+def content_fingerprint(content: str, url: str) -> str:
+    """Return a hash of the page content that is stable across reloads."""
+    return hashlib.sha256(normalize_page_content(content, url).encode()).hexdigest()
@@ -0,0 +1,98 @@
+"""Words and places that give shows away: venues, tour cities and ticketing links.
+
+Shared by the local classifiers that decide what is worth sending to the model (see
+`concert_checker.common.email_classifier` and
+`concert_checker.common.content_pruning`).
+"""
+
+import re
+from urllib.parse import urlsplit
+
+# Registrable domains (or their prefix) of ticketing and event platforms.
+TICKETING_DOMAINS = (
+    "axs.com",
+    "bandsintown.com",
+    "dice.fm",
+    "etix.com",
+    "eventbrite.",
+    "eventim.",
+    "fnacspectacles.com",
+    "gigantic.com",
+    "livenation.",
+    "ra.co",
+    "seated.com",
+    "seetickets.",
+    "shotgun.live",
+    "skiddle.com",
+    "songkick.com",
+    "stubhub.",
+    "ticketmaster.",
+    "ticketweb.",
+    "tixr.com",
+    "twickets.live",
+    "vividseats.com",
+)
+# Paths of any website that sell tickets (e.g. festival and venue websites).
+_TICKETING_PATH = re.compile(
+    r"/(tickets?|billetterie|billets|events?)\b", re.IGNORECASE
+)
+
+VENUE_PATTERN = re.compile(
+    r"\b(arena|ballroom|theat(?:re|er)|hall|stadium|amphitheat(?:re|er)|club|academy"
+    r"|palace|roundhouse|zénith|zenith|main ?stage|box office|doors)\b",
+    re.IGNORECASE,
+)
+
+# Cities that most tours go through. Names that are also common words ("Nice",
+# "Reading") are left out.
+CITIES = (
+    # North America
+    "Atlanta", "Austin", "Baltimore", "Boston", "Brooklyn", "Calgary", "Charlotte",
+    "Chicago", "Cincinnati", "Cleveland", "Columbus", "Dallas", "Denver", "Detroit",
+    "Edmonton", "Houston", "Indianapolis", "Kansas City", "Las Vegas", "Los Angeles",
+    "Louisville", "Memphis", "Mexico City", "Miami", "Milwaukee", "Minneapolis",
+    "Montreal", "Montréal", "Nashville", "New Orleans", "New York", "Oakland",
+    "Orlando", "Ottawa", "Philadelphia", "Phoenix", "Pittsburgh", "Portland",
+    "Quebec", "Québec", "Raleigh", "Sacramento", "Salt Lake City", "San Antonio",
+    "San Diego", "San Francisco", "Seattle", "St. Louis", "St Louis", "Tampa",
+    "Toronto", "Tucson", "Vancouver", "Washington", "Winnipeg",
+    # Europe
+    "Amsterdam", "Antwerp", "Athens", "Barcelona", "Belfast", "Berlin", "Bilbao",
+    "Birmingham", "Bologna", "Bordeaux", "Brighton", "Bristol", "Brussels",
+    "Bruxelles", "Budapest", "Cardiff", "Cologne", "Köln", "Copenhagen", "Dublin",
+    "Düsseldorf", "Edinburgh", "Frankfurt", "Geneva", "Genève", "Ghent", "Glasgow",
+    "Gothenburg", "Hamburg", "Helsinki", "Istanbul", "Kraków", "Krakow", "Leeds",
+    "Leipzig", "Lille", "Lisbon", "Lisboa", "Liverpool", "Ljubljana", "London",
+    "Lyon", "Madrid", "Manchester", "Marseille", "Milan", "Milano", "Munich",
+    "München", "Nantes", "Newcastle", "Nottingham", "Oslo", "Paris", "Porto",
+    "Prague", "Praha", "Reykjavik", "Riga", "Rome", "Roma", "Rotterdam", "Sheffield",
+    "Sofia", "Stockholm", "Strasbourg", "Stuttgart", "Tallinn", "Tilburg",
+    "Toulouse", "Utrecht", "Valencia", "Vienna", "Wien", "Vilnius", "Warsaw",
+    "Warszawa", "Zagreb", "Zurich", "Zürich",
+    # Elsewhere
+    "Auckland", "Bangkok", "Beijing", "Bogotá", "Bogota", "Brisbane", "Buenos Aires",
+    "Cape Town", "Hong Kong", "Jakarta", "Johannesburg", "Kuala Lumpur", "Lima",
+    "Manila", "Melbourne", "Mumbai", "Osaka", "Perth", "Rio de Janeiro", "Santiago",
+    "São Paulo", "Sao Paulo", "Seoul", "Shanghai", "Singapore", "Sydney", "Taipei",
+    "Tel Aviv", "Tokyo", "Wellington",
+)  # fmt: skip
+
+# Case sensitive: cities are capitalized, words that look like them usually aren't.
+CITY_PATTERN = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(city) for city in sorted(CITIES, key=len, reverse=True))
+    + r")\b"
+)
+
+
+def is_ticketing_link(url: str) -> bool:
+    """Whether a URL points to a ticketing platform, or to a ticket sales page."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    host = (parts.hostname or "").removeprefix("www.")
+    return any(
+        host == domain or host.startswith(domain) or f".{domain}" in f".{host}"
+        for domain in TICKETING_DOMAINS
+    ) or bool(_TICKETING_PATH.search(parts.path))
@@ -0,0 +1,87 @@
+import httpx
+
+from concert_checker.common.constants import RATE_LIMIT_MAX_RETRIES
+from concert_checker.common.rate_limit import DomainRateLimiter
+
+# Some sites reject requests that don't look like they come from a browser.
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/131.0.0.0 Safari/537.36"
+)
+
+# Requests carrying this extension bypass the rate limiter (robots.txt lookups).
+_NOT_RATE_LIMITED = "concert_checker.not_rate_limited"
+
+_http_client: httpx.AsyncClient | None = None
+_rate_limiter: DomainRateLimiter | None = None
+
+
+async def _fetch_robots_txt(url: str) -> str | None:
+    response = await get_http_client().get(url, extensions={_NOT_RATE_LIMITED: True})
+    return response.text if response.is_success else None
+
+
+def get_rate_limiter() -> DomainRateLimiter:
+    """Return the process-wide rate limiter of requests to websites.
+
+    It is kept across runs, so that domains that throttled us stay paused.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = DomainRateLimiter(
+            fetch_robots_txt=_fetch_robots_txt, user_agent=USER_AGENT
+        )
+    return _rate_limiter
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Sends each request (redirects included) through the rate limiter of its domain,
+    and sends it again when the domain throttled it."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.extensions.get(_NOT_RATE_LIMITED):
+            return await self._transport.handle_async_request(request)
+
+        url = str(request.url)
+        limiter = get_rate_limiter()
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            await limiter.acquire(url)
+            response = await self._transport.handle_async_request(request)
+            throttled = limiter.record_response(
+                url, response.status_code, response.headers
+            )
+            if not throttled or attempt == RATE_LIMIT_MAX_RETRIES:
+                break
+            await response.aclose()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client, creating it if needed.
+
+    Used for plain HTTP requests that don't need a browser (conditional requests, JSON
+    endpoints, etc.). Requests are rate limited per domain (see `get_rate_limiter`).
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            timeout=httpx.Timeout(20.0),
+            transport=RateLimitedTransport(httpx.AsyncHTTPTransport()),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the process-wide HTTP client, if it was ever used."""
+    global _http_client
+    if _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
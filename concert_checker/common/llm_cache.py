@@ -0,0 +1,121 @@
+"""Persistent memoization of LLM extractions.
+
+An extraction is keyed by the model, the version of the prompt and the normalized
+content given to the model. Re-running a cycle over inputs that were already extracted
+therefore makes no model call, until the entry expires.
+
+Prompts give the model the current date, to tell upcoming shows from past ones: shows
+that have passed since an extraction are dropped from its cached output. Years the
+model guessed are kept, as they were guessed closer to when the content was written.
+"""
+
+import hashlib
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import logfire
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from concert_checker.app.async_crud import (
+    create_extraction_cache,
+    evict_extraction_caches,
+    get_extraction_cache,
+)
+from concert_checker.common.constants import (
+    EXTRACTION_CACHE_MAX_ENTRIES,
+    EXTRACTION_CACHE_TTL_SECONDS,
+    LLM_MODEL_NAME,
+)
+from concert_checker.common.dataclasses import ArtistShows, ShowDetails
+
+
+@dataclass
+class ExtractionCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+# Counters for the current process, logged at the end of each run.
+extraction_cache_stats = ExtractionCacheStats()
+
+
+def extraction_cache_key(model_name: str, prompt_version: str, content: str) -> str:
+    payload = json.dumps([model_name, prompt_version, content])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _is_past(show: ShowDetails, today: date) -> bool:
+    show_date = show.date.date() if isinstance(show.date, datetime) else show.date
+    # Dates the model couldn't parse are kept.
+    return isinstance(show_date, date) and show_date < today
+
+
+def drop_past_shows(output: Any, today: date) -> Any:
+    """Drop the shows of an extraction output that are before `today`."""
+    if isinstance(output, ArtistShows):
+        return ArtistShows(
+            artist_name=output.artist_name, shows=drop_past_shows(output.shows, today)
+        )
+    if isinstance(output, list):
+        return [
+            item
+            for item in output
+            if not (isinstance(item, ShowDetails) and _is_past(item, today))
+        ]
+    return output
+
+
+async def cached_extraction[T](
+    db: AsyncSession,
+    prompt_version: str,
+    content: str,
+    output_type: Any,
+    extract: Callable[[], Awaitable[T]],
+    model_name: str = LLM_MODEL_NAME,
+) -> T:
+    """Return the cached output of an extraction, or run it and cache its output.
+
+    Args:
+        db (AsyncSession): The database session holding the cache.
+        prompt_version (str): Identifies the prompt (and its version). Must change
+            whenever the prompt changes in a way that affects the output.
+        content (str): The normalized input content given to the model.
+        output_type (Any): The type of the output, used to (de)serialize it.
+        extract (Callable[[], Awaitable[T]]): Runs the extraction on a cache miss.
+        model_name (str): The model running the extraction.
+
+    Returns:
+        T: The output of the extraction.
+    """
+    adapter = TypeAdapter(output_type)
+    now = datetime.now()
+    key = extraction_cache_key(model_name, prompt_version, content)
+    ttl = timedelta(seconds=EXTRACTION_CACHE_TTL_SECONDS)
+
+    entry = await get_extraction_cache(db, key)
+    if entry is not None and entry.created_at >= now - ttl:
+        extraction_cache_stats.hits += 1
+        entry.hits += 1
+        entry.last_used_at = now
+        logfire.debug(
+            "Extraction cache hit for {prompt_version}", prompt_version=prompt_version
+        )
+        return drop_past_shows(adapter.validate_json(entry.output), now.date())
+
+    extraction_cache_stats.misses += 1
+    output = await extract()
+
+    if entry is not None:
+        # Expired: refresh it in place.
+        entry.output = adapter.dump_json(output).decode()
+        entry.created_at = entry.last_used_at = now
+    else:
+        _ = await create_extraction_cache(
+            db, key, model_name, prompt_version, adapter.dump_json(output).decode()
+        )
+        _ = await evict_extraction_caches(db, now - ttl, EXTRACTION_CACHE_MAX_ENTRIES)
+    return output
@@ -0,0 +1,172 @@
+"""Resilient calls to LLM providers.
+
+Providers throttle bursts of requests (HTTP 429) and are sometimes briefly
+overloaded (5xx). `run_with_retries` retries those calls with exponential backoff, and
+`MicroBatcher` groups concurrent extraction requests into fewer, larger calls.
+"""
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable, Mapping
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import partial
+
+import logfire
+from pydantic_ai.exceptions import ModelHTTPError
+
+from concert_checker.common.constants import (
+    LLM_MAX_ATTEMPTS,
+    LLM_RETRY_BASE_DELAY_SECONDS,
+    LLM_RETRY_MAX_DELAY_SECONDS,
+)
+
+# Rate limited, or temporarily unavailable (529: overloaded).
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 529})
+
+
+def retry_after_seconds(headers: Mapping[str, str] | None) -> float | None:
+    """Parse the Retry-After header of a response (seconds or HTTP date)."""
+    headers = {name.lower(): value for name, value in (headers or {}).items()}
+    if not (value := headers.get("retry-after")):
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(retry_at.tzinfo)).total_seconds(), 0.0)
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float = LLM_RETRY_BASE_DELAY_SECONDS,
+    max_delay: float = LLM_RETRY_MAX_DELAY_SECONDS,
+) -> float:
+    """Exponential backoff with jitter, so that throttled callers don't retry in sync."""
+    return random.uniform(0.5, 1.0) * min(max_delay, base_delay * 2**attempt)
+
+
+async def run_with_retries[T](
+    call: Callable[[], Awaitable[T]],
+    max_attempts: int = LLM_MAX_ATTEMPTS,
+    base_delay: float = LLM_RETRY_BASE_DELAY_SECONDS,
+    max_delay: float = LLM_RETRY_MAX_DELAY_SECONDS,
+) -> T:
+    """Run `call`, retrying when the provider is rate limited or unavailable.
+
+    The provider's Retry-After header is honored when present (up to `max_delay`),
+    otherwise attempts are spaced with exponential backoff.
+
+    Raises:
+        ModelHTTPError: If the call still fails after `max_attempts`, or fails with a
+            status code that isn't worth retrying.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return await call()
+        except ModelHTTPError as error:
+            if (
+                error.status_code not in RETRYABLE_STATUS_CODES
+                or attempt + 1 >= max_attempts
+            ):
+                raise
+            delay = retry_after_seconds(error.headers)
+            delay = (
+                min(delay, max_delay)
+                if delay is not None
+                else backoff_delay(attempt, base_delay, max_delay)
+            )
+            logfire.warning(
+                "{model_name} answered {status_code}, retrying in {delay:.1f}s",
+                model_name=error.model_name,
+                status_code=error.status_code,
+                delay=delay,
+            )
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+class MicroBatcher[I, O]:
+    """Group concurrent requests into batches.
+
+    Requests submitted within `max_wait_seconds` of each other are passed together to
+    `run_batch`, up to `max_size` at a time. `run_batch` must return one output per
+    input, in the same order. If it fails, every request of the batch fails with its
+    exception.
+
+    Usage:
+        batcher = MicroBatcher(extract_many, max_size=5)
+        outputs = await asyncio.gather(*(batcher.submit(item) for item in items))
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[I]], Awaitable[list[O]]],
+        max_size: int,
+        max_wait_seconds: float = 0.05,
+    ):
+        self.run_batch = run_batch
+        self.max_size = max_size
+        self.max_wait_seconds = max_wait_seconds
+
+        self._pending: list[tuple[I, asyncio.Future[O]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[list[O]]] = set()
+
+    async def submit(self, item: I) -> O:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[O] = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await future
+
+    async def aclose(self):
+        """Cancel the batches that are still pending or running."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run_batch([item for item, _ in batch]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(partial(self._settle, batch))
+
+    async def _run_batch(self, items: list[I]) -> list[O]:
+        outputs = await self.run_batch(items)
+        if len(outputs) != len(items):
+            raise ValueError(f"Got {len(outputs)} outputs for a batch of {len(items)}")
+        return outputs
+
+    @staticmethod
+    def _settle(batch: list[tuple[I, asyncio.Future[O]]], task: asyncio.Task[list[O]]):
+        """Forward the outcome of a batch to the callers of `submit`."""
+        if task.cancelled():
+            for _, future in batch:
+                future.cancel()
+        elif (error := task.exception()) is not None:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for (_, future), output in zip(batch, task.result(), strict=True):
+                if not future.done():
+                    future.set_result(output)
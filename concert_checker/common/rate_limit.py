@@ -0,0 +1,276 @@
+"""Per-domain rate limiting of the requests sent to websites.
+
+Every request sent to a website (pages rendered by the crawler, plain HTTP requests)
+first takes a token from the bucket of its registrable domain, so that
+`www.songkick.com` and `api.songkick.com` share the same budget:
+- Buckets refill at `RATE_LIMIT_REQUESTS_PER_SECOND` tokens per second (overridden
+  per domain by `RATE_LIMIT_DOMAIN_RATES`), and hold up to `RATE_LIMIT_BURST` tokens.
+- The Crawl-delay of the robots.txt of a site, if any, slows its bucket down further.
+- A domain answering 429 (Too Many Requests) is paused for as long as its Retry-After
+  header says, or else for `RATE_LIMIT_BACKOFF_SECONDS`, doubled while it keeps
+  throttling us.
+
+The time spent waiting is recorded per domain (`DomainRateLimiter.stats`, logged and
+reset by `log_stats`, and the `rate_limit_wait` metric).
+
+Buckets are kept per process: the worker processes each send up to the configured
+rates.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+import logfire
+
+from concert_checker.common.constants import (
+    RATE_LIMIT_BACKOFF_SECONDS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_DOMAIN_RATES,
+    RATE_LIMIT_MAX_BACKOFF_SECONDS,
+    RATE_LIMIT_MAX_CRAWL_DELAY_SECONDS,
+    RATE_LIMIT_REQUESTS_PER_SECOND,
+)
+from concert_checker.common.llm_calls import retry_after_seconds
+
+# Second-level labels under which country code domains are registered (`bbc.co.uk`).
+_GENERIC_SECOND_LEVEL_LABELS = frozenset(
+    {"ac", "co", "com", "edu", "gov", "net", "org"}
+)
+
+_wait_histogram = logfire.metric_histogram(
+    "rate_limit_wait",
+    unit="s",
+    description="Time requests waited for the rate limit of their domain",
+)
+
+
+def registrable_domain(url: str) -> str:
+    """The domain a URL's host was registered under (`songkick.com` for
+    `https://www.songkick.com/...`).
+
+    Approximated without the public suffix list: hosts under a country code domain
+    with a generic second level (`co.uk`, `com.au`...) keep three labels.
+    """
+    host = (urlsplit(url).hostname or "").rstrip(".")
+    labels = host.split(".")
+    if len(labels) <= 2 or all(label.isdigit() for label in labels):
+        return host
+    if len(labels[-1]) == 2 and labels[-2] in _GENERIC_SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def robots_crawl_delay(robots_txt: str, user_agent: str) -> float | None:
+    """The Crawl-delay of a robots.txt file for `user_agent`, if it sets one."""
+    parser = RobotFileParser()
+    parser.parse(robots_txt.splitlines())
+    delay = parser.crawl_delay(user_agent)
+    return float(delay) if delay is not None else None
+
+
+@dataclass
+class DomainStats:
+    requests: int = 0
+    throttled: int = 0
+    waited_seconds: float = 0.0
+
+
+class _Bucket:
+    """The token bucket of a domain. Tokens go negative when they are reserved ahead."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.backoff = 0.0
+        self.robots_checked = False
+
+    def reserve(self, now: float) -> float:
+        """Take a token, and return how long to wait before using it.
+
+        Tokens are counted from the end of the pause, if the bucket is paused.
+        """
+        start = max(now, self.updated_at)
+        self.tokens = min(
+            self.burst, self.tokens + (start - self.updated_at) * self.rate
+        )
+        self.updated_at = start
+        self.tokens -= 1
+        return start - now + max(-self.tokens / self.rate, 0.0)
+
+    def pause(self, until: float):
+        if until <= self.paused_until:
+            return
+        # No burst when the pause ends: a single request, then the rate applies.
+        self.tokens = min(
+            1.0, self.tokens + max(until - self.updated_at, 0) * self.rate
+        )
+        self.updated_at = max(self.updated_at, until)
+        self.paused_until = until
+
+
+class DomainRateLimiter:
+    """Token buckets shared by every request to the same registrable domain.
+
+    Usage:
+        await limiter.acquire(url)
+        response = ...  # Send the request
+        if limiter.record_response(url, response.status_code, response.headers):
+            ...  # Throttled: the request can be retried (after `acquire`).
+
+    Args:
+        requests_per_second (float): The default rate of each domain.
+        burst (int): Requests sent back to back to a domain before the rate applies.
+        domain_rates (Mapping[str, float]): Rates of specific (registrable) domains.
+        fetch_robots_txt (Callable | None): Returns the robots.txt at a URL (None if
+            there is none), raising `httpx.HTTPError` if it can't be fetched. Crawl
+            delays are ignored if not given.
+        user_agent (str): The user agent matched against the robots.txt rules.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = RATE_LIMIT_REQUESTS_PER_SECOND,
+        burst: int = RATE_LIMIT_BURST,
+        domain_rates: Mapping[str, float] = RATE_LIMIT_DOMAIN_RATES,
+        fetch_robots_txt: Callable[[str], Awaitable[str | None]] | None = None,
+        user_agent: str = "*",
+        max_crawl_delay: float = RATE_LIMIT_MAX_CRAWL_DELAY_SECONDS,
+        backoff_seconds: float = RATE_LIMIT_BACKOFF_SECONDS,
+        max_backoff_seconds: float = RATE_LIMIT_MAX_BACKOFF_SECONDS,
+    ):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.domain_rates = dict(domain_rates)
+        self.user_agent = user_agent
+        self.max_crawl_delay = max_crawl_delay
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.stats: defaultdict[str, DomainStats] = defaultdict(DomainStats)
+
+        self._fetch_robots_txt = fetch_robots_txt
+        self._buckets: dict[str, _Bucket] = {}
+
+    def _bucket(self, domain: str) -> _Bucket:
+        if (bucket := self._buckets.get(domain)) is None:
+            rate = self.domain_rates.get(domain, self.requests_per_second)
+            bucket = self._buckets[domain] = _Bucket(rate, self.burst)
+        return bucket
+
+    async def _apply_crawl_delay(
+        self,
+        bucket: _Bucket,
+        domain: str,
+        url: str,
+        fetch_robots_txt: Callable[[str], Awaitable[str | None]],
+    ):
+        parts = urlsplit(url)
+        try:
+            robots_txt = await fetch_robots_txt(
+                f"{parts.scheme}://{parts.netloc}/robots.txt"
+            )
+            delay = robots_crawl_delay(robots_txt or "", self.user_agent)
+        except (httpx.HTTPError, ValueError) as e:
+            logfire.debug(
+                "Could not read the robots.txt of {domain}: {error}",
+                domain=domain,
+                error=e,
+            )
+            return
+        if delay:
+            delay = min(delay, self.max_crawl_delay)
+            bucket.rate = min(bucket.rate, 1 / delay)
+            bucket.burst = 1
+            bucket.tokens = min(bucket.tokens, 1.0)
+            logfire.debug(
+                "{domain} asks for {delay}s between requests",
+                domain=domain,
+                delay=delay,
+            )
+
+    async def acquire(self, url: str):
+        """Wait until a request can be sent to the domain of `url`."""
+        domain = registrable_domain(url)
+        bucket = self._bucket(domain)
+        fetch_robots_txt = self._fetch_robots_txt
+        if (
+            fetch_robots_txt is not None
+            and self.max_crawl_delay > 0
+            and not bucket.robots_checked
+        ):
+            # Requests sent meanwhile get the default rate.
+            bucket.robots_checked = True
+            await self._apply_crawl_delay(bucket, domain, url, fetch_robots_txt)
+
+        waited = 0.0
+        paused_until = bucket.paused_until
+        delay = bucket.reserve(time.monotonic())
+        while delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = 0.0
+            if bucket.paused_until > paused_until:
+                # Paused meanwhile: the reserved token was forfeited, take one after
+                # the pause.
+                paused_until = bucket.paused_until
+                delay = bucket.reserve(time.monotonic())
+
+        stats = self.stats[domain]
+        stats.requests += 1
+        stats.waited_seconds += waited
+        _wait_histogram.record(waited, {"domain": domain})
+
+    def record_response(
+        self, url: str, status_code: int | None, headers: Mapping[str, str] | None
+    ) -> bool:
+        """Record the answer of the domain of `url`, pausing it if it throttled us.
+
+        Returns:
+            bool: Whether the request was throttled, and is worth retrying.
+        """
+        domain = registrable_domain(url)
+        bucket = self._bucket(domain)
+        if status_code != 429:
+            bucket.backoff = 0.0
+            return False
+
+        bucket.backoff = min(
+            max(2 * bucket.backoff, self.backoff_seconds), self.max_backoff_seconds
+        )
+        delay = retry_after_seconds(headers)
+        delay = (
+            min(delay, self.max_backoff_seconds)
+            if delay is not None
+            else bucket.backoff
+        )
+        bucket.pause(time.monotonic() + delay)
+        self.stats[domain].throttled += 1
+        logfire.warning(
+            "{domain} is throttling our requests, pausing it for {delay:.1f}s",
+            domain=domain,
+            delay=delay,
+        )
+        return True
+
+    def log_stats(self):
+        """Log the domains that made requests wait or throttled them, and reset the
+        stats."""
+        for domain, stats in sorted(self.stats.items()):
+            if stats.waited_seconds or stats.throttled:
+                logfire.info(
+                    "Rate limit of {domain}: {requests} requests, waited "
+                    "{waited_seconds:.1f}s, throttled {throttled} times",
+                    domain=domain,
+                    requests=stats.requests,
+                    waited_seconds=stats.waited_seconds,
+                    throttled=stats.throttled,
+                )
+        self.stats.clear()
@@ -0,0 +1,98 @@
+"""Adaptive scheduling of the checks of each (artist, source) pair.
+
+Most artists don't announce anything for months, then announce a tour and add dates,
+venues and upgrades for a few weeks. Each pair is therefore checked again after a
+fraction (`SCHEDULER_CHANGE_AGE_FACTOR`) of the time since its shows or pages last
+changed: a pair that changed yesterday is checked within hours, one that hasn't
+changed in months once a week. Checks also get more frequent as the next concert of
+the artist gets closer (a concert in N days: at least every N hours).
+
+Intervals are kept between `SCHEDULER_MIN_INTERVAL_SECONDS` and
+`SCHEDULER_MAX_INTERVAL_SECONDS`, and jittered so that artists added together don't
+stay in lockstep.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from concert_checker.app.async_crud import (
+    get_last_page_update,
+    get_next_concert_date,
+    get_or_create_artist,
+    get_source_schedule,
+    set_source_schedule,
+)
+from concert_checker.app.schemas import ArtistCreate
+from concert_checker.common.constants import (
+    SCHEDULER_CHANGE_AGE_FACTOR,
+    SCHEDULER_JITTER,
+    SCHEDULER_MAX_INTERVAL_SECONDS,
+    SCHEDULER_MIN_INTERVAL_SECONDS,
+)
+
+# A concert in N days: checked at least every N hours.
+_CONCERT_PROXIMITY_FACTOR = 24
+
+
+def check_interval(
+    now: datetime, last_changed_at: datetime | None, next_concert_date: date | None
+) -> timedelta:
+    """Time until the next check of a pair, before jitter.
+
+    Args:
+        now (datetime): The time of the check.
+        last_changed_at (datetime | None): When the shows or pages of the pair last
+            changed, if ever.
+        next_concert_date (date | None): The date of the next concert of the artist.
+    """
+    interval = SCHEDULER_MAX_INTERVAL_SECONDS
+    if last_changed_at is not None:
+        age = (now - last_changed_at).total_seconds()
+        interval = min(interval, age * SCHEDULER_CHANGE_AGE_FACTOR)
+    if next_concert_date is not None:
+        until = datetime.combine(next_concert_date, datetime.min.time()) - now
+        interval = min(interval, until.total_seconds() / _CONCERT_PROXIMITY_FACTOR)
+    return timedelta(
+        seconds=min(
+            max(interval, SCHEDULER_MIN_INTERVAL_SECONDS),
+            SCHEDULER_MAX_INTERVAL_SECONDS,
+        )
+    )
+
+
+def jittered(interval: timedelta) -> timedelta:
+    return interval * random.uniform(1 - SCHEDULER_JITTER, 1 + SCHEDULER_JITTER)
+
+
+async def schedule_next_check(
+    db: AsyncSession, artist_name: str, source: str, changed: bool
+) -> datetime:
+    """Record a check of an artist by a source, and schedule the next one.
+
+    Args:
+        db (AsyncSession): The database session to use.
+        artist_name (str): The name of the artist.
+        source (str): The name of the source (`Source.name`).
+        changed (bool): Whether the check added or updated shows.
+
+    Returns:
+        datetime: When the pair is due next.
+    """
+    now = datetime.now()
+    artist = await get_or_create_artist(db, ArtistCreate(name=artist_name))
+    schedule = await get_source_schedule(db, artist.id, source)
+    changes = [
+        now if changed else None,
+        schedule.last_changed_at if schedule is not None else None,
+        await get_last_page_update(db, artist.id, source),
+    ]
+    last_changed_at = max((change for change in changes if change), default=None)
+    next_concert_date = await get_next_concert_date(db, artist.id, now.date())
+
+    next_check_at = now + jittered(
+        check_interval(now, last_changed_at, next_concert_date)
+    )
+    _ = await set_source_schedule(db, artist.id, source, now, changed, next_check_at)
+    return next_check_at
@@ -0,0 +1,162 @@
+"""Resolution of the URLs of artists (official website, Songkick page...).
+
+Finding a URL takes a model call with web searches. The outcome of each search is
+stored per artist and kind of URL, so that it's only paid once:
+- URLs that were found are kept on the artist, and never searched again.
+- Searches that found nothing (or failed) are retried after a delay that doubles with
+  every miss, from `URL_RECHECK_BASE_SECONDS` up to `URL_RECHECK_MAX_SECONDS`. Artists
+  without a website don't cost a search on every run.
+
+`resolve_artist_urls` searches the URLs of every artist that is due in one pass, a
+few at a time. Sources then read the stored URLs with `get_artist_url`.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+
+import httpx
+import logfire
+from ddgs.exceptions import DDGSException
+from pydantic_ai.exceptions import AgentRunError
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from concert_checker.app.async_crud import (
+    commit,
+    get_artists_to_resolve,
+    get_or_create_artist,
+    save_url_resolution,
+)
+from concert_checker.app.crud import ARTIST_URL_COLUMNS
+from concert_checker.app.schemas import ArtistCreate
+from concert_checker.common.constants import (
+    URL_RECHECK_BASE_SECONDS,
+    URL_RECHECK_MAX_SECONDS,
+    URL_RESOLUTION_CONCURRENCY,
+)
+from concert_checker.common.llm_calls import run_with_retries
+
+FOUND = "found"
+NOT_FOUND = "not_found"
+ERROR = "error"
+
+# How searches fail: the model call, or the web searches and fetches of its tools.
+_SEARCH_ERRORS = (AgentRunError, DDGSException, httpx.HTTPError)
+
+
+class ArtistUrlNotFound(Exception):
+    """The URL of an artist is unknown, and not due for a new search yet."""
+
+
+def recheck_delay(misses: int) -> timedelta:
+    """Delay before searching again a URL that wasn't found `misses` times in a row."""
+    return timedelta(
+        seconds=min(
+            URL_RECHECK_BASE_SECONDS * 2 ** (misses - 1), URL_RECHECK_MAX_SECONDS
+        )
+    )
+
+
+async def _resolve(
+    db: AsyncSession,
+    kind: str,
+    artist: Row,
+    find_url: Callable[[str], Awaitable[str | None]],
+) -> str | None:
+    try:
+        url = await run_with_retries(lambda: find_url(artist.name))
+    except _SEARCH_ERRORS:
+        logfire.exception(
+            "Could not search the {kind} URL of {artist_name}",
+            kind=kind,
+            artist_name=artist.name,
+        )
+        url, status = None, ERROR
+    else:
+        status = FOUND if url else NOT_FOUND
+
+    misses = 0 if url else artist.misses + 1
+    next_check_at = None if url else datetime.now() + recheck_delay(misses)
+    _ = await save_url_resolution(
+        db, artist.id, kind, status, url, misses, next_check_at
+    )
+    logfire.debug(
+        "{kind} URL of {artist_name}: {url} ({status})",
+        kind=kind,
+        artist_name=artist.name,
+        url=url,
+        status=status,
+    )
+    return url
+
+
+async def resolve_artist_urls(
+    db: AsyncSession,
+    kind: str,
+    find_url: Callable[[str], Awaitable[str | None]],
+    concurrency: int = URL_RESOLUTION_CONCURRENCY,
+) -> int:
+    """Search the URLs of `kind` of every artist that is due, `concurrency` at a time.
+
+    Each outcome is committed as soon as it's known: this must run before the session
+    is shared with other tasks.
+
+    Args:
+        db (AsyncSession): The database session to use.
+        kind (str): The kind of URL, a key of `crud.ARTIST_URL_COLUMNS`.
+        find_url (Callable): Searches the URL of an artist from its name, returning
+            None if there is none. Failed searches (model, search engine or HTTP
+            errors) are retried later.
+        concurrency (int): The maximum number of searches running at the same time.
+
+    Returns:
+        int: The number of artists that were searched.
+    """
+    artists = await get_artists_to_resolve(db, kind, datetime.now())
+    if not artists:
+        return 0
+
+    logfire.info(
+        "Searching the {kind} URL of {artist_count} artist(s)",
+        kind=kind,
+        artist_count=len(artists),
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(artist: Row) -> str | None:
+        async with semaphore:
+            url = await _resolve(db, kind, artist, find_url)
+        # Committed straight away, so that an interrupted pass isn't searched again.
+        await commit(db)
+        return url
+
+    urls = await asyncio.gather(*(resolve(artist) for artist in artists))
+    logfire.info(
+        "Found the {kind} URL of {found} out of {artist_count} artist(s)",
+        kind=kind,
+        found=sum(url is not None for url in urls),
+        artist_count=len(artists),
+    )
+    return len(artists)
+
+
+async def get_artist_url(
+    db: AsyncSession,
+    kind: str,
+    artist_name: str,
+    find_url: Callable[[str], Awaitable[str | None]],
+) -> str:
+    """Return the URL of `kind` of an artist, searching it if it's due.
+
+    Raises:
+        ArtistUrlNotFound: If the URL wasn't found, now or by a recent search.
+    """
+    artist = await get_or_create_artist(db, ArtistCreate(name=artist_name))
+    if (url := getattr(artist, ARTIST_URL_COLUMNS[kind].key)) is not None:
+        return url
+
+    due = await get_artists_to_resolve(db, kind, datetime.now(), artist_id=artist.id)
+    if due and (url := await _resolve(db, kind, due[0], find_url)) is not None:
+        return url
+    raise ArtistUrlNotFound(f"No {kind} URL found for artist '{artist_name}'.")
@@ -1,4 +1,5 @@
 import re
+import unicodedata
 
 
 def slugify(name: str) -> str:
@@ -9,3 +10,34 @@ def slugify(name: str) -> str:
     slug = name.lower().strip()
     slug = re.sub(r"[^a-z0-9]+", "-", slug)
     return slug.strip("-")
+
+
+def normalize_artist_name(name: str) -> str:
+    """Normalize an artist name for searching.
+
+    Accents, case, punctuation and a leading "The" are ignored, and "&" is "and".
+
+    "The Beatles" -> "beatles", "Beyoncé" -> "beyonce", "AC/DC" -> "acdc"
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).casefold()
+    name = name.replace("&", " and ")
+    name = re.sub(r"[^\w\s]+", "", name)
+    name = re.sub(r"\s+", " ", name).strip()
+    return name.removeprefix("the ")
+
+
+_MONTHS = (
+    r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+)
+
+# Matches the usual ways show dates are written: "May 12", "12 May 2025", "12th of May",
+# "2025-05-12", "12/05/2025", "12.05.25".
+DATE_PATTERN = re.compile(
+    rf"\b(?:(?:{_MONTHS})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?\b"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?(?:\s+of)?\s+(?:{_MONTHS})\b"
+    r"|\d{4}-\d{2}-\d{2}\b"
+    r"|\d{1,2}[/.]\d{1,2}[/.]\d{2,4}\b)",
+    re.IGNORECASE,
+)
@@ -0,0 +1,128 @@
+"""Model-free extraction of shows from artist websites.
+
+Shows are looked for in the schema.org structured data (JSON-LD and microdata) of the
+home page and of its tour pages, and in the tour widgets they embed. Pages without
+any are left to the model.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+import logfire
+from bs4 import BeautifulSoup
+
+from concert_checker.common.dataclasses import ShowDetails
+from concert_checker.extractors.jsonld import (
+    events_to_shows,
+    extract_json_ld,
+    find_events,
+)
+from concert_checker.extractors.microdata import extract_microdata
+from concert_checker.extractors.songkick import SongkickParseError
+from concert_checker.extractors.widgets import detect_widgets, fetch_widget_shows
+from concert_checker.tools.web import fetch_html
+
+# Tour pages linked from the home page that are also scanned.
+MAX_TOUR_PAGES = 3
+
+_TOUR_LINK = re.compile(
+    r"\b(tour|live|shows?|concerts?|dates|events?|gigs?)\b", re.IGNORECASE
+)
+
+
+@dataclass
+class StructuredShows:
+    shows: list[ShowDetails]
+    # Pages without structured data or tour widget (or that couldn't be fetched),
+    # whose shows can only be extracted by the model.
+    pages_without_data: list[str]
+
+
+def find_tour_pages(html: str, page_url: str) -> list[str]:
+    """Find the links of a page that likely point to the artist's tour dates."""
+    soup = BeautifulSoup(html, "html.parser")
+    host = urlsplit(page_url).hostname
+    urls: list[str] = []
+    for link in soup.find_all("a", href=True):
+        url = urljoin(page_url, str(link["href"])).split("#", 1)[0]
+        if urlsplit(url).hostname != host or url.rstrip("/") == page_url.rstrip("/"):
+            continue
+        if _TOUR_LINK.search(link.get_text(" ", strip=True)) or _TOUR_LINK.search(
+            urlsplit(url).path.replace("-", " ").replace("/", " ")
+        ):
+            urls.append(url)
+    return list(dict.fromkeys(urls))[:MAX_TOUR_PAGES]
+
+
+async def extract_page_shows(html: str, page_url: str) -> list[ShowDetails] | None:
+    """Extract the shows of one page from its structured data and widgets.
+
+    Returns:
+        list[ShowDetails] | None: The shows of the page, or None if none of its
+            structured events could be converted to a show (e.g. their location is
+            free text) and no tour widget answered. A widget listing no show returns
+            an empty list: the artist has no upcoming show.
+    """
+    events = find_events(extract_json_ld(html)) + find_events(extract_microdata(html))
+    shows = events_to_shows(events, page_url)
+    has_data = bool(shows)
+
+    for widget in detect_widgets(html, page_url):
+        try:
+            shows.extend(await fetch_widget_shows(widget))
+            has_data = True
+        except (httpx.HTTPError, SongkickParseError) as e:
+            logfire.warning(
+                "Could not fetch the shows of the {provider} widget on {url}: {error}",
+                provider=widget.provider,
+                url=page_url,
+                error=e,
+            )
+    return shows if has_data else None
+
+
+async def extract_structured_shows(base_url: str) -> StructuredShows:
+    """Extract the shows of an artist website without using a model, page by page.
+
+    The home page mostly leads to the tour pages: it only needs the model if none of
+    its tour pages has structured data either, and the model then reads the whole
+    website.
+
+    Returns:
+        StructuredShows: The shows found in structured data or tour widgets, and the
+            pages without any (which need the model).
+    """
+    try:
+        home_html = await fetch_html(base_url)
+    except httpx.HTTPError as e:
+        logfire.info("Could not fetch {url}: {error}", url=base_url, error=e)
+        return StructuredShows(shows=[], pages_without_data=[base_url])
+
+    async def fetch_tour_page(url: str) -> tuple[str, str | None]:
+        try:
+            return url, await fetch_html(url)
+        except httpx.HTTPError:
+            return url, None
+
+    pages = [(base_url, home_html)] + await asyncio.gather(
+        *(fetch_tour_page(url) for url in find_tour_pages(home_html, base_url))
+    )
+
+    shows: list[ShowDetails] = []
+    pages_without_data: list[str] = []
+    for url, html in pages:
+        page_shows = await extract_page_shows(html, url) if html is not None else None
+        if page_shows is None:
+            pages_without_data.append(url)
+        else:
+            shows.extend(page_shows)
+
+    if len(pages_without_data) == len(pages):
+        # The model reads the whole website, from its home page.
+        pages_without_data = [base_url]
+    elif base_url in pages_without_data:
+        pages_without_data.remove(base_url)
+    return StructuredShows(shows=shows, pages_without_data=pages_without_data)
@@ -0,0 +1,141 @@
+"""Extraction of shows from schema.org structured data (JSON-LD)."""
+
+import json
+import re
+from datetime import date, datetime
+from typing import Any
+
+from bs4 import BeautifulSoup
+
+from concert_checker.common.dataclasses import ShowDetails
+
+EVENT_TYPES = {"Event", "MusicEvent", "Festival"}
+
+
+def extract_json_ld(html: str) -> list[Any]:
+    """Return the JSON-LD objects embedded in an HTML page.
+
+    Blocks that can't be decoded are skipped: pages routinely embed broken JSON-LD.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    objects: list[Any] = []
+    for script in soup.find_all("script", type="application/ld+json"):
+        text = script.string or script.get_text()
+        # Some CMSs wrap the JSON in HTML comments or CDATA sections.
+        text = re.sub(r"^\s*(<!--|//\s*<!\[CDATA\[)|(-->|//\s*\]\]>)\s*$", "", text)
+        try:
+            objects.append(json.loads(text, strict=False))
+        except json.JSONDecodeError:
+            continue
+    return objects
+
+
+def _types(obj: dict[str, Any]) -> set[str]:
+    types = obj.get("@type", [])
+    if isinstance(types, str):
+        types = [types]
+    return {t.rsplit("/", 1)[-1] for t in types if isinstance(t, str)}
+
+
+def find_events(obj: Any) -> list[dict[str, Any]]:
+    """Recursively find the schema.org events in JSON-LD objects."""
+    if isinstance(obj, list):
+        return [event for item in obj for event in find_events(item)]
+    if not isinstance(obj, dict):
+        return []
+    if _types(obj) & EVENT_TYPES:
+        return [obj]
+    return [event for value in obj.values() for event in find_events(value)]
+
+
+def _first(value: Any) -> Any:
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _text(value: Any) -> str | None:
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get("name")
+    if not isinstance(value, str):
+        return None
+    return value.strip() or None
+
+
+def parse_event_date(value: Any) -> date | None:
+    """Parse a schema.org `startDate` (ISO 8601 date or datetime)."""
+    value = _first(value)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return None
+
+
+def event_to_show(event: dict[str, Any], source_url: str) -> ShowDetails | None:
+    """Convert a schema.org event to `ShowDetails`.
+
+    Returns None for events that can't be placed on a date and in a city (e.g. online
+    events).
+    """
+    show_date = parse_event_date(event.get("startDate"))
+    location = _first(event.get("location"))
+    if show_date is None or not isinstance(location, dict):
+        return None
+
+    address = _first(location.get("address"))
+    if isinstance(address, dict):
+        city = _text(address.get("addressLocality"))
+        state = _text(address.get("addressRegion"))
+        country = _text(address.get("addressCountry"))
+    elif isinstance(address, str):
+        # Free-form address, usually ending with "City, Country".
+        parts = [part.strip() for part in address.split(",") if part.strip()]
+        city = parts[-2] if len(parts) >= 2 else _first(parts)
+        state = None
+        country = parts[-1] if len(parts) >= 2 else None
+    else:
+        city = state = country = None
+    if not city:
+        return None
+
+    country_code = None
+    if country and len(country) == 2 and country.isalpha():
+        country_code = country.upper()
+
+    return ShowDetails(
+        date=show_date,
+        city=city,
+        state=state,
+        country=country,
+        country_code=country_code,
+        venue=_text(location.get("name")),
+        source_url=source_url,
+    )
+
+
+def events_to_shows(events: list[dict[str, Any]], source_url: str) -> list[ShowDetails]:
+    """Convert schema.org events to `ShowDetails`, dropping duplicates."""
+    shows: list[ShowDetails] = []
+    seen: set[tuple[date | datetime | str, str, str | None]] = set()
+    for event in events:
+        show = event_to_show(event, source_url)
+        if show is None:
+            continue
+        key = (show.date, show.city, show.venue)
+        if key not in seen:
+            seen.add(key)
+            shows.append(show)
+    return shows
+
+
+def extract_shows_from_json_ld(html: str, source_url: str) -> list[ShowDetails]:
+    """Extract the shows described by the JSON-LD of an HTML page."""
+    return events_to_shows(find_events(extract_json_ld(html)), source_url)
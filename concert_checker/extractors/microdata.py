@@ -0,0 +1,43 @@
+"""Extraction of schema.org microdata (`itemscope`/`itemprop` attributes)."""
+
+from typing import Any
+
+from bs4 import BeautifulSoup, Tag
+
+
+def _item_to_dict(element: Tag) -> dict[str, Any]:
+    item: dict[str, Any] = {}
+    if itemtype := element.get("itemtype"):
+        item["@type"] = [
+            str(t).rstrip("/").rsplit("/", 1)[-1] for t in str(itemtype).split()
+        ]
+
+    for prop in element.find_all(attrs={"itemprop": True}):
+        # Properties of nested items belong to those items.
+        if prop.find_parent(attrs={"itemscope": True}) is not element:
+            continue
+
+        if prop.has_attr("itemscope"):
+            value: Any = _item_to_dict(prop)
+        elif prop.has_attr("content"):
+            value = prop["content"]
+        elif prop.name == "time" and prop.has_attr("datetime"):
+            value = prop["datetime"]
+        elif prop.name in ("a", "link") and prop.has_attr("href"):
+            value = prop["href"]
+        else:
+            value = prop.get_text(" ", strip=True)
+
+        for name in str(prop["itemprop"]).split():
+            _ = item.setdefault(name, value)
+    return item
+
+
+def extract_microdata(html: str) -> list[dict[str, Any]]:
+    """Return the top-level microdata items of an HTML page, as JSON-LD-like dicts."""
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        _item_to_dict(element)
+        for element in soup.find_all(attrs={"itemscope": True})
+        if not element.has_attr("itemprop")
+    ]
@@ -0,0 +1,84 @@
+"""Deterministic parser for Songkick artist calendars.
+
+Songkick calendars are server-rendered and describe every concert as schema.org
+`MusicEvent` JSON-LD, so they can be extracted without a model.
+"""
+
+import re
+from urllib.parse import urljoin
+
+import httpx
+import logfire
+from bs4 import BeautifulSoup
+
+from concert_checker.common.dataclasses import ShowDetails
+from concert_checker.extractors.jsonld import (
+    extract_json_ld,
+    extract_shows_from_json_ld,
+)
+from concert_checker.tools.web import fetch_html
+
+# Long calendars are paginated. This is a safeguard against pagination loops.
+MAX_CALENDAR_PAGES = 10
+
+_NO_UPCOMING_CONCERTS = re.compile(
+    r"no upcoming (concerts|events|shows)|hasn't got any upcoming", re.IGNORECASE
+)
+
+
+class SongkickParseError(Exception):
+    """Raised when a page doesn't look like a Songkick calendar."""
+
+
+def parse_calendar_page(html: str, url: str) -> tuple[list[ShowDetails], str | None]:
+    """Parse one page of a Songkick artist calendar.
+
+    Args:
+        html (str): The HTML of the calendar page.
+        url (str): The URL of the page (used as `source_url` and to resolve links).
+
+    Returns:
+        tuple[list[ShowDetails], str | None]: The shows of the page, and the URL of the
+            next page of the calendar (None on the last page).
+
+    Raises:
+        SongkickParseError: If the page has neither concerts nor an explicit "no
+            upcoming concerts" message.
+    """
+    shows = extract_shows_from_json_ld(html, url)
+    if not shows and not (extract_json_ld(html) and _NO_UPCOMING_CONCERTS.search(html)):
+        raise SongkickParseError(f"Could not find any concert in {url}")
+
+    soup = BeautifulSoup(html, "html.parser")
+    next_link = soup.find("a", rel="next") or soup.select_one(".pagination a.next_page")
+    next_url = None
+    if next_link is not None and (href := next_link.get("href")):
+        next_url = urljoin(url, str(href))
+    return shows, next_url
+
+
+async def fetch_calendar_shows(url: str) -> list[ShowDetails]:
+    """Fetch and parse every page of a Songkick artist calendar.
+
+    Raises:
+        SongkickParseError: If the first page can't be parsed. Later pages that fail
+            to parse end the pagination.
+        httpx.HTTPError: If the first page can't be fetched.
+    """
+    shows, next_url = parse_calendar_page(await fetch_html(url), url)
+
+    seen_urls = {url}
+    while (
+        next_url and next_url not in seen_urls and len(seen_urls) < MAX_CALENDAR_PAGES
+    ):
+        seen_urls.add(next_url)
+        try:
+            page_shows, next_url = parse_calendar_page(
+                await fetch_html(next_url), next_url
+            )
+        except (SongkickParseError, httpx.HTTPError):
+            logfire.warning("Could not parse calendar page {url}", url=next_url)
+            break
+        shows.extend(page_shows)
+
+    return shows
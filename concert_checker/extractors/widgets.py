@@ -0,0 +1,204 @@
+"""Detection of embedded tour widgets, and extraction through their public endpoints.
+
+Many artist websites don't list their shows themselves, but embed a widget from a
+ticketing/tour service (Bandsintown, Seated, Songkick). The widget loads the shows in
+the browser from a public endpoint, which we can call directly.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Literal
+from urllib.parse import parse_qs, quote, urlsplit
+
+from bs4 import BeautifulSoup
+
+from concert_checker.common.dataclasses import ShowDetails
+from concert_checker.extractors.jsonld import parse_event_date
+from concert_checker.extractors.songkick import fetch_calendar_shows
+from concert_checker.tools.web import fetch_json
+
+BANDSINTOWN_EVENTS_URL = "https://rest.bandsintown.com/artists/{artist}/events"
+SEATED_TOUR_URL = "https://cdn.seated.com/api/tour/{artist_id}"
+SONGKICK_CALENDAR_URL = "https://www.songkick.com/artists/{artist_id}/calendar"
+
+_SONGKICK_ARTIST_URL = re.compile(r"songkick\.com/artists/(\d+)")
+_SONGKICK_INJECTOR_URL = re.compile(r"widget-app\.songkick\.com/injector/(\d+)")
+
+
+@dataclass(frozen=True)
+class TourWidget:
+    provider: Literal["bandsintown", "seated", "songkick"]
+    artist_id: str  # Name or id of the artist, as expected by the provider
+    app_id: str | None = None
+    page_url: str = ""  # URL of the page embedding the widget
+
+
+def detect_widgets(html: str, page_url: str) -> list[TourWidget]:
+    """Find the tour widgets embedded in an HTML page (script or iframe embeds)."""
+    soup = BeautifulSoup(html, "html.parser")
+    widgets: list[TourWidget] = []
+
+    # Bandsintown: <a class="bit-widget-initializer" data-artist-name="...">
+    for element in soup.select(".bit-widget-initializer"):
+        artist = element.get("data-artist-name") or element.get("data-artist-id")
+        if artist:
+            app_id = element.get("data-app-id")
+            widgets.append(
+                TourWidget(
+                    provider="bandsintown",
+                    artist_id=str(artist),
+                    app_id=str(app_id) if app_id else None,
+                    page_url=page_url,
+                )
+            )
+
+    # Seated: <div id="seated-55fdf2c0" data-artist-id="...">
+    for element in soup.select("[id^='seated-'][data-artist-id]"):
+        widgets.append(
+            TourWidget(
+                provider="seated",
+                artist_id=str(element["data-artist-id"]),
+                page_url=page_url,
+            )
+        )
+
+    # Songkick: <a class="songkick-widget" href="https://www.songkick.com/artists/...">,
+    # or the injector script/iframe.
+    for element in soup.select("a.songkick-widget[href], script[src], iframe[src]"):
+        url = str(element.get("href") or element.get("src"))
+        if (
+            element.name == "a"
+            and (match := _SONGKICK_ARTIST_URL.search(url))
+            or (match := _SONGKICK_INJECTOR_URL.search(url))
+        ):
+            artist_id = match[1]
+        elif element.name == "iframe" and "bandsintown.com" in url:
+            query = parse_qs(urlsplit(url).query)
+            if artist := _first(query.get("artist_name") or query.get("artist")):
+                widgets.append(
+                    TourWidget(
+                        provider="bandsintown", artist_id=artist, page_url=page_url
+                    )
+                )
+            continue
+        else:
+            continue
+        widgets.append(
+            TourWidget(provider="songkick", artist_id=artist_id, page_url=page_url)
+        )
+
+    return list(dict.fromkeys(widgets))
+
+
+def _first(values: list[str] | None) -> str | None:
+    return values[0] if values else None
+
+
+def _split_location(location: str) -> tuple[str, str | None, str | None]:
+    """Split a "City, [State,] Country" string."""
+    parts = [part.strip() for part in location.split(",") if part.strip()]
+    if len(parts) >= 3:
+        return parts[0], parts[1], parts[-1]
+    if len(parts) == 2:
+        return parts[0], None, parts[1]
+    return location.strip(), None, None
+
+
+def _country_code(country: str | None) -> str | None:
+    if country and len(country) == 2 and country.isalpha():
+        return country.upper()
+    return None
+
+
+def parse_bandsintown_events(data: Any, source_url: str) -> list[ShowDetails]:
+    """Convert the response of the Bandsintown events endpoint to `ShowDetails`."""
+    if not isinstance(data, list):
+        # The endpoint answers with an error object for unknown artists.
+        return []
+
+    shows: list[ShowDetails] = []
+    for event in data:
+        if not isinstance(event, dict):
+            continue
+        venue = event.get("venue") or {}
+        show_date = parse_event_date(event.get("datetime") or event.get("starts_at"))
+        city = venue.get("city")
+        if show_date is None or not city:
+            continue
+        country = venue.get("country") or None
+        shows.append(
+            ShowDetails(
+                date=show_date,
+                city=city,
+                state=venue.get("region") or None,
+                country=country,
+                country_code=_country_code(country),
+                venue=venue.get("name") or None,
+                source_url=source_url,
+            )
+        )
+    return shows
+
+
+def parse_seated_tour(data: Any, source_url: str) -> list[ShowDetails]:
+    """Convert the response of the Seated tour endpoint (JSON:API) to `ShowDetails`."""
+    if not isinstance(data, dict):
+        return []
+
+    shows: list[ShowDetails] = []
+    for resource in data.get("included", []):
+        if resource.get("type") != "tour-events":
+            continue
+        attributes = resource.get("attributes", {})
+        show_date = parse_event_date(
+            attributes.get("starts-at-date-local") or attributes.get("starts-at")
+        )
+        location = attributes.get("formatted-address") or ""
+        if show_date is None or not location:
+            continue
+        city, state, country = _split_location(location)
+        shows.append(
+            ShowDetails(
+                date=show_date,
+                city=city,
+                state=state,
+                country=country,
+                country_code=_country_code(country),
+                venue=attributes.get("venue-name") or None,
+                source_url=source_url,
+            )
+        )
+    return shows
+
+
+async def fetch_widget_shows(widget: TourWidget) -> list[ShowDetails]:
+    """Fetch the shows of a widget from the provider's public endpoint.
+
+    Raises:
+        httpx.HTTPError: If the endpoint can't be reached.
+        SongkickParseError: If a Songkick calendar can't be parsed.
+    """
+    match widget.provider:
+        case "bandsintown":
+            # The widget itself identifies as "js_<domain>" when no app id is set.
+            app_id = widget.app_id or f"js_{urlsplit(widget.page_url).hostname}"
+            data = await fetch_json(
+                BANDSINTOWN_EVENTS_URL.format(artist=quote(widget.artist_id, safe="")),
+                params={"app_id": app_id, "date": "upcoming"},
+            )
+            return parse_bandsintown_events(data, widget.page_url)
+        case "seated":
+            data = await fetch_json(
+                SEATED_TOUR_URL.format(artist_id=widget.artist_id),
+                params={"include": "tour-events"},
+            )
+            return parse_seated_tour(data, widget.page_url)
+        case "songkick":
+            shows = await fetch_calendar_shows(
+                SONGKICK_CALENDAR_URL.format(artist_id=widget.artist_id)
+            )
+            # Shows are attributed to the page embedding the widget, so that changes
+            # are tracked on the artist's website.
+            for show in shows:
+                show.source_url = widget.page_url
+            return shows
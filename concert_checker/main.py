@@ -1,83 +1,248 @@
-from datetime import date
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
 
 import logfire
-from sqlalchemy.orm import Session
-
-from concert_checker.app.crud import get_or_create_artist, get_or_create_concert, get_or_create_venue
-from concert_checker.app.database import Base, SessionLocal, engine
-from concert_checker.app.schemas import ArtistCreate, ConcertCreate, VenueCreate
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from concert_checker.app.async_crud import (
+    bulk_upsert_shows,
+    commit,
+    get_artist_names,
+    get_due_checks,
+    rollback,
+)
+from concert_checker.app.database import AsyncSessionLocal
+from concert_checker.app.migrations import init_db
+from concert_checker.common.constants import (
+    MAX_CONCURRENT_TASKS,
+    MAX_CONCURRENT_TASKS_PER_SOURCE,
+    SCHEDULER_MAX_CHECKS_PER_CYCLE,
+    SCHEDULER_TICK_SECONDS,
+    WORKER_CONCURRENCY,
+    WORKER_PROCESSES,
+)
+from concert_checker.common.crawler_pool import close_crawler_pool
 from concert_checker.common.dataclasses import ArtistShows
-from concert_checker.sources import ArtistBoundSource
+from concert_checker.common.http import close_http_client, get_rate_limiter
+from concert_checker.common.llm_cache import extraction_cache_stats
+from concert_checker.common.scheduling import schedule_next_check
+from concert_checker.common.url_resolution import ArtistUrlNotFound
+from concert_checker.sources import ArtistBoundSource, Source
 from concert_checker.sources.artist_website import ArtistWebsiteSource
 from concert_checker.sources.email import EmailSource
 from concert_checker.sources.songkick import SongkickSource
+from concert_checker.tools.web import page_content_cache
 
 logfire.configure()
 logfire.instrument_pydantic_ai()
 
-Base.metadata.create_all(bind=engine)
+init_db()
+
+SOURCE_CLASSES: list[type[Source]] = [ArtistWebsiteSource, SongkickSource, EmailSource]
 
 
 def main():
-    db = SessionLocal()
-    artist_name = "Melody's Echo Chamber"
-    artist_name = "Men I Trust"
-
-    # TODO: add logging
-    # TODO: switch to async
-    for source_class in [ArtistWebsiteSource, SongkickSource, EmailSource]:
-        if issubclass(source_class, ArtistBoundSource):
-            source = source_class(artist_name)
-            source.resolve(db)
+    parser = argparse.ArgumentParser(prog="concert-checker")
+    subparsers = parser.add_subparsers(dest="command")
+    run_parser = subparsers.add_parser(
+        "run", help="Check the artists that are due, once (default)."
+    )
+    _ = run_parser.add_argument(
+        "--all", action="store_true", help="Check every artist, due or not."
+    )
+    _ = subparsers.add_parser(
+        "schedule", help="Check the artists as they become due, until stopped."
+    )
+    worker_parser = subparsers.add_parser(
+        "worker",
+        help="Run the checks that are due from a queue shared by all the workers, "
+        "until stopped.",
+    )
+    _ = worker_parser.add_argument(
+        "--processes", type=int, default=WORKER_PROCESSES, help="Worker processes."
+    )
+    _ = worker_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=WORKER_CONCURRENCY,
+        help="Jobs run at the same time by each process.",
+    )
+    args = parser.parse_args()
+
+    if args.command == "schedule":
+        asyncio.run(run_scheduler())
+    elif args.command == "worker":
+        # Imported here: the worker module uses this one.
+        from concert_checker.worker import run_workers
+
+        run_workers(args.processes, args.concurrency)
+    else:
+        asyncio.run(check_all_artists(force=getattr(args, "all", False)))
+
+
+async def run_scheduler(tick_seconds: float = SCHEDULER_TICK_SECONDS):
+    """Run `check_all_artists` every `tick_seconds`, until stopped.
+
+    Each cycle only checks the (artist, source) pairs that are due (see
+    `concert_checker.common.scheduling`), so the tick can be much shorter than the
+    interval between two checks of an artist.
+    """
+    while True:
+        started_at = time.monotonic()
+        try:
+            await check_all_artists()
+        # Whatever went wrong (e.g. the database was unreachable), the scheduler must
+        # keep running.
+        except Exception:  # noqa: BLE001
+            logfire.exception("Scraper cycle failed, retrying next cycle")
+        await asyncio.sleep(max(tick_seconds - (time.monotonic() - started_at), 0))
+
+
+async def check_all_artists(
+    max_concurrent_tasks: int = MAX_CONCURRENT_TASKS,
+    max_concurrent_tasks_per_source: int = MAX_CONCURRENT_TASKS_PER_SOURCE,
+    max_checks: int = SCHEDULER_MAX_CHECKS_PER_CYCLE,
+    force: bool = False,
+):
+    """Run the sources for the artists that are due, concurrently.
+
+    One task is created per (artist, source) pair that is due for a check, up to
+    `max_checks` (the most overdue first), plus one task per source that is not bound
+    to an artist (e.g. emails). The number of tasks running at the same time is capped
+    globally and per source class. Shows are written to the database as soon as each
+    task finishes, so a slow artist doesn't hold back the others, and the next check
+    of the pair is scheduled.
+
+    Args:
+        max_concurrent_tasks (int): Tasks running at the same time, at most.
+        max_concurrent_tasks_per_source (int): Tasks of a source class running at the
+            same time, at most.
+        max_checks (int): (artist, source) pairs checked in this cycle, at most.
+        force (bool): Check every pair, due or not.
+    """
+    async with AsyncSessionLocal() as db:
+        # Searching URLs costs model calls: they are looked up in one pass, and
+        # only for new artists or when a previous search is due to be retried.
+        await asyncio.gather(
+            *(
+                source_class.resolve_all(db)
+                for source_class in SOURCE_CLASSES
+                if issubclass(source_class, ArtistBoundSource)
+            )
+        )
+
+        artist_source_classes = {
+            source_class.name: source_class
+            for source_class in SOURCE_CLASSES
+            if issubclass(source_class, ArtistBoundSource)
+        }
+        if force:
+            artist_names = await get_artist_names(db)
+            checks = [
+                (artist_name, source_name)
+                for source_name in artist_source_classes
+                for artist_name in artist_names
+            ]
         else:
-            source = source_class()
-
-        shows = source.fetch_shows(db)
-        add_shows_to_db(db, shows)
-
-    db.commit()
-
-    return
+            checks = [
+                (row.artist_name, row.source)
+                for row in await get_due_checks(
+                    db, list(artist_source_classes), datetime.now(), max_checks
+                )
+            ]
+        # New artists were added to the schedule.
+        await commit(db)
+        logfire.info("Checking {check_count} artist(s)", check_count=len(checks))
+
+        sources: list[Source] = [
+            artist_source_classes[source_name](artist_name)
+            for artist_name, source_name in checks
+        ]
+        sources.extend(
+            source_class()
+            for source_class in SOURCE_CLASSES
+            if not issubclass(source_class, ArtistBoundSource)
+        )
+
+        global_semaphore = asyncio.Semaphore(max_concurrent_tasks)
+        source_semaphores: defaultdict[type[Source], asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max_concurrent_tasks_per_source)
+        )
+
+        async def run_source(source: Source):
+            """Run a source, save its shows and schedule its next check.
+
+            Each task has its own session: a failing source only rolls back its own
+            work, and never expires objects loaded by the other tasks.
+            """
+            async with (
+                source_semaphores[type(source)],
+                global_semaphore,
+                AsyncSessionLocal() as task_db,
+            ):
+                # SQLite has a single writer: a task keeping a write transaction open
+                # while it fetches pages would block the other tasks.
+                task_db.info["commit_each_call"] = True
+                changed = False
+                try:
+                    try:
+                        if isinstance(source, ArtistBoundSource):
+                            await source.resolve(task_db)
+                        shows = await source.fetch_shows(task_db)
+                    except ArtistUrlNotFound as e:
+                        # Searched again later (see `common.url_resolution`).
+                        logfire.debug(
+                            "Skipping {source}: {error}", source=source.name, error=e
+                        )
+                        shows = []
+                    changed = await add_shows_to_db(task_db, shows)
+                    await source.on_shows_saved(task_db)
+                # Sources fail in many ways (pages, crawler, model): none of them may
+                # stop the other sources.
+                except Exception:  # noqa: BLE001
+                    logfire.exception(
+                        "{source} failed for {artist_name}",
+                        source=type(source).__name__,
+                        artist_name=getattr(source, "artist_name", None),
+                    )
+                    await rollback(task_db)
+                    if isinstance(source, ArtistBoundSource):
+                        await source.invalidate_checked_pages(task_db)
+                if isinstance(source, ArtistBoundSource):
+                    _ = await schedule_next_check(
+                        task_db, source.artist_name, source.name, changed
+                    )
+                await commit(task_db)
+
+        try:
+            _ = await asyncio.gather(*(run_source(source) for source in sources))
+        finally:
+            await close_crawler_pool()
+            await close_http_client()
+            page_content_cache.clear()
+            logfire.info(
+                "Extraction cache: {hits} hits, {misses} misses",
+                hits=extraction_cache_stats.hits,
+                misses=extraction_cache_stats.misses,
+            )
+            get_rate_limiter().log_stats()
 
 
-def add_shows_to_db(db: Session, artist_shows: list[ArtistShows]):
+async def add_shows_to_db(db: AsyncSession, artist_shows: list[ArtistShows]) -> bool:
+    """Add shows to the database, returning whether any concert was added or updated."""
     if len(artist_shows) == 0:
-        return
-
-    for artist_show in artist_shows:
-        artist_name = artist_show.artist_name
-        artist = get_or_create_artist(db, ArtistCreate(name=artist_name))
-        for show_details in artist_show.shows:
-            venue_id = None
-            if show_details.venue:
-                venue = get_or_create_venue(
-                    db,
-                    VenueCreate(
-                        name=show_details.venue,
-                        city=show_details.city,
-                        country=show_details.country,
-                        country_code=show_details.country_code,
-                    ),
-                )
-                venue_id = venue.id
-
-            if not isinstance(show_details.date, date):
-                logfire.warning("Need to implement the date parsing logic")
-                continue
-                # raise NotImplementedError("Need to implement the date parsing logic")
-
-            _ = get_or_create_concert(
-                db,
-                ConcertCreate(
-                    date=show_details.date,
-                    artist_id=artist.id,
-                    venue_id=venue_id,
-                    source_url=show_details.source_url,
-                    city=show_details.city,
-                    country=show_details.country,
-                    country_code=show_details.country_code,
-                ),
-            )
+        return False
+
+    result = await bulk_upsert_shows(db, artist_shows)
+    logfire.info(
+        "Added {inserted} concerts, updated {updated}",
+        inserted=result.inserted,
+        updated=result.updated,
+    )
+    return result.inserted + result.updated > 0
 
 
 if __name__ == "__main__":
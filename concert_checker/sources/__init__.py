@@ -1,23 +1,170 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from typing import ClassVar
 
-from sqlalchemy.orm import Session
+import logfire
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from concert_checker.common.dataclasses import ArtistShows
+from concert_checker.app.async_crud import (
+    get_artist_page_urls,
+    get_or_create_artist,
+    get_or_create_page_cache,
+    set_artist_pages,
+)
+from concert_checker.app.schemas import ArtistCreate, PageCacheCreate
+from concert_checker.common.dataclasses import ArtistShows, ShowDetails
+from concert_checker.common.fingerprint import normalize_page_content
+from concert_checker.common.llm_cache import cached_extraction
+from concert_checker.tools.web import fetch_page_content, page_has_changed
 
 
 class Source(ABC):
+    name: ClassVar[str]
+    # Bump when the prompt changes, to invalidate the cached extractions.
+    prompt_version: ClassVar[str] = "v1"
+
     @abstractmethod
-    def fetch_shows(self, db: Session) -> list[ArtistShows]:
+    async def fetch_shows(self, db: AsyncSession) -> list[ArtistShows]:
         pass
 
+    async def on_shows_saved(self, db: AsyncSession):
+        """Called once the shows returned by `fetch_shows` are saved.
+
+        Progress (e.g. the last email read) must be recorded here rather than in
+        `fetch_shows`: workers commit as they go (see `concert_checker.worker`), and
+        the shows could be lost if saving them failed after the progress was recorded.
+        """
+
 
 class ArtistBoundSource(Source, ABC):
     artist_name: str
 
     def __init__(self, artist_name: str):
         self.artist_name = artist_name
+        self._checked_urls: list[str] = []
 
     @abstractmethod
-    def resolve(self, db: Session):
-        """Resolve dependencies for the source (base url, etc.)"""
-        pass
+    async def resolve(self, db: AsyncSession):
+        """Resolve dependencies for the source (base url, etc.)
+
+        Raises:
+            ArtistUrlNotFound: If the artist has no page for this source.
+        """
+
+    @classmethod
+    async def resolve_all(cls, db: AsyncSession):
+        """Resolve the dependencies of the source for every artist, in one pass.
+
+        Run before the artists are checked, so that `resolve` only reads what was
+        resolved here. The session must not be used by other tasks meanwhile.
+        """
+
+    async def pages_have_changed(
+        self, db: AsyncSession, base_url: str, urls: list[str] | None = None
+    ) -> bool:
+        """Check whether any page that produced shows last time has changed.
+
+        This is checked in code, before any agent is built: if nothing changed, the
+        source can return straight away without calling the model.
+
+        Args:
+            db (AsyncSession): The database session to use.
+            base_url (str): The entry point of the source, checked when no page is
+                tracked yet for the artist.
+            urls (list[str] | None): The pages to check instead, when the model only
+                reads some pages of the source.
+
+        Returns:
+            bool: True if at least one page changed (or was never seen before).
+        """
+        if urls is None:
+            artist = await get_or_create_artist(db, ArtistCreate(name=self.artist_name))
+            urls = await get_artist_page_urls(db, artist.id, self.name) or [base_url]
+        self._checked_urls = urls
+        changes = await asyncio.gather(
+            *(page_has_changed(db, url) for url in urls), return_exceptions=True
+        )
+        # A page that couldn't be checked is considered changed.
+        if all(change is False for change in changes):
+            logfire.info(
+                "No page changed for {artist_name} ({source}), skipping extraction",
+                artist_name=self.artist_name,
+                source=self.name,
+            )
+            return False
+        return True
+
+    async def track_pages(
+        self, db: AsyncSession, base_url: str, shows: list[ShowDetails]
+    ):
+        """Record the pages that produced `shows`, to check them on the next run.
+
+        The base URL is always tracked, so that an artist without any show is also
+        only re-extracted when its page changes.
+        """
+        artist = await get_or_create_artist(db, ArtistCreate(name=self.artist_name))
+        checked_urls = set(await get_artist_page_urls(db, artist.id, self.name)) or {
+            base_url
+        }
+        urls = {base_url} | {
+            show.source_url
+            for show in shows
+            if show.source_url.startswith(("http://", "https://"))
+        }
+        await set_artist_pages(db, artist.id, self.name, urls)
+
+        # Record the fingerprint of the pages that weren't checked by
+        # `pages_have_changed`. They were just fetched by the agent, so this is served
+        # from the page content cache.
+        results = await asyncio.gather(
+            *(page_has_changed(db, url) for url in urls - checked_urls),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logfire.warning("Could not fingerprint page: {error}", error=result)
+
+    async def cached_extract_shows(
+        self,
+        db: AsyncSession,
+        base_url: str,
+        extract: Callable[[], Awaitable[list[ShowDetails]]],
+    ) -> list[ShowDetails]:
+        """Run `extract`, unless the checked pages were already extracted before.
+
+        The extraction is keyed by the normalized content of the pages checked by
+        `pages_have_changed`. They were just fetched, so this is served from the page
+        content cache. If a page can't be read, the extraction runs uncached.
+        """
+        contents = await asyncio.gather(
+            *(fetch_page_content(url) for url in self._checked_urls),
+            return_exceptions=True,
+        )
+        if not contents or any(not isinstance(c, str) or not c for c in contents):
+            return await extract()
+
+        content = "\n\n".join(
+            [self.artist_name, base_url]
+            + [
+                f"{url}\n{normalize_page_content(page_content, url)}"
+                for url, page_content in zip(self._checked_urls, contents, strict=True)
+            ]
+        )
+        return await cached_extraction(
+            db,
+            f"{self.name}:{self.prompt_version}",
+            content,
+            list[ShowDetails],
+            extract,
+        )
+
+    async def invalidate_checked_pages(self, db: AsyncSession):
+        """Forget the fingerprints recorded by `pages_have_changed`.
+
+        To be called when the extraction fails after the check, so that the pages are
+        considered changed (and extracted) on the next run.
+        """
+        for url in self._checked_urls:
+            page_cache = await get_or_create_page_cache(db, PageCacheCreate(url=url))
+            page_cache.content_hash = None
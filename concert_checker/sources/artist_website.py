@@ -3,10 +3,8 @@ from typing import override
 
 from pydantic_ai import Agent
 from pydantic_ai.common_tools.duckduckgo import duckduckgo_search_tool
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from concert_checker.app.crud import get_or_create_artist, update_artist
-from concert_checker.app.schemas import ArtistCreate, ArtistUpdate
 from concert_checker.common.constants import LLM_MODEL_NAME
 from concert_checker.common.dataclasses import (
     AgentDependency,
@@ -14,11 +12,15 @@ from concert_checker.common.dataclasses import (
     ShowDetails,
     Url,
 )
+from concert_checker.common.url_resolution import get_artist_url, resolve_artist_urls
+from concert_checker.extractors.artist_website import extract_structured_shows
 from concert_checker.sources import ArtistBoundSource
-from concert_checker.tools.web import fetch_web_content, page_hash_has_changed
+from concert_checker.tools.web import fetch_web_content
 
 
 class ArtistWebsiteSource(ArtistBoundSource):
+    name = "artist_website"
+
     def __init__(self, artist_name: str, *args, **kwargs):
         super().__init__(artist_name, *args, **kwargs)
 
@@ -33,29 +35,61 @@ class ArtistWebsiteSource(ArtistBoundSource):
     # TODO: is this still really necessary? Given `fetch_shows` now has access to the
     # db...
     @override
-    def resolve(self, db: Session):
-        # TODO: add docstring
-        # Populating the DB with the website base url
-        artist = get_or_create_artist(db, ArtistCreate(name=self.artist_name))
-        if (url := artist.website_base_url) is None:
-            url = find_artist_website(self.artist_name)
-            _ = update_artist(db, ArtistUpdate(id=artist.id, website_base_url=url))
-            # TODO: encapsulate db logic in try/except?
+    async def resolve(self, db: AsyncSession):
+        self._base_url = await get_artist_url(
+            db, "website", self.artist_name, find_artist_website
+        )
 
-        self._base_url = url
+    @override
+    @classmethod
+    async def resolve_all(cls, db: AsyncSession):
+        _ = await resolve_artist_urls(db, "website", find_artist_website)
 
     # AI? Now that we send the `db` as arg, `resolve` is useless? Is this an
     # anti-pattern?
     @override
-    def fetch_shows(self, db: Session) -> list[ArtistShows]:
+    async def fetch_shows(self, db: AsyncSession) -> list[ArtistShows]:
+        # Structured data and tour widgets don't need a model, and are cheap enough
+        # that we don't bother checking whether the pages changed. The model only
+        # reads the pages that have neither.
+        structured = await extract_structured_shows(self.base_url)
+        shows = structured.shows
+        pages = structured.pages_without_data
+        if not pages:
+            return [ArtistShows(artist_name=self.artist_name, shows=shows)]
+
+        # Only some tour pages need the model: they are the ones checked for changes.
+        urls = None if pages == [self.base_url] else pages
+        if await self.pages_have_changed(db, self.base_url, urls):
+            extracted = await self.cached_extract_shows(
+                db, self.base_url, lambda: self._extract_shows(db, urls)
+            )
+            await self.track_pages(db, self.base_url, extracted)
+            shows = shows + extracted
+        return [ArtistShows(artist_name=self.artist_name, shows=shows)]
+
+    async def _extract_shows(
+        self, db: AsyncSession, pages: list[str] | None = None
+    ) -> list[ShowDetails]:
+        """Extract the shows of the website with the model.
+
+        Args:
+            db (AsyncSession): The database session, used by the agent's tools.
+            pages (list[str] | None): The only pages to extract shows from, the other
+                pages having been read from their structured data. The whole website
+                if None.
+        """
+        scope = (
+            "Only extract the shows listed on these pages, the shows of the other "
+            f"pages were already collected: {', '.join(pages)}."
+            if pages
+            else ""
+        )
         show_extractor_agent = Agent(
             LLM_MODEL_NAME,
             # TODO: I might actually decide to _not_ extract a year if the year is not
             # available, and actually leave this logic for deterministic
             # post-processing.
-            # TODO: The way I'm using `page_hash_has_changed` is probably introducing a
-            # bug. If the main page hasn't changed, but the "tour" page has changed,
-            # then likely the agent will just skip it altogether. That's a big problem.
             system_prompt=f"""
                 You are a helpful assistant that navigates the official website of the
                 artist "{self.artist_name}" and extracts the list of show dates. Your task is
@@ -64,13 +98,7 @@ class ArtistWebsiteSource(ArtistBoundSource):
                 instance named: "Live", "Shows", "Tour", "Concerts", etc.).
 
                 The artist's official website is {self.base_url}. You can fetch the
-                content of any page of the website using the provided tool.
-
-                Before fetching content, you will use the `page_hash_has_changed` tool
-                to check if the content of the page has changed since the last time it
-                was fetched. If the content has not changed, you can skip fetching the
-                content. If you don't have any new page to parse, you can
-                return an empty list.
+                content of any page of the website using the provided tool. {scope}
 
                 The `source_url` field of the output should be the URL of the page where
                 you found the show details.
@@ -88,24 +116,24 @@ class ArtistWebsiteSource(ArtistBoundSource):
 
                 If you cannot find any show date, return an empty list.
                 """,
-            tools=[fetch_web_content, page_hash_has_changed],
+            tools=[fetch_web_content],
             output_type=list[ShowDetails],
             deps_type=AgentDependency,
         )
-        shows = show_extractor_agent.run_sync(
+        result = await show_extractor_agent.run(
             self.artist_name, deps=AgentDependency(db=db)
-        ).output
-        return [ArtistShows(artist_name=self.artist_name, shows=shows)]
+        )
+        return result.output
 
 
-def find_artist_website(artist_name: str) -> str:
+async def find_artist_website(artist_name: str) -> str | None:
     """Find the official website of a music artist.
 
     Args:
         artist_name (str): The name of the artist.
 
     Returns:
-        ArtistWebsite: An object containing the URL of the artist's official website.
+        str | None: The URL of the artist's official website, or None if not found.
     """
     agent = Agent(
         LLM_MODEL_NAME,
@@ -116,11 +144,7 @@ def find_artist_website(artist_name: str) -> str:
         tools=[duckduckgo_search_tool()],
         output_type=Url,
     )
-    response = agent.run_sync(
+    response = await agent.run(
         f"What is the official website of the artist '{artist_name}'?"
     )
-    if response.output.url is None:
-        # TODO: add an exception in case the url is not found (None)
-        pass
-    url = response.output.url
-    return url
+    return response.output.url
@@ -1,39 +1,56 @@
+import asyncio
 from datetime import datetime
 from typing import override
 
+import httpx
+import logfire
 from pydantic_ai import Agent
-from sqlalchemy.orm import Session
+from pydantic_ai.exceptions import AgentRunError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from concert_checker.common.constants import LLM_MODEL_NAME
-from concert_checker.common.dataclasses import AgentDependency, ArtistShows
+from concert_checker.app.async_crud import get_mailbox_cursors, set_mailbox_cursors
+from concert_checker.common.constants import (
+    EMAIL_EXTRACTION_BATCH_MAX_CHARS,
+    EMAIL_EXTRACTION_BATCH_SIZE,
+    EMAIL_EXTRACTION_CONCURRENCY,
+    EMAIL_PRECLASSIFIER_ENABLED,
+    IMAP_HOST,
+    IMAP_USER,
+    LLM_MODEL_NAME,
+)
+from concert_checker.common.dataclasses import (
+    AgentDependency,
+    ArtistShows,
+    EmailContent,
+    EmailShows,
+    MailboxCursor,
+)
+from concert_checker.common.email_classifier import drop_non_show_emails
+from concert_checker.common.email_dedup import drop_seen_emails, record_seen_emails
+from concert_checker.common.fingerprint import normalize_text
+from concert_checker.common.llm_cache import cached_extraction
+from concert_checker.common.llm_calls import MicroBatcher, run_with_retries
 from concert_checker.sources import Source
 from concert_checker.tools.db import add_artist_to_db, list_artists_in_db
-from concert_checker.tools.email import fetch_unread_emails
+from concert_checker.tools.email import fetch_new_emails
 from concert_checker.tools.web import fetch_web_content
 
 
-class EmailSource(Source):
-    @override
-    def fetch_shows(self, db: Session) -> list[ArtistShows]:
-        emails = fetch_unread_emails()
-        if not emails:
-            return []
-
-        # TODO: have the presale/sale as first-class citizen. Right now I'm afraid the
-        # agent may miss out on some important information because it doesn't provide
-        # the information in the correct way (e.g. "tour annonced! dates tbc!")
-        # TODO: right now, festivals will not be correctly extracted, because we only
-        # extract 1 artist per each email. But, the fondamental question is: should we
-        # allow to fetch info from artists that are not in the db? (i.e that we haven't
-        # expressed an interest towards)? Actually, we would scrap the info from _all_
-        # artists (in the email), and have a system of "favorite" to only get
-        # notifications from those...
-        show_extractor_agent = Agent(
-            LLM_MODEL_NAME,
-            system_prompt=f"""
+def _system_prompt(batched: bool) -> str:
+    if batched:
+        input_description = """
+                You are reading several emails coming from musical artist
+                newsletters/email lists. Each email starts with a `=== Email <n> ===`
+                line. Handle each email on its own, as described below, and return one
+                entry per email: its number `<n>` as `email_number`, and the artist and
+                their shows, or null if the email is not about an artist's shows.
+                """
+    else:
+        input_description = """
                 You are reading emails coming from a musical artist newsletter/email
                 list.
-
+                """
+    return f"""{input_description}
                 Your task is 3-fold:
 
                 1. Identify the name of the artist. Use the `list_artists_in_db` tool
@@ -59,20 +76,136 @@ class EmailSource(Source):
                 link to find the show info, set it to that URL.
 
                 If the emails don't announce any shows, return an empty list.
-                """,
-            tools=[list_artists_in_db, add_artist_to_db, fetch_web_content],
-            output_type=ArtistShows,
-            deps_type=AgentDependency,
-        )
-
-        # TODO: async
-        all_artist_shows: list[ArtistShows] = []
-        for email in emails:
+                """
+
+
+def _build_agent[T](batched: bool, output_type: type[T]) -> Agent[AgentDependency, T]:
+    return Agent(
+        LLM_MODEL_NAME,
+        system_prompt=_system_prompt(batched),
+        tools=[list_artists_in_db, add_artist_to_db, fetch_web_content],
+        output_type=output_type,
+        deps_type=AgentDependency,
+    )
+
+
+class EmailSource(Source):
+    name = "email"
+
+    def __init__(self):
+        # Recorded by `on_shows_saved`, once the shows of the emails are saved.
+        self._cursors: dict[str, MailboxCursor] = {}
+        self._new_emails: list[EmailContent] = []
+
+    @override
+    async def fetch_shows(self, db: AsyncSession) -> list[ArtistShows]:
+        cursors = await get_mailbox_cursors(db, IMAP_HOST, IMAP_USER)
+        emails, self._cursors = await asyncio.to_thread(fetch_new_emails, cursors)
+        # Copies of newsletters already extracted, e.g. in an earlier run or sent to
+        # another address.
+        emails = self._new_emails = await drop_seen_emails(db, emails)
+        if EMAIL_PRECLASSIFIER_ENABLED:
+            # Merch, records, videos... don't need a model call.
+            emails = drop_non_show_emails(emails)
+        if not emails:
+            return []
+
+        # TODO: have the presale/sale as first-class citizen. Right now I'm afraid the
+        # agent may miss out on some important information because it doesn't provide
+        # the information in the correct way (e.g. "tour annonced! dates tbc!")
+        # TODO: right now, festivals will not be correctly extracted, because we only
+        # extract 1 artist per each email. But, the fondamental question is: should we
+        # allow to fetch info from artists that are not in the db? (i.e that we haven't
+        # expressed an interest towards)? Actually, we would scrap the info from _all_
+        # artists (in the email), and have a system of "favorite" to only get
+        # notifications from those...
+        show_extractor_agent = _build_agent(batched=False, output_type=ArtistShows)
+        batch_extractor_agent = _build_agent(batched=True, output_type=list[EmailShows])
+        model_calls = asyncio.Semaphore(EMAIL_EXTRACTION_CONCURRENCY)
+
+        async def run_agent[T](agent: Agent[AgentDependency, T], prompt: str) -> T:
+            async with model_calls:
+                result = await run_with_retries(
+                    lambda: agent.run(prompt, deps=AgentDependency(db=db))
+                )
+            return result.output
+
+        async def extract_batch(email_texts: list[str]) -> list[ArtistShows | None]:
+            if len(email_texts) > 1:
+                prompt = "\n\n".join(
+                    f"=== Email {i} ===\n{email_text}"
+                    for i, email_text in enumerate(email_texts, start=1)
+                )
+                outputs = await run_agent(batch_extractor_agent, prompt)
+                # Answers are matched to the emails by the number the model echoes,
+                # not by position. An answer that doesn't account for every email
+                # exactly once can't be trusted (nor cached): it is discarded.
+                numbers = [output.email_number for output in outputs]
+                if sorted(numbers) == list(range(1, len(email_texts) + 1)):
+                    by_number = {
+                        output.email_number: output.artist_shows for output in outputs
+                    }
+                    return [by_number[i] for i in range(1, len(email_texts) + 1)]
+                logfire.warning(
+                    "Got results for emails {numbers} of a batch of {email_count}, "
+                    "extracting them one by one",
+                    numbers=numbers,
+                    email_count=len(email_texts),
+                )
+            return list(
+                await asyncio.gather(
+                    *(
+                        run_agent(show_extractor_agent, email_text)
+                        for email_text in email_texts
+                    )
+                )
+            )
+
+        # Short emails (most newsletters) can be packed into a single model call.
+        batcher = MicroBatcher(extract_batch, max_size=EMAIL_EXTRACTION_BATCH_SIZE)
+
+        async def process(email: EmailContent) -> ArtistShows | None:
             email_text = f"Subject: {email.subject}\nFrom: {email.from_addr}\nDate: {email.date}\n\n{email.body}"
-            artist_shows = show_extractor_agent.run_sync(
-                email_text, deps=AgentDependency(db=db)
-            ).output
-            if artist_shows:
-                all_artist_shows.append(artist_shows)
 
-        return all_artist_shows
+            async def extract() -> ArtistShows | None:
+                if (
+                    EMAIL_EXTRACTION_BATCH_SIZE > 1
+                    and len(email_text) <= EMAIL_EXTRACTION_BATCH_MAX_CHARS
+                ):
+                    return await batcher.submit(email_text)
+                return await run_agent(show_extractor_agent, email_text)
+
+            # The same email (e.g. re-fetched after a failed run, or sent to several
+            # addresses) is only extracted once.
+            try:
+                return await cached_extraction(
+                    db,
+                    f"{self.name}:{self.prompt_version}",
+                    normalize_text(email_text),
+                    ArtistShows | None,
+                    extract,
+                )
+            except (AgentRunError, httpx.HTTPError):
+                # Skipped, so that one email the model can't handle doesn't hold
+                # back the others (and the mailbox cursors) on every run.
+                logfire.exception(
+                    "Could not extract the shows of email {subject!r} from {from_addr}",
+                    subject=email.subject,
+                    from_addr=email.from_addr,
+                )
+                return None
+
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                tasks = [task_group.create_task(process(email)) for email in emails]
+        finally:
+            await batcher.aclose()
+        return [artist_shows for task in tasks if (artist_shows := task.result())]
+
+    @override
+    async def on_shows_saved(self, db: AsyncSession):
+        # Only once the shows are saved: if anything fails before, the emails are
+        # fetched and extracted again on the next run. Emails whose extraction failed
+        # are recorded too: they would fail again.
+        await record_seen_emails(db, self._new_emails)
+        await set_mailbox_cursors(db, IMAP_HOST, IMAP_USER, self._cursors)
@@ -1,12 +1,12 @@
 from datetime import datetime
 from typing import override
 
+import httpx
+import logfire
 from pydantic_ai import Agent
 from pydantic_ai.common_tools.duckduckgo import duckduckgo_search_tool
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from concert_checker.app.crud import get_or_create_artist, update_artist
-from concert_checker.app.schemas import ArtistCreate, ArtistUpdate
 from concert_checker.common.constants import LLM_MODEL_NAME
 from concert_checker.common.dataclasses import (
     AgentDependency,
@@ -14,11 +14,18 @@ from concert_checker.common.dataclasses import (
     ShowDetails,
     Url,
 )
+from concert_checker.common.url_resolution import get_artist_url, resolve_artist_urls
+from concert_checker.extractors.songkick import (
+    SongkickParseError,
+    fetch_calendar_shows,
+)
 from concert_checker.sources import ArtistBoundSource
-from concert_checker.tools.web import fetch_web_content, page_hash_has_changed
+from concert_checker.tools.web import fetch_web_content
 
 
 class SongkickSource(ArtistBoundSource):
+    name = "songkick"
+
     def __init__(self, artist_name: str, *args, **kwargs):
         super().__init__(artist_name, *args, **kwargs)
         self._base_url: str | None = None
@@ -30,15 +37,42 @@ class SongkickSource(ArtistBoundSource):
         return self._base_url
 
     @override
-    def resolve(self, db: Session):
-        artist = get_or_create_artist(db, ArtistCreate(name=self.artist_name))
-        if (url := artist.songkick_url) is None:
-            url = find_songkick_url(self.artist_name)
-            _ = update_artist(db, ArtistUpdate(id=artist.id, songkick_url=url))
-        self._base_url = url
+    async def resolve(self, db: AsyncSession):
+        self._base_url = await get_artist_url(
+            db, "songkick", self.artist_name, find_songkick_url
+        )
+
+    @override
+    @classmethod
+    async def resolve_all(cls, db: AsyncSession):
+        _ = await resolve_artist_urls(db, "songkick", find_songkick_url)
 
     @override
-    def fetch_shows(self, db: Session) -> list[ArtistShows]:
+    async def fetch_shows(self, db: AsyncSession) -> list[ArtistShows]:
+        # The calendar can usually be parsed without a model. This is cheap enough
+        # that we don't bother checking whether the page changed.
+        try:
+            shows = await fetch_calendar_shows(self.base_url)
+        except (SongkickParseError, httpx.HTTPError) as e:
+            logfire.warning(
+                "Could not parse the Songkick calendar of {artist_name}, falling back "
+                "to the agent: {error}",
+                artist_name=self.artist_name,
+                error=e,
+            )
+        else:
+            return [ArtistShows(artist_name=self.artist_name, shows=shows)]
+
+        if not await self.pages_have_changed(db, self.base_url):
+            return []
+
+        shows = await self.cached_extract_shows(
+            db, self.base_url, lambda: self._extract_shows(db)
+        )
+        await self.track_pages(db, self.base_url, shows)
+        return [ArtistShows(artist_name=self.artist_name, shows=shows)]
+
+    async def _extract_shows(self, db: AsyncSession) -> list[ShowDetails]:
         # TODO: there's probably a way to abstract this...
         show_extractor_agent = Agent(
             LLM_MODEL_NAME,
@@ -50,12 +84,6 @@ class SongkickSource(ArtistBoundSource):
                 The artist's Songkick page is {self.base_url}. You can fetch the
                 content of any page of the website using the provided tool.
 
-                Before fetching content, you will use the `page_hash_has_changed` tool
-                to check if the content of the page has changed since the last time it
-                was fetched. If the content has not changed, you can skip fetching the
-                content. If you don't have any new page to parse, you can
-                return an empty list.
-
                 The `source_url` field of the output should be the URL of the page where
                 you found the show details.
 
@@ -72,18 +100,17 @@ class SongkickSource(ArtistBoundSource):
 
                 If you cannot find any show date, return an empty list.
                 """,
-            # TODO: add a hash of the website so we only parse when updates are detected
-            tools=[fetch_web_content, page_hash_has_changed],
+            tools=[fetch_web_content],
             output_type=list[ShowDetails],
             deps_type=AgentDependency,
         )
-        shows = show_extractor_agent.run_sync(
+        result = await show_extractor_agent.run(
             self.artist_name, deps=AgentDependency(db=db)
-        ).output
-        return [ArtistShows(artist_name=self.artist_name, shows=shows)]
+        )
+        return result.output
 
 
-def find_songkick_url(artist_name: str) -> str | None:
+async def find_songkick_url(artist_name: str) -> str | None:
     agent = Agent(
         LLM_MODEL_NAME,
         system_prompt="""
@@ -98,14 +125,11 @@ def find_songkick_url(artist_name: str) -> str | None:
         tools=[duckduckgo_search_tool()],
         output_type=Url,
     )
-    response = agent.run_sync(
+    response = await agent.run(
         f"What is the Songkick page of the artist '{artist_name}'?"
     )
-    if response.output.url is None:
-        raise ValueError(
-            f"Could not find the Songkick page for artist '{artist_name}'."
-        )
-    url = response.output.url
+    if (url := response.output.url) is None:
+        return None
 
     # The "/calendar" endpoint shows more shows.
     if not url.endswith("/calendar"):
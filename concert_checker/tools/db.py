@@ -1,6 +1,6 @@
 from pydantic_ai import RunContext
 
-from concert_checker.app.crud import get_or_create_artist, search_artists_by_name
+from concert_checker.app.async_crud import get_or_create_artist, search_artists_by_name
 from concert_checker.app.schemas import ArtistCreate
 from concert_checker.common.dataclasses import AgentDependency
 
@@ -10,9 +10,11 @@ async def list_artists_in_db(
 ) -> list[str]:
     """Search for existing artists in the database by name.
 
-    Performs a case-insensitive partial match. Use this to check if an artist
-    already exists before creating a new entry, and to get the exact stored
-    name for consistency.
+    Performs a partial match ignoring case, accents, punctuation and a leading
+    "The". Best matches come first; if nothing contains the query, similarly
+    spelled names are returned. Use this to check if an artist already exists
+    before creating a new entry, and to get the exact stored name for
+    consistency.
 
     Args:
         name_query: The artist name (or partial name) to search for.
@@ -22,7 +24,7 @@ async def list_artists_in_db(
     """
     db = ctx.deps.db
 
-    artists = search_artists_by_name(db, name_query)
+    artists = await search_artists_by_name(db, name_query)
     return [artist.name for artist in artists]
 
 
@@ -47,5 +49,5 @@ async def add_artist_to_db(ctx: RunContext[AgentDependency], artist_name: str) -
         # The artist is already in the db
         return False
 
-    _ = get_or_create_artist(db, ArtistCreate(name=artist_name))
+    _ = await get_or_create_artist(db, ArtistCreate(name=artist_name))
     return True
@@ -1,21 +1,34 @@
+import binascii
 import imaplib
+import quopri
+import re
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, timedelta
 from email import message_from_bytes
 from email.header import decode_header
 from email.message import Message
-from typing import cast
+from itertools import batched, takewhile
+from typing import Any, cast
 
 import html2text
 import logfire
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 
 from concert_checker.common.constants import (
+    IMAP_FETCH_BATCH_SIZE,
+    IMAP_FETCH_MODE,
     IMAP_HOST,
+    IMAP_INITIAL_SYNC_DAYS,
     IMAP_MAILBOXES,
+    IMAP_MAX_BODY_BYTES,
+    IMAP_MAX_FETCH_ATTEMPTS,
     IMAP_PASSWORD,
     IMAP_TO_ADDRESSES,
     IMAP_USER,
 )
-from concert_checker.common.dataclasses import EmailContent
+from concert_checker.common.dataclasses import EmailContent, MailboxCursor
 
 
 def _decode_header_value(value: str) -> str:
@@ -31,6 +44,14 @@ def _decode_header_value(value: str) -> str:
     return "".join(decoded)
 
 
+def _html_to_text(html: str) -> str:
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    converter.ignore_images = True
+    converter.body_width = 0
+    return converter.handle(html)
+
+
 def _extract_body(msg: Message) -> str:
     """Extract the body from an email message.
 
@@ -67,92 +88,459 @@ def _extract_body(msg: Message) -> str:
         return text_body
 
     if html_body:
-        converter = html2text.HTML2Text()
-        converter.ignore_links = False
-        converter.ignore_images = True
-        converter.body_width = 0
-        return converter.handle(html_body)
+        return _html_to_text(html_body)
 
     return ""
 
 
-def fetch_unread_emails() -> list[EmailContent]:
-    """Fetch unread emails for all configured IMAP_TO_ADDRESSES.
+def _to_email_content(headers: Message, body: str) -> EmailContent:
+    # TODO: use crawl4ai to convert to markdown.
+    body_as_md = DefaultMarkdownGenerator().generate_markdown(body).raw_markdown
+    return EmailContent(
+        subject=_decode_header_value(headers.get("Subject", "")),
+        from_addr=headers.get("From", ""),
+        to_addr=headers.get("To", ""),
+        date=headers.get("Date", ""),
+        body=body_as_md,
+        message_id=headers.get("Message-ID", "").strip(),
+    )
+
+
+def _parse_email(raw_bytes: bytes) -> EmailContent:
+    msg = message_from_bytes(raw_bytes)
+    return _to_email_content(msg, _extract_body(msg))
+
+
+_MONTHS = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+_HEADER_FIELDS = "SUBJECT FROM TO DATE MESSAGE-ID"
+
+# Tokens of a FETCH response: parentheses, quoted strings, literal markers ("{123}",
+# the literal itself comes next in imaplib's data) and atoms, including section specs
+# such as `BODY[HEADER.FIELDS (SUBJECT)]<0>`.
+_FETCH_TOKEN = re.compile(
+    rb"""\s*(?:(?P<open>\()|(?P<close>\))|"(?P<quoted>(?:[^"\\]|\\.)*)"|\{\d+\}$"""
+    rb"""|(?P<atom>[^\s()"\[\]]+(?:\[[^\]]*\](?:<\d+>)?)?))"""
+)
+_OPEN, _CLOSE = object(), object()
+
+
+def _imap_date(day: date) -> str:
+    """Format a date for IMAP searches ("01-Jan-2026"), whatever the locale."""
+    return f"{day.day:02d}-{_MONTHS[day.month - 1]}-{day.year}"
+
 
-    Connects via IMAP SSL, searches each configured mailbox for UNSEEN messages
-    matching any of the TO addresses, parses them, and marks them as seen.
+def _to_criteria(addresses: list[str]) -> str:
+    """Search criteria matching emails sent to any of `addresses`."""
+    if len(addresses) == 1:
+        return f'TO "{addresses[0]}"'
+    return f"OR {_to_criteria(addresses[:1])} ({_to_criteria(addresses[1:])})"
 
-    Returns a list of EmailContent with the extracted body text.
+
+def _uid_set(uids: list[int]) -> str:
+    """Compress sorted UIDs into an IMAP sequence set: [1, 2, 3, 7] -> "1:3,7"."""
+    ranges: list[str] = []
+    start = previous = uids[0]
+    for uid in [*uids[1:], None]:
+        if uid is not None and uid == previous + 1:
+            previous = uid
+            continue
+        ranges.append(str(start) if start == previous else f"{start}:{previous}")
+        if uid is not None:
+            start = previous = uid
+    return ",".join(ranges)
+
+
+def _tokenize(line: bytes) -> Iterator[Any]:
+    pos = 0
+    while line[pos:].strip():
+        match = _FETCH_TOKEN.match(line, pos)
+        if match is None:
+            raise ValueError(f"Unexpected FETCH response: {line[pos : pos + 50]!r}")
+        pos = match.end()
+        if match["open"]:
+            yield _OPEN
+        elif match["close"]:
+            yield _CLOSE
+        elif match["quoted"] is not None:
+            yield re.sub(rb"\\(.)", rb"\1", match["quoted"]).decode(errors="replace")
+        elif match["atom"]:
+            atom = match["atom"].decode(errors="replace")
+            yield None if atom.upper() == "NIL" else atom
+
+
+def _parse_list(tokens: Iterator[Any]) -> list[Any]:
+    items: list[Any] = []
+    for token in tokens:
+        if token is _CLOSE:
+            return items
+        items.append(_parse_list(tokens) if token is _OPEN else token)
+    raise ValueError("Unbalanced FETCH response")
+
+
+def _parse_fetch_response(data: list[Any]) -> dict[int, dict[str, Any]]:
+    """Map UIDs to the items of a `UID FETCH` response.
+
+    imaplib returns `(b"1 (UID 42 BODY[] {123}", b"<literal>")` tuples, followed by
+    `b")"` (or by `b" UID 42)"` when the server sends the UID after the literal).
+    Item names are upper-cased, literals are kept as bytes, strings and atoms are
+    decoded, lists (e.g. BODYSTRUCTURE) are nested lists and NIL is None.
+
+    Raises:
+        ValueError: If the response can't be parsed.
     """
-    results: list[EmailContent] = []
-    md_generator = DefaultMarkdownGenerator()
-    logfire.info("Reading emails")
 
-    if not IMAP_TO_ADDRESSES:
-        logfire.warning("No IMAP_TO_ADDRESSES configured — skipping email fetch")
-        return results
+    def tokens() -> Iterator[Any]:
+        for item in data:
+            if isinstance(item, tuple):
+                yield from _tokenize(item[0])
+                yield item[1]
+            elif isinstance(item, bytes):
+                yield from _tokenize(item)
 
-    with imaplib.IMAP4_SSL(IMAP_HOST) as imap:
-        _ = imap.login(IMAP_USER, IMAP_PASSWORD)
+    messages: dict[int, dict[str, Any]] = {}
+    stream = tokens()
+    for token in stream:
+        # Each message is `<sequence number> (<name> <value> ...)`.
+        if next(stream, None) is not _OPEN:
+            raise ValueError(f"Unexpected FETCH response after {token!r}")
+        fields = _parse_list(stream)
+        items = {
+            str(name).upper(): value
+            for name, value in zip(fields[::2], fields[1::2], strict=True)
+        }
+        if (uid := items.get("UID")) is not None:
+            messages[int(uid)] = items
+    return messages
 
-        for mailbox in IMAP_MAILBOXES:
-            select_status, _ = imap.select(mailbox, readonly=False)
-            if select_status != "OK":
-                logfire.warning(
-                    "Could not select mailbox {mailbox!r} — check IMAP_MAILBOXES config",
-                    mailbox=mailbox,
-                )
-                continue
 
-            for to_address in IMAP_TO_ADDRESSES:
-                # TODO: use a datetime-based search (e.g. since last time we checked).
-                # This avoids false negatives due to the user simply openining their
-                # email...
-                status, message_ids = imap.search(None, "UNSEEN", f'TO "{to_address}"')
-                ids_bytes = cast(bytes, message_ids[0])
-                if status != "OK" or not ids_bytes:
-                    logfire.debug("No unseen emails for {to_address} in {mailbox}", to_address=to_address, mailbox=mailbox)
-                    continue
+def _find_item(items: dict[str, Any], prefix: str) -> bytes | None:
+    """Return the value of the item starting with `prefix` (e.g. `BODY[1.2]`)."""
+    for name, value in items.items():
+        if name.startswith(prefix) and value is not None:
+            return value if isinstance(value, bytes) else str(value).encode()
+    return None
+
+
+@dataclass(frozen=True)
+class _TextPart:
+    section: str  # e.g. "1.2", for BODY[<section>]
+    subtype: str  # "plain" or "html"
+    charset: str
+    encoding: str
+    size: int
+
+
+def _text_parts(structure: list[Any], section: str = "") -> Iterator[_TextPart]:
+    """Walk a BODYSTRUCTURE, yielding the text/plain and text/html parts.
+
+    Attachments and attached emails (message/rfc822) are skipped.
+    """
+    if structure and isinstance(structure[0], list):
+        # Multipart: the children come first, followed by the subtype.
+        children = takewhile(lambda child: isinstance(child, list), structure)
+        for i, child in enumerate(children, start=1):
+            yield from _text_parts(child, f"{section}.{i}" if section else str(i))
+        return
+
+    main_type, subtype, params, _, _, encoding, size = structure[:7]
+    if str(main_type).lower() != "text" or str(subtype).lower() not in (
+        "plain",
+        "html",
+    ):
+        return
+    if any(
+        isinstance(field, list) and str(field[0]).lower() == "attachment"
+        for field in structure[7:]
+        if field
+    ):
+        return
+    params = dict(zip(params[::2], params[1::2], strict=True)) if params else {}
+    charset = next((v for k, v in params.items() if k.lower() == "charset"), "utf-8")
+    yield _TextPart(
+        # A single-part email has its body in section 1.
+        section=section or "1",
+        subtype=str(subtype).lower(),
+        charset=charset,
+        encoding=str(encoding or "7bit").lower(),
+        size=int(size or 0),
+    )
+
+
+def _pick_text_part(structure: list[Any]) -> _TextPart | None:
+    """Pick the part `_extract_body` would use: text/plain first, then text/html."""
+    parts = list(_text_parts(structure))
+    return next((part for part in parts if part.subtype == "plain"), None) or next(
+        iter(parts), None
+    )
 
-                msg_count = len(ids_bytes.split())
+
+def _decode_part(payload: bytes, part: _TextPart) -> str:
+    """Decode a (possibly truncated) part fetched with BODY.PEEK[<section>]."""
+    if part.encoding == "base64":
+        payload = re.sub(rb"\s+", b"", payload)
+        # Truncated fetches can cut a base64 quantum in half.
+        payload = binascii.a2b_base64(payload[: len(payload) // 4 * 4])
+    elif part.encoding == "quoted-printable":
+        payload = quopri.decodestring(payload)
+    try:
+        return payload.decode(part.charset, errors="replace")
+    except LookupError:
+        return payload.decode("utf-8", errors="replace")
+
+
+def _is_copy(message_id: str, seen_message_ids: set[str]) -> bool:
+    """Whether an email with this Message-ID was already fetched (and remember it)."""
+    if not message_id:
+        return False
+    if message_id in seen_message_ids:
+        return True
+    seen_message_ids.add(message_id)
+    return False
+
+
+def _fetch_full_emails(
+    imap: imaplib.IMAP4, mailbox: str, uids: list[int], seen_message_ids: set[str]
+) -> dict[int, EmailContent | None]:
+    # BODY.PEEK doesn't set the "Seen" flag, unlike RFC822.
+    status, data = imap.uid("FETCH", _uid_set(uids), "(UID BODY.PEEK[])")
+    if status != "OK":
+        raise imaplib.IMAP4.error(f"Could not fetch emails from {mailbox}")
+    emails: dict[int, EmailContent | None] = {}
+    for uid, items in _parse_fetch_response(data).items():
+        if (raw_bytes := _find_item(items, "BODY[]")) is not None:
+            email = _parse_email(raw_bytes)
+            emails[uid] = (
+                None if _is_copy(email.message_id, seen_message_ids) else email
+            )
+    return emails
+
+
+def _fetch_text_emails(
+    imap: imaplib.IMAP4, mailbox: str, uids: list[int], seen_message_ids: set[str]
+) -> dict[int, EmailContent | None]:
+    """Fetch the headers and the text part of emails, without their attachments.
+
+    The BODYSTRUCTURE of the emails is read first, then only the part `_extract_body`
+    would use is fetched, truncated to IMAP_MAX_BODY_BYTES. Emails sharing the same
+    structure (e.g. newsletters from a same sender) are fetched in a single command.
+    The body of copies of an email already fetched (same Message-ID) isn't fetched.
+    """
+    status, data = imap.uid(
+        "FETCH",
+        _uid_set(uids),
+        f"(UID BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({_HEADER_FIELDS})])",
+    )
+    if status != "OK":
+        raise imaplib.IMAP4.error(f"Could not fetch emails from {mailbox}")
+    responses = _parse_fetch_response(data)
+    headers = {
+        uid: message_from_bytes(_find_item(items, "BODY[HEADER") or b"")
+        for uid, items in responses.items()
+    }
+    copies = {
+        uid
+        for uid in sorted(responses)
+        if _is_copy(headers[uid].get("Message-ID", "").strip(), seen_message_ids)
+    }
+
+    parts: dict[int, _TextPart] = {}
+    uids_by_section: defaultdict[str, list[int]] = defaultdict(list)
+    for uid, items in sorted(responses.items()):
+        if uid in copies:
+            continue
+        structure = items.get("BODYSTRUCTURE")
+        if isinstance(structure, list) and (part := _pick_text_part(structure)):
+            parts[uid] = part
+            uids_by_section[part.section].append(uid)
+
+    bodies: dict[int, str] = {}
+    for section, section_uids in uids_by_section.items():
+        status, data = imap.uid(
+            "FETCH",
+            _uid_set(section_uids),
+            f"(UID BODY.PEEK[{section}]<0.{IMAP_MAX_BODY_BYTES}>)",
+        )
+        if status != "OK":
+            raise imaplib.IMAP4.error(f"Could not fetch emails from {mailbox}")
+        for uid, items in _parse_fetch_response(data).items():
+            if (
+                uid not in parts
+                or (payload := _find_item(items, f"BODY[{section}]")) is None
+            ):
+                continue
+            part = parts[uid]
+            if part.size > IMAP_MAX_BODY_BYTES:
                 logfire.info(
-                    "Found {msg_count} unseen email(s) for {to_address} in {mailbox}",
-                    msg_count=msg_count,
-                    to_address=to_address,
+                    "Email {uid} in {mailbox} is {size} bytes, truncated to {max_bytes}",
+                    uid=uid,
                     mailbox=mailbox,
+                    size=part.size,
+                    max_bytes=IMAP_MAX_BODY_BYTES,
                 )
+            body = _decode_part(payload, part)
+            bodies[uid] = _html_to_text(body) if part.subtype == "html" else body
+
+    return {
+        uid: None
+        if uid in copies
+        else _to_email_content(headers[uid], bodies.get(uid, ""))
+        for uid in responses
+    }
+
+
+def _sync_mailbox(
+    imap: imaplib.IMAP4,
+    mailbox: str,
+    cursor: MailboxCursor | None,
+    seen_message_ids: set[str],
+) -> tuple[list[EmailContent], MailboxCursor | None]:
+    """Fetch the emails received in a mailbox since `cursor`.
+
+    Copies of emails in `seen_message_ids` (e.g. the same newsletter sent to several
+    addresses, or filed in several mailboxes) are skipped.
+
+    Returns:
+        The new emails and the cursor to use next time (None if the mailbox can't be
+        read). The cursor stops before the first email that couldn't be fetched,
+        unless it wasn't fetched in IMAP_MAX_FETCH_ATTEMPTS syncs: it's skipped then.
+    """
+    # Read-only: flags (e.g. "Seen") are left alone.
+    select_status, _ = imap.select(mailbox, readonly=True)
+    if select_status != "OK":
+        logfire.warning(
+            "Could not select mailbox {mailbox!r} — check IMAP_MAILBOXES config",
+            mailbox=mailbox,
+        )
+        return [], cursor
+
+    _, (uid_validity_bytes, *_) = imap.response("UIDVALIDITY")
+    uid_validity = int(cast(bytes, uid_validity_bytes))
+    previous_failure: tuple[int | None, int] = (None, 0)
+    if cursor is None or cursor.uid_validity != uid_validity:
+        # First sync, or the UIDs were reset by the server: start from recent emails.
+        since = date.today() - timedelta(days=IMAP_INITIAL_SYNC_DAYS)
+        logfire.info(
+            "Syncing {mailbox} from {since}", mailbox=mailbox, since=since.isoformat()
+        )
+        last_uid = 0
+        range_criteria = f"SINCE {_imap_date(since)}"
+    else:
+        last_uid = cursor.last_uid
+        range_criteria = f"UID {last_uid + 1}:*"
+        previous_failure = (cursor.failed_uid, cursor.fetch_attempts)
 
-                for msg_id_bytes in ids_bytes.split():
-                    msg_id = msg_id_bytes.decode()
-                    status, msg_data = imap.fetch(msg_id, "(RFC822)")
-                    if status != "OK" or not msg_data:
-                        logfire.warning(
-                            "Failed to fetch message {msg_id} in {mailbox}", msg_id=msg_id, mailbox=mailbox
-                        )
-                        continue
-
-                    first = msg_data[0]
-                    if not isinstance(first, tuple):
-                        continue
-
-                    raw_bytes: bytes = first[1]
-                    msg = message_from_bytes(raw_bytes)
-
-                    # TODO: use crawl4ai to convert to markdown.
-                    body = _extract_body(msg)
-                    body_as_md = md_generator.generate_markdown(body).raw_markdown
-                    results.append(
-                        EmailContent(
-                            subject=_decode_header_value(msg.get("Subject", "")),
-                            from_addr=msg.get("From", ""),
-                            to_addr=msg.get("To", ""),
-                            date=msg.get("Date", ""),
-                            body=body_as_md,
-                        )
+    status, data = imap.uid("SEARCH", range_criteria, _to_criteria(IMAP_TO_ADDRESSES))
+    if status != "OK":
+        logfire.warning("Search failed in {mailbox}", mailbox=mailbox)
+        return [], cursor
+    # "n:*" always matches the last email, even if its UID is below n.
+    uids = sorted(
+        uid for uid in map(int, cast(bytes, data[0] or b"").split()) if uid > last_uid
+    )
+    if not uids:
+        logfire.debug("No new emails in {mailbox}", mailbox=mailbox)
+        return [], MailboxCursor(uid_validity=uid_validity, last_uid=last_uid)
+
+    logfire.info(
+        "Found {msg_count} new email(s) in {mailbox}",
+        msg_count=len(uids),
+        mailbox=mailbox,
+    )
+    emails: list[EmailContent] = []
+    # The cursor only moves past the emails that were fetched: the first one that
+    # failed (and those after it) are fetched again next time, unless it keeps
+    # failing.
+    first_failed_uid: int | None = None
+    fetch_attempts = 0
+    fetch = _fetch_text_emails if IMAP_FETCH_MODE == "text" else _fetch_full_emails
+    for batch in batched(uids, IMAP_FETCH_BATCH_SIZE, strict=False):
+        messages = fetch(imap, mailbox, list(batch), seen_message_ids)
+        for uid in batch:
+            if uid not in messages:
+                logfire.warning(
+                    "Failed to fetch message {uid} in {mailbox}",
+                    uid=uid,
+                    mailbox=mailbox,
+                )
+                if first_failed_uid is not None:
+                    continue
+                failed_uid, attempts = previous_failure
+                attempts = attempts + 1 if uid == failed_uid else 1
+                if attempts < IMAP_MAX_FETCH_ATTEMPTS:
+                    first_failed_uid, fetch_attempts = uid, attempts
+                else:
+                    logfire.error(
+                        "Skipping message {uid} in {mailbox}, not fetched in "
+                        "{attempts} syncs",
+                        uid=uid,
+                        mailbox=mailbox,
+                        attempts=attempts,
                     )
-                    print(results[-1])
+            elif (email := messages[uid]) is not None:
+                emails.append(email)
+
+    if first_failed_uid is not None:
+        last_uid = max(
+            (uid for uid in uids if uid < first_failed_uid), default=last_uid
+        )
+    else:
+        last_uid = uids[-1]
+    return emails, MailboxCursor(
+        uid_validity=uid_validity,
+        last_uid=last_uid,
+        failed_uid=first_failed_uid,
+        fetch_attempts=fetch_attempts,
+    )
+
+
+def fetch_new_emails(
+    cursors: dict[str, MailboxCursor],
+) -> tuple[list[EmailContent], dict[str, MailboxCursor]]:
+    """Fetch the emails received since the last sync, for all IMAP_TO_ADDRESSES.
+
+    Each mailbox is synced incrementally on UIDs: only emails with a UID above the
+    last one processed are fetched, in batches of IMAP_FETCH_BATCH_SIZE per command.
+    Flags are left untouched, so reading an email doesn't hide it from the sync. If
+    the mailbox's UIDVALIDITY changed (or on the first sync), emails of the last
+    IMAP_INITIAL_SYNC_DAYS days are fetched.
 
-                    # TODO: in this case, the "Seen" status doesn't need to be updated.
-                    _ = imap.store(msg_id, "+FLAGS", "\\Seen")
+    Args:
+        cursors (dict[str, MailboxCursor]): The position of the last sync of each
+            mailbox, by mailbox name.
+
+    Returns:
+        The new emails (once per Message-ID), and the updated cursors. The cursors are
+        to be stored once the emails are processed.
+    """
+    logfire.info("Reading emails")
+    if not IMAP_TO_ADDRESSES:
+        logfire.warning("No IMAP_TO_ADDRESSES configured — skipping email fetch")
+        return [], cursors
+
+    results: list[EmailContent] = []
+    new_cursors = dict(cursors)
+    seen_message_ids: set[str] = set()
+    with imaplib.IMAP4_SSL(IMAP_HOST) as imap:
+        _ = imap.login(IMAP_USER, IMAP_PASSWORD)
+        for mailbox in IMAP_MAILBOXES:
+            emails, cursor = _sync_mailbox(
+                imap, mailbox, cursors.get(mailbox), seen_message_ids
+            )
+            results.extend(emails)
+            if cursor is not None:
+                new_cursors[mailbox] = cursor
 
-    return results
+    return results, new_cursors
@@ -1,60 +1,190 @@
-import hashlib
 from datetime import datetime
+from typing import Any
 
-from crawl4ai import AsyncWebCrawler
-from pydantic_ai import RunContext
+import httpx
+import logfire
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from concert_checker.app.crud import get_or_create_page_cache
+from concert_checker.app.async_crud import get_or_create_page_cache
+from concert_checker.app.models import PageCache
 from concert_checker.app.schemas import PageCacheCreate
-from concert_checker.common.dataclasses import AgentDependency
+from concert_checker.common.cache import ByteLRUCache
+from concert_checker.common.constants import (
+    PAGE_CONTENT_CACHE_MAX_BYTES,
+    PAGE_CONTENT_CACHE_TTL_SECONDS,
+    PAGE_CONTENT_PRUNING_ENABLED,
+    RATE_LIMIT_MAX_RETRIES,
+)
+from concert_checker.common.content_pruning import prune_page_content
+from concert_checker.common.crawler_pool import get_crawler_pool
+from concert_checker.common.fingerprint import content_fingerprint
+from concert_checker.common.http import get_http_client, get_rate_limiter
+
+# Pages rendered by `fetch_page_content`, so that checking whether a page has changed
+# (`page_has_changed`) and then reading it only renders the page once.
+page_content_cache = ByteLRUCache(
+    max_bytes=PAGE_CONTENT_CACHE_MAX_BYTES, ttl_seconds=PAGE_CONTENT_CACHE_TTL_SECONDS
+)
 
 
 async def fetch_web_content(url: str) -> str:
     """Fetch and extract content from a web page as markdown.
 
+    Only the parts of the page that may list shows (dates, venues, tickets, links to
+    tour pages...) are returned. "[…]" marks the parts that were left out.
+
     Args:
         url: The URL of the web page to fetch.
 
     Returns:
         The page content converted to markdown format.
     """
+    content = await fetch_page_content(url)
+    if not content or not PAGE_CONTENT_PRUNING_ENABLED:
+        return content
+
+    pruned = prune_page_content(content, url)
+    # The model only reads the text: the spans are logged to audit what was kept.
+    logfire.debug(
+        "Pruned {url} from {original_tokens} to {tokens} tokens",
+        url=url,
+        original_tokens=pruned.original_tokens,
+        tokens=pruned.tokens,
+        spans=pruned.spans,
+    )
+    return pruned.text
+
+
+async def fetch_page_content(url: str) -> str:
+    """Fetch the whole content of a web page as markdown, rendered by a browser.
+
+    Requests are spaced out per website, so this may wait before fetching the page.
+    """
     # TODO: add an alert/log in case we can't parse the content (output of the tool is
     # None)
-    async with AsyncWebCrawler() as crawler:
-        result = await crawler.arun(url)
-        return result.markdown
+    if (content := page_content_cache.get(url)) is not None:
+        return content
+
+    limiter = get_rate_limiter()
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        # Waiting for the domain doesn't hold a browser tab.
+        await limiter.acquire(url)
+        async with get_crawler_pool().lease() as crawler:
+            result = await crawler.arun(url)
+        throttled = limiter.record_response(
+            url, result.status_code, result.response_headers
+        )
+        if not throttled or attempt == RATE_LIMIT_MAX_RETRIES:
+            break
+
+    content = result.markdown
+    if content:
+        page_content_cache.set(url, content)
+    return content
+
+
+async def fetch_html(url: str) -> str:
+    """Fetch the raw HTML of a web page with a plain HTTP request (no browser).
+
+    Only suitable for server-rendered pages.
+
+    Raises:
+        httpx.HTTPError: If the request fails.
+    """
+    response = await get_http_client().get(url)
+    _ = response.raise_for_status()
+    return response.text
 
 
-# TODO: look into this again. It doesn't work for Songkick pages for instance. I should
-# probably use a subset of the page or somethnig...
-async def page_hash_has_changed(ctx: RunContext[AgentDependency], url: str) -> bool:
-    """Check if the hash of the content of a web page has changed since the last check.
+async def fetch_json(url: str, params: dict[str, str] | None = None) -> Any:
+    """Fetch and decode a JSON document (e.g. a public API endpoint).
+
+    Raises:
+        httpx.HTTPError: If the request fails.
+    """
+    response = await get_http_client().get(
+        url, params=params, headers={"Accept": "application/json"}
+    )
+    _ = response.raise_for_status()
+    return response.json()
+
 
-    This function fetches the current content of the web page, computes its hash, and
-    compares it with the hash stored in the database. If the hash has changed, it
-    updates the hash and the last updated timestamp in the database.
+async def _check_http_validators(
+    page_cache: PageCache,
+) -> tuple[bool, str | None, str | None]:
+    """Send a conditional request for the page, using the validators stored in the DB.
 
-    This is useful to avoid re-parsing the content of a web page if it hasn't changed
-    since the last check, which can save computational resources and reduce unnecessary
-    API calls.
+    Only the response headers are read, so this costs a few hundred bytes whatever the
+    size of the page.
+
+    Returns:
+        A tuple `(not_modified, etag, last_modified)`. `not_modified` is True if the
+        server answered `304 Not Modified`. `etag` and `last_modified` are the
+        validators returned by the server (None if it didn't send any, or if the
+        request failed).
+    """
+    headers: dict[str, str] = {}
+    if page_cache.content_hash is not None:
+        if page_cache.etag:
+            headers["If-None-Match"] = page_cache.etag
+        if page_cache.last_modified:
+            headers["If-Modified-Since"] = page_cache.last_modified
+
+    try:
+        async with get_http_client().stream(
+            "GET", page_cache.url, headers=headers
+        ) as response:
+            if response.status_code == 304:
+                return True, page_cache.etag, page_cache.last_modified
+            if not response.is_success:
+                return False, None, None
+            return (
+                False,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+    except httpx.HTTPError as e:
+        logfire.debug(
+            "Conditional request failed for {url}: {error}", url=page_cache.url, error=e
+        )
+        return False, None, None
+
+
+async def page_has_changed(db: AsyncSession, url: str) -> bool:
+    """Check if the content of a web page has changed since the last check.
+
+    The server is first asked whether the page changed since the last check (HTTP
+    conditional request). If it can't tell, the page is fetched and its fingerprint (a
+    hash of the parts of the page that can hold shows, see
+    `concert_checker.common.fingerprint`) is compared with the one stored in the
+    database. The stored fingerprint and timestamps are updated along the way.
 
     Args:
-        url: The URL of the web page to check.
+        db (AsyncSession): The database session holding the page cache.
+        url (str): The URL of the web page to check.
 
     Returns:
-        True if the hash has changed, False otherwise.
+        bool: True if the page has changed (or was never seen before), False otherwise.
     """
-    db = ctx.deps.db
     current_time = datetime.today()
 
     # Querying the DB
-    page_cache = get_or_create_page_cache(db, PageCacheCreate(url=url))
+    page_cache = await get_or_create_page_cache(db, PageCacheCreate(url=url))
     hash_in_cache = page_cache.content_hash
     page_cache.last_fetched_at = current_time
 
+    # Asking the server first, which is much cheaper than rendering the page
+    not_modified, etag, last_modified = await _check_http_validators(page_cache)
+    if not_modified:
+        return False
+
     # Checking the current content
-    page_content = await fetch_web_content(url)
-    current_hash = hashlib.sha256(page_content.encode()).hexdigest()
+    page_content = await fetch_page_content(url)
+    current_hash = content_fingerprint(page_content or "", url)
+
+    # The validators are only stored along with the hash of the content they describe.
+    page_cache.etag = etag
+    page_cache.last_modified = last_modified
 
     hash_has_changed = current_hash is None or hash_in_cache != current_hash
     if hash_has_changed:
@@ -0,0 +1,286 @@
+"""Workers running the checks of artists from a queue stored in the database.
+
+`concert-checker worker` starts `WORKER_PROCESSES` processes, each running up to
+`WORKER_CONCURRENCY` jobs at a time. A job is a check of an artist by a source (see
+`concert_checker.app.models.Job`):
+- Every `SCHEDULER_TICK_SECONDS`, workers queue the (artist, source) pairs that are due
+  (see `concert_checker.common.scheduling`). Queuing is idempotent, so it doesn't
+  matter how many workers do it.
+- Workers claim jobs with an atomic lease, and renew it while the job runs. The jobs
+  of a worker that crashed are claimed by another one once their lease expires.
+- Failed jobs are retried with exponential backoff, up to `JOB_MAX_ATTEMPTS` times.
+
+Any number of workers can share the queue, e.g. several scraper containers
+(`docker compose up --scale scraper=3`). Jobs commit as they go, so that none of them
+holds the database (SQLite has a single writer) while fetching pages or calling the
+model.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import socket
+from datetime import datetime, timedelta
+from multiprocessing.connection import wait
+
+import logfire
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
+
+from concert_checker.app.async_crud import (
+    claim_job,
+    commit,
+    enqueue_jobs,
+    extend_job_lease,
+    fail_job,
+    finish_job,
+    get_due_checks,
+    rollback,
+)
+from concert_checker.app.database import AsyncSessionLocal
+from concert_checker.common.constants import (
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BASE_DELAY_SECONDS,
+    JOB_RETRY_MAX_DELAY_SECONDS,
+    SCHEDULER_MAX_CHECKS_PER_CYCLE,
+    SCHEDULER_TICK_SECONDS,
+    WORKER_CONCURRENCY,
+    WORKER_POLL_SECONDS,
+    WORKER_PROCESSES,
+)
+from concert_checker.common.crawler_pool import close_crawler_pool
+from concert_checker.common.http import close_http_client, get_rate_limiter
+from concert_checker.common.llm_calls import backoff_delay
+from concert_checker.common.scheduling import schedule_next_check
+from concert_checker.common.url_resolution import ArtistUrlNotFound
+from concert_checker.main import SOURCE_CLASSES, add_shows_to_db
+from concert_checker.sources import ArtistBoundSource, Source
+
+_LEASE = timedelta(seconds=JOB_LEASE_SECONDS)
+
+
+async def enqueue_due_jobs(max_jobs: int = SCHEDULER_MAX_CHECKS_PER_CYCLE) -> int:
+    """Queue the (artist, source) pairs that are due, and the sources not bound to an
+    artist (at most once per tick).
+
+    At most `max_jobs` pairs are due at a time, the most overdue first: pairs that are
+    already queued count towards it until they are done.
+
+    Returns:
+        int: The number of jobs that were queued.
+    """
+    now = datetime.now()
+    artist_sources = [
+        source_class.name
+        for source_class in SOURCE_CLASSES
+        if issubclass(source_class, ArtistBoundSource)
+    ]
+    async with AsyncSessionLocal() as db:
+        due = await get_due_checks(db, artist_sources, now, max_jobs)
+        checks: list[tuple[int | None, str]] = [
+            (row.artist_id, row.source) for row in due
+        ]
+        checks.extend(
+            (None, source_class.name)
+            for source_class in SOURCE_CLASSES
+            if not issubclass(source_class, ArtistBoundSource)
+        )
+        queued = await enqueue_jobs(
+            db,
+            checks,
+            now,
+            finished_before=now - timedelta(seconds=SCHEDULER_TICK_SECONDS),
+        )
+        await commit(db)
+    if queued:
+        logfire.info("Queued {queued} job(s)", queued=queued)
+    return queued
+
+
+def _make_source(job: Row) -> Source:
+    source_class = {source_class.name: source_class for source_class in SOURCE_CLASSES}[
+        job.source
+    ]
+    if issubclass(source_class, ArtistBoundSource):
+        return source_class(job.artist_name)
+    return source_class()
+
+
+async def _renew_lease(job_id: int, worker: str):
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        try:
+            async with AsyncSessionLocal() as db:
+                held = await extend_job_lease(
+                    db, job_id, worker, datetime.now() + _LEASE
+                )
+                await commit(db)
+        except SQLAlchemyError:
+            logfire.exception(
+                "Could not renew the lease of job {job_id}", job_id=job_id
+            )
+            continue
+        if not held:
+            return
+
+
+async def run_job(job: Row, worker: str):
+    """Run a claimed job, then mark it as done, or failed.
+
+    Args:
+        job (Row): The job, as returned by `claim_job`.
+        worker (str): The name of the worker holding the job.
+    """
+    async with AsyncSessionLocal() as db:
+        db.info["commit_each_call"] = True
+        renew_lease = asyncio.create_task(_renew_lease(job.id, worker))
+        source: Source | None = None
+        try:
+            if job.attempts > JOB_MAX_ATTEMPTS:
+                # Claimed again after its worker crashed, too many times.
+                raise RuntimeError("Too many attempts")
+            source = _make_source(job)
+            try:
+                if isinstance(source, ArtistBoundSource):
+                    await source.resolve(db)
+                shows = await source.fetch_shows(db)
+            except ArtistUrlNotFound as e:
+                # Searched again later (see `common.url_resolution`).
+                logfire.debug("Skipping {source}: {error}", source=job.source, error=e)
+                shows = []
+            changed = await add_shows_to_db(db, shows)
+            await source.on_shows_saved(db)
+            if isinstance(source, ArtistBoundSource):
+                _ = await schedule_next_check(
+                    db, source.artist_name, source.name, changed
+                )
+            held = await finish_job(db, job.id, worker, datetime.now())
+        except Exception as e:  # noqa: BLE001
+            # Sources can fail in many ways (pages, model, parsing...): whatever the
+            # error, the job is failed and retried rather than taking the worker down.
+            logfire.exception(
+                "Job {job_id} ({source} for {artist_name}) failed, attempt {attempt}",
+                job_id=job.id,
+                source=job.source,
+                artist_name=job.artist_name,
+                attempt=job.attempts,
+            )
+            await rollback(db)
+            now = datetime.now()
+            retry_at = None
+            if job.attempts < JOB_MAX_ATTEMPTS:
+                retry_at = now + timedelta(
+                    seconds=backoff_delay(
+                        job.attempts - 1,
+                        JOB_RETRY_BASE_DELAY_SECONDS,
+                        JOB_RETRY_MAX_DELAY_SECONDS,
+                    )
+                )
+            if isinstance(source, ArtistBoundSource):
+                await source.invalidate_checked_pages(db)
+                if retry_at is None:
+                    # Given up: checked again when it's next due.
+                    _ = await schedule_next_check(
+                        db, source.artist_name, source.name, changed=False
+                    )
+            held = await fail_job(
+                db, job.id, worker, now, f"{type(e).__name__}: {e}", retry_at
+            )
+        finally:
+            _ = renew_lease.cancel()
+        if not held:
+            logfire.warning(
+                "Job {job_id} was taken over by another worker after its lease expired",
+                job_id=job.id,
+            )
+
+
+async def _run_jobs(worker: str, poll_seconds: float):
+    while True:
+        now = datetime.now()
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await claim_job(db, worker, now, now + _LEASE)
+                await commit(db)
+        except SQLAlchemyError:
+            logfire.exception("Could not claim a job")
+            job = None
+        if job is None:
+            await asyncio.sleep(poll_seconds)
+            continue
+        try:
+            await run_job(job, worker)
+        except SQLAlchemyError:
+            # Recording the outcome failed: the job is retried once its lease expires.
+            logfire.exception(
+                "Could not record the outcome of job {job_id}", job_id=job.id
+            )
+
+
+async def _enqueue_jobs(tick_seconds: float):
+    while True:
+        try:
+            _ = await enqueue_due_jobs()
+        except SQLAlchemyError:
+            logfire.exception("Could not queue the jobs that are due")
+        # The requests of the jobs run by this process since the last tick.
+        get_rate_limiter().log_stats()
+        await asyncio.sleep(tick_seconds)
+
+
+async def run_worker(
+    concurrency: int = WORKER_CONCURRENCY,
+    poll_seconds: float = WORKER_POLL_SECONDS,
+    tick_seconds: float = SCHEDULER_TICK_SECONDS,
+):
+    """Queue the checks that are due, and run up to `concurrency` jobs at a time."""
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    logfire.info("Worker {name} started", name=name)
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            _ = task_group.create_task(_enqueue_jobs(tick_seconds))
+            for slot in range(concurrency):
+                # Each slot holds its own leases.
+                _ = task_group.create_task(_run_jobs(f"{name}:{slot}", poll_seconds))
+    finally:
+        await close_crawler_pool()
+        await close_http_client()
+
+
+def _worker_process(concurrency: int):
+    asyncio.run(run_worker(concurrency))
+
+
+def run_workers(
+    processes: int = WORKER_PROCESSES, concurrency: int = WORKER_CONCURRENCY
+):
+    """Run `processes` worker processes until stopped, restarting the ones that die."""
+    if processes <= 1:
+        _worker_process(concurrency)
+        return
+
+    context = multiprocessing.get_context("spawn")
+
+    def start() -> multiprocessing.process.BaseProcess:
+        process = context.Process(target=_worker_process, args=(concurrency,))
+        process.start()
+        return process
+
+    workers = [start() for _ in range(processes)]
+    try:
+        while True:
+            _ = wait([process.sentinel for process in workers])
+            for i, process in enumerate(workers):
+                if not process.is_alive():
+                    logfire.warning(
+                        "Worker process {pid} exited ({exitcode}), restarting it",
+                        pid=process.pid,
+                        exitcode=process.exitcode,
+                    )
+                    workers[i] = start()
+    finally:
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join()
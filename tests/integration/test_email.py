@@ -1,26 +1,28 @@
 import pytest
 
 from concert_checker.common.constants import IMAP_PASSWORD, IMAP_TO_ADDRESSES, IMAP_USER
-from concert_checker.tools.email import fetch_unread_emails
+from concert_checker.tools.email import fetch_new_emails
 
 _missing_creds = not IMAP_USER or not IMAP_PASSWORD or not IMAP_TO_ADDRESSES
 
 
 @pytest.mark.integration
 @pytest.mark.skipif(_missing_creds, reason="IMAP credentials not set")
-def test_fetch_unread_emails():
-    """Fetch unread emails for all IMAP_TO_ADDRESSES and validate the results.
+def test_fetch_new_emails():
+    """Fetch recent emails for all IMAP_TO_ADDRESSES and validate the results.
 
     Prerequisites:
       - IMAP_USER, IMAP_PASSWORD, IMAP_TO_ADDRESSES env vars (or .env) are set
-      - At least one *unread* email addressed to one of IMAP_TO_ADDRESSES exists
+      - At least one email addressed to one of IMAP_TO_ADDRESSES was received in the
+        last IMAP_INITIAL_SYNC_DAYS days
 
-    Side effect: fetched emails are marked as read.
+    Flags are left untouched: emails stay unread.
     """
-    emails = fetch_unread_emails()
+    emails, cursors = fetch_new_emails({})
 
+    assert cursors, "a cursor should be returned for each mailbox"
     assert len(emails) > 0, (
-        f"No unread emails found for {IMAP_TO_ADDRESSES}. "
+        f"No recent emails found for {IMAP_TO_ADDRESSES}. "
         "Send a test email to one of those addresses first."
     )
 
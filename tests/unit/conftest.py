@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from concert_checker.app.migrations import init_db
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'concerts.db'}")
+    init_db(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def runner():
+    """Runs coroutines on one event loop for the whole test (see `async_db`)."""
+    with asyncio.Runner() as runner:
+        yield runner
+
+
+@pytest.fixture
+def async_db(tmp_path, runner):
+    """An `AsyncSession`, to be used through `runner.run`."""
+    init_db(create_engine(f"sqlite:///{tmp_path / 'concerts.db'}"))
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'concerts.db'}", poolclass=NullPool
+    )
+    session = AsyncSession(engine, expire_on_commit=False)
+    yield session
+    runner.run(session.close())
+    runner.run(engine.dispose())
@@ -0,0 +1,96 @@
+import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from concert_checker.app import api
+from concert_checker.app.crud import bulk_upsert_shows
+from concert_checker.common.dataclasses import ArtistShows, ShowDetails
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    shows = [
+        ShowDetails(
+            date=datetime.date(2026, 5, 1) + datetime.timedelta(days=day),
+            city="Paris" if artist else "Berlin",
+            state=None,
+            country="France" if artist else "Germany",
+            country_code="FR" if artist else "DE",
+            venue=f"Venue {day % 2}",
+            source_url="https://a.com/tour",
+        )
+        for artist in range(3)
+        for day in range(5)
+    ]
+    _ = bulk_upsert_shows(
+        db,
+        [
+            ArtistShows(artist_name=f"Artist {artist}", shows=shows[artist * 5 :][:5])
+            for artist in range(3)
+        ],
+    )
+    db.commit()
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db.get_bind().url.database}", poolclass=NullPool
+    )
+    monkeypatch.setattr(api, "AsyncSessionLocal", async_sessionmaker(bind=async_engine))
+
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def test_concerts_are_keyset_paginated(client):
+    items, cursor = [], None
+    while True:
+        params = {"limit": 4} | ({"after": cursor} if cursor else {})
+        page = client.get("/api/concerts", params=params).json()
+        items.extend(page["items"])
+        if (cursor := page["next_cursor"]) is None:
+            break
+
+    assert len(items) == 15
+    keys = [(item["date"], item["id"]) for item in items]
+    assert keys == sorted(keys)
+
+
+def test_concert_filters_and_fields(client):
+    page = client.get(
+        "/api/concerts",
+        params={
+            "country": "fr",
+            "artist": "artist 1",
+            "start_date": "2026-05-02",
+            "end_date": "2026-05-03",
+            "fields": "date,artist",
+        },
+    ).json()
+
+    assert page == {
+        "items": [
+            {"date": "2026-05-02", "artist": "Artist 1"},
+            {"date": "2026-05-03", "artist": "Artist 1"},
+        ],
+        "next_cursor": None,
+    }
+
+
+def test_artists_and_venues(client):
+    artists = client.get("/api/artists", params={"limit": 2, "fields": "name"}).json()
+    assert artists == {
+        "items": [{"name": "Artist 0"}, {"name": "Artist 1"}],
+        "next_cursor": "2",
+    }
+
+    venues = client.get("/api/venues", params={"city": "berlin"}).json()
+    assert {venue["name"] for venue in venues["items"]} == {"Venue 0", "Venue 1"}
+
+
+def test_invalid_parameters(client):
+    assert client.get("/api/concerts", params={"fields": "id,nope"}).status_code == 400
+    assert client.get("/api/concerts", params={"after": "nope"}).status_code == 400
+    assert client.get("/api/artists", params={"after": "nope"}).status_code == 400
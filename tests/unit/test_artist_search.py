@@ -0,0 +1,81 @@
+from sqlalchemy import create_engine, text
+
+from concert_checker.app.crud import (
+    bulk_upsert_shows,
+    get_or_create_artist,
+    search_artists_by_name,
+    update_artist,
+)
+from concert_checker.app.migrations import init_db
+from concert_checker.app.schemas import ArtistCreate, ArtistUpdate
+from concert_checker.common.dataclasses import ArtistShows
+from concert_checker.common.utils import normalize_artist_name
+
+
+def _names(db, query):
+    return [artist.name for artist in search_artists_by_name(db, query)]
+
+
+def test_normalize_artist_name():
+    assert normalize_artist_name("The Beatles") == "beatles"
+    assert normalize_artist_name("Beyoncé") == "beyonce"
+    assert normalize_artist_name("AC/DC") == "acdc"
+    assert normalize_artist_name("Simon & Garfunkel") == "simon and garfunkel"
+
+
+def test_search_ignores_accents_prefix_and_punctuation(db):
+    for name in ["The Beatles", "Beyoncé", "AC/DC", "Sigur Rós", "Beach House"]:
+        _ = get_or_create_artist(db, ArtistCreate(name=name))
+
+    assert _names(db, "beatles") == ["The Beatles"]
+    assert _names(db, "the beatles") == ["The Beatles"]
+    assert _names(db, "BEYONCE") == ["Beyoncé"]
+    assert _names(db, "ac-dc") == ["AC/DC"]
+    assert _names(db, "sigur ros") == ["Sigur Rós"]
+    # Shorter than a trigram
+    assert _names(db, "be") == ["Beyoncé", "The Beatles", "Beach House"]
+
+
+def test_search_ranks_exact_then_prefix_matches(db):
+    for name in ["Low Roar", "Low", "Mellow Low", "Lower Dens"]:
+        _ = get_or_create_artist(db, ArtistCreate(name=name))
+
+    assert _names(db, "low") == ["Low", "Low Roar", "Lower Dens", "Mellow Low"]
+
+
+def test_search_falls_back_to_similar_names(db):
+    for name in ["Radiohead", "Portishead", "Massive Attack"]:
+        _ = get_or_create_artist(db, ArtistCreate(name=name))
+
+    assert _names(db, "radiohed")[0] == "Radiohead"
+
+
+def test_index_follows_core_inserts_and_renames(db):
+    _ = bulk_upsert_shows(db, [ArtistShows(artist_name="Björk", shows=[])])
+    assert _names(db, "bjork") == ["Björk"]
+
+    artist = get_or_create_artist(db, ArtistCreate(name="Bjork"))
+    _ = update_artist(db, ArtistUpdate(id=artist.id, name="Jorja Smith"))
+    db.flush()
+    assert _names(db, "jorja") == ["Jorja Smith"]
+    assert _names(db, "bjork") == ["Björk"]
+
+
+def test_init_db_indexes_existing_artists(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'concerts.db'}")
+    with engine.begin() as conn:
+        _ = conn.execute(
+            text(
+                "CREATE TABLE artists (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+                "website_base_url VARCHAR, songkick_url VARCHAR)"
+            )
+        )
+        _ = conn.execute(text("INSERT INTO artists (name) VALUES ('Beyoncé')"))
+
+    init_db(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT rowid FROM artists_fts WHERE artists_fts MATCH 'yonc'")
+        ).all()
+    assert len(rows) == 1
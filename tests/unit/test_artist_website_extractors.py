@@ -0,0 +1,229 @@
+import asyncio
+import json
+from datetime import date
+from pathlib import Path
+
+import httpx
+import pytest
+
+from concert_checker.extractors import artist_website, songkick, widgets
+from concert_checker.extractors.artist_website import (
+    StructuredShows,
+    extract_structured_shows,
+    find_tour_pages,
+)
+from concert_checker.extractors.widgets import (
+    TourWidget,
+    detect_widgets,
+    parse_bandsintown_events,
+    parse_seated_tour,
+)
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "artist_websites"
+SONGKICK_FIXTURES = Path(__file__).parent.parent / "fixtures" / "songkick"
+
+BASE_URL = "https://menitrust.com/"
+TOUR_URL = "https://menitrust.com/tour/"
+
+
+def _read(fixture: str) -> str:
+    return (FIXTURES / fixture).read_text()
+
+
+def _summary(shows):
+    return [
+        (s.date, s.venue, s.city, s.state, s.country, s.country_code) for s in shows
+    ]
+
+
+@pytest.fixture
+def web(monkeypatch):
+    """Serves fixtures instead of fetching pages and JSON endpoints."""
+    pages: dict[str, str] = {}
+    endpoints: dict[str, object] = {}
+    requested: list[str] = []
+
+    async def fake_fetch_html(url: str) -> str:
+        requested.append(url)
+        if url not in pages:
+            raise httpx.ConnectError(f"Cannot reach {url}")
+        return pages[url]
+
+    async def fake_fetch_json(url: str, params=None):
+        requested.append(url)
+        return endpoints[url]
+
+    monkeypatch.setattr(artist_website, "fetch_html", fake_fetch_html)
+    monkeypatch.setattr(songkick, "fetch_html", fake_fetch_html)
+    monkeypatch.setattr(widgets, "fetch_json", fake_fetch_json)
+    return pages, endpoints, requested
+
+
+def test_detect_bandsintown_widget():
+    assert detect_widgets(_read("bandsintown_widget.html"), TOUR_URL) == [
+        TourWidget("bandsintown", "Crumb", app_id="crumb_site", page_url=TOUR_URL)
+    ]
+
+
+def test_detect_seated_widget():
+    assert detect_widgets(_read("seated_widget.html"), TOUR_URL) == [
+        TourWidget("seated", "8f7e6d5c-4b3a-2910-8f7e-6d5c4b3a2910", page_url=TOUR_URL)
+    ]
+
+
+def test_detect_songkick_widget():
+    # The link and the injector script both point to the same artist.
+    assert detect_widgets(_read("songkick_widget.html"), TOUR_URL) == [
+        TourWidget("songkick", "7712345", page_url=TOUR_URL)
+    ]
+
+
+def test_no_widget_detected():
+    assert detect_widgets(_read("jsonld_home.html"), BASE_URL) == []
+
+
+def test_parse_bandsintown_events():
+    data = json.loads(_read("bandsintown_events.json"))
+
+    assert _summary(parse_bandsintown_events(data, TOUR_URL)) == [
+        (
+            date(2025, 5, 2),
+            "The Fillmore",
+            "San Francisco",
+            "CA",
+            "United States",
+            None,
+        ),
+        (date(2025, 5, 10), "Primavera Sound", "Barcelona", None, "Spain", None),
+    ]
+    assert parse_bandsintown_events({"errorMessage": "[NotFound]"}, TOUR_URL) == []
+
+
+def test_parse_seated_tour():
+    data = json.loads(_read("seated_tour.json"))
+
+    assert _summary(parse_seated_tour(data, TOUR_URL)) == [
+        (
+            date(2025, 7, 3),
+            "The Teragram Ballroom",
+            "Los Angeles",
+            "CA",
+            "United States",
+            None,
+        ),
+        (date(2025, 7, 12), "Paradiso", "Amsterdam", None, "Netherlands", None),
+    ]
+
+
+def test_find_tour_pages():
+    assert find_tour_pages(_read("jsonld_home.html"), BASE_URL) == [TOUR_URL]
+
+
+def test_json_ld_and_microdata_are_extracted_from_home_and_tour_pages(web):
+    pages, _, _ = web
+    pages[BASE_URL] = _read("jsonld_home.html")
+    pages[TOUR_URL] = _read("microdata_tour.html")
+
+    result = asyncio.run(extract_structured_shows(BASE_URL))
+
+    assert result.pages_without_data == []
+    assert [
+        (s.date, s.venue, s.city, s.country_code, s.source_url) for s in result.shows
+    ] == [
+        (date(2025, 6, 20), "MTELUS", "Montréal", "CA", BASE_URL),
+        (date(2025, 3, 14), "Le Trianon", "Paris", "FR", TOUR_URL),
+        (date(2025, 3, 18), "O2 Academy Brixton", "London", "GB", TOUR_URL),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("fixture", "endpoint", "response", "expected_cities"),
+    [
+        (
+            "bandsintown_widget.html",
+            "https://rest.bandsintown.com/artists/Crumb/events",
+            "bandsintown_events.json",
+            ["San Francisco", "Barcelona"],
+        ),
+        (
+            "seated_widget.html",
+            "https://cdn.seated.com/api/tour/8f7e6d5c-4b3a-2910-8f7e-6d5c4b3a2910",
+            "seated_tour.json",
+            ["Los Angeles", "Amsterdam"],
+        ),
+    ],
+)
+def test_widget_shows_are_fetched_from_public_endpoints(
+    web, fixture, endpoint, response, expected_cities
+):
+    pages, endpoints, _ = web
+    pages[BASE_URL] = _read(fixture)
+    endpoints[endpoint] = json.loads(_read(response))
+
+    result = asyncio.run(extract_structured_shows(BASE_URL))
+
+    assert result.pages_without_data == []
+    assert [show.city for show in result.shows] == expected_cities
+    assert all(show.source_url == BASE_URL for show in result.shows)
+
+
+def test_songkick_widget_shows_are_fetched_from_the_calendar(web):
+    pages, _, _ = web
+    pages[BASE_URL] = _read("songkick_widget.html")
+    pages["https://www.songkick.com/artists/7712345/calendar"] = (
+        SONGKICK_FIXTURES / "calendar_page2.html"
+    ).read_text()
+
+    result = asyncio.run(extract_structured_shows(BASE_URL))
+
+    assert result.pages_without_data == []
+    assert [(show.city, show.source_url) for show in result.shows] == [
+        ("Mexico City", BASE_URL)
+    ]
+
+
+def test_pages_without_structured_data_need_the_model(web):
+    pages, _, requested = web
+    pages[BASE_URL] = _read("no_structured_data.html")
+
+    assert asyncio.run(extract_structured_shows(BASE_URL)) == StructuredShows(
+        shows=[], pages_without_data=[BASE_URL]
+    )
+    assert requested == [BASE_URL, "https://menitrust.com/live"]
+
+
+def test_events_that_cant_be_placed_need_the_model(web):
+    pages, _, _ = web
+    event = {
+        "@context": "https://schema.org",
+        "@type": "MusicEvent",
+        "name": "Men I Trust",
+        "startDate": "2026-05-12T20:00",
+        "location": "L'Olympia, Paris",
+    }
+    pages[BASE_URL] = f'<script type="application/ld+json">{json.dumps(event)}</script>'
+
+    assert asyncio.run(extract_structured_shows(BASE_URL)) == StructuredShows(
+        shows=[], pages_without_data=[BASE_URL]
+    )
+
+
+def test_only_pages_without_structured_data_need_the_model(web):
+    pages, _, _ = web
+    pages[BASE_URL] = _read("jsonld_home.html")
+    pages[TOUR_URL] = _read("no_structured_data.html")
+
+    result = asyncio.run(extract_structured_shows(BASE_URL))
+
+    assert [show.city for show in result.shows] == ["Montréal"]
+    assert result.pages_without_data == [TOUR_URL]
+
+
+def test_widgets_without_shows_dont_need_the_model(web):
+    pages, endpoints, _ = web
+    pages[BASE_URL] = _read("bandsintown_widget.html")
+    endpoints["https://rest.bandsintown.com/artists/Crumb/events"] = []
+
+    assert asyncio.run(extract_structured_shows(BASE_URL)) == StructuredShows(
+        shows=[], pages_without_data=[]
+    )
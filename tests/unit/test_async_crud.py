@@ -0,0 +1,25 @@
+import asyncio
+
+from concert_checker.app.async_crud import (
+    commit,
+    get_artist_names,
+    get_or_create_artist,
+    search_artists_by_name,
+)
+from concert_checker.app.schemas import ArtistCreate
+
+
+def test_concurrent_tasks_can_share_a_session(async_db, runner):
+    async def scenario():
+        names = [f"Artist {i}" for i in range(20)]
+        _ = await asyncio.gather(
+            *(
+                get_or_create_artist(async_db, ArtistCreate(name=name))
+                for name in names
+            ),
+            *(search_artists_by_name(async_db, name) for name in names),
+        )
+        await commit(async_db)
+        return await get_artist_names(async_db)
+
+    assert len(runner.run(scenario())) == 20
@@ -0,0 +1,86 @@
+import datetime
+
+from concert_checker.app.crud import bulk_upsert_shows, get_or_create_artist
+from concert_checker.app.models import Artist, Concert, Venue
+from concert_checker.app.schemas import ArtistCreate
+from concert_checker.common.dataclasses import ArtistShows, ShowDetails
+
+
+def _show(day: int, venue: str | None = "Olympia", source_url="https://a.com/tour"):
+    return ShowDetails(
+        date=datetime.date(2026, 5, day),
+        city="Paris",
+        state=None,
+        country="France",
+        country_code="FR",
+        venue=venue,
+        source_url=source_url,
+    )
+
+
+def test_inserts_artists_venues_and_concerts(db):
+    existing = get_or_create_artist(db, ArtistCreate(name="Existing"))
+    result = bulk_upsert_shows(
+        db,
+        [
+            ArtistShows(artist_name="Existing", shows=[_show(1), _show(2, venue=None)]),
+            ArtistShows(artist_name="New", shows=[_show(1), _show(3)]),
+        ],
+    )
+
+    assert result == (4, 0)
+    assert db.query(Artist).count() == 2
+    assert db.query(Venue).count() == 1
+    assert db.query(Concert).filter_by(artist_id=existing.id).count() == 2
+
+
+def test_existing_concerts_only_get_missing_details(db):
+    _ = bulk_upsert_shows(
+        db, [ArtistShows(artist_name="A", shows=[_show(1), _show(2, venue=None)])]
+    )
+
+    result = bulk_upsert_shows(
+        db,
+        [
+            ArtistShows(
+                artist_name="A",
+                shows=[
+                    # Another source, disagreeing on the details.
+                    _show(1, venue="L'Olympia", source_url="https://b.com/tour"),
+                    _show(2),
+                    _show(3),
+                ],
+            )
+        ],
+    )
+
+    assert result == (1, 1)
+    assert db.query(Concert).count() == 3
+    first, second, _ = db.query(Concert).order_by(Concert.date)
+    assert (first.venue.name, first.source_url) == ("Olympia", "https://a.com/tour")
+    assert second.venue.name == "Olympia"
+
+    # Nothing left to fill in: running the sources again changes nothing.
+    assert bulk_upsert_shows(
+        db, [ArtistShows(artist_name="A", shows=[_show(1, venue="L'Olympia")])]
+    ) == (0, 0)
+
+
+def test_duplicates_and_unparsed_dates_are_skipped(db):
+    unparsed = _show(1)
+    unparsed.date = "sometime in May"
+    timed = _show(1)
+    timed.date = datetime.datetime(2026, 5, 1, 20, 30)
+
+    result = bulk_upsert_shows(
+        db, [ArtistShows(artist_name="A", shows=[_show(1), timed, unparsed])]
+    )
+
+    assert result == (1, 0)
+    assert db.query(Concert).one().date == datetime.date(2026, 5, 1)
+
+
+def test_get_or_create_returns_the_existing_row(db):
+    artist = get_or_create_artist(db, ArtistCreate(name="A"))
+    assert get_or_create_artist(db, ArtistCreate(name="A")).id == artist.id
+    assert db.query(Artist).count() == 1
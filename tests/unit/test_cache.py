@@ -0,0 +1,54 @@
+from concert_checker.common import cache
+from concert_checker.common.cache import ByteLRUCache
+
+
+def test_get_returns_stored_value():
+    lru = ByteLRUCache(max_bytes=100, ttl_seconds=60)
+    lru.set("a", "hello")
+
+    assert lru.get("a") == "hello"
+    assert lru.get("b") is None
+    assert lru.size_bytes == 5
+
+
+def test_least_recently_used_entries_are_evicted_by_size():
+    lru = ByteLRUCache(max_bytes=10, ttl_seconds=60)
+    lru.set("a", "aaaa")
+    lru.set("b", "bbbb")
+    _ = lru.get("a")  # "b" is now the least recently used entry
+    lru.set("c", "cccc")
+
+    assert "a" in lru
+    assert "b" not in lru
+    assert "c" in lru
+    assert lru.size_bytes == 8
+
+
+def test_size_is_measured_in_bytes():
+    lru = ByteLRUCache(max_bytes=4, ttl_seconds=60)
+    lru.set("a", "éé")  # 4 bytes in UTF-8
+    lru.set("b", "é")
+
+    assert "a" not in lru
+    assert lru.size_bytes == 2
+
+
+def test_oversized_values_are_not_stored():
+    lru = ByteLRUCache(max_bytes=4, ttl_seconds=60)
+    lru.set("a", "aa")
+    lru.set("b", "bbbbbb")
+
+    assert "a" in lru
+    assert "b" not in lru
+
+
+def test_entries_expire(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+    lru = ByteLRUCache(max_bytes=100, ttl_seconds=60)
+    lru.set("a", "hello")
+
+    now += 61
+
+    assert lru.get("a") is None
+    assert lru.size_bytes == 0
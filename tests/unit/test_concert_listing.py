@@ -0,0 +1,86 @@
+import datetime
+
+from concert_checker.app.crud import (
+    bulk_upsert_shows,
+    get_concerts_version,
+    list_concerts,
+)
+from concert_checker.common.dataclasses import ArtistShows, ShowDetails
+
+START = datetime.date(2026, 5, 1)
+
+
+def _shows(
+    days: range, source_url="https://a.com/tour", venue: str | None = None
+) -> list[ShowDetails]:
+    return [
+        ShowDetails(
+            date=START + datetime.timedelta(days=day),
+            city="Paris",
+            state=None,
+            country="France",
+            country_code="FR",
+            venue=venue,
+            source_url=source_url,
+        )
+        for day in days
+    ]
+
+
+def test_keyset_pagination_walks_every_concert_once(db):
+    _ = bulk_upsert_shows(
+        db,
+        [
+            ArtistShows(artist_name="A", shows=_shows(range(10))),
+            ArtistShows(artist_name="B", shows=_shows(range(5, 15))),
+        ],
+    )
+
+    seen, after = [], None
+    while page := list_concerts(db, after=after, limit=3):
+        seen.extend(page)
+        after = (page[-1].date, page[-1].id)
+
+    assert len(seen) == 20
+    assert [(row.date, row.id) for row in seen] == sorted(
+        (row.date, row.id) for row in seen
+    )
+
+
+def test_filters(db):
+    _ = bulk_upsert_shows(
+        db,
+        [
+            ArtistShows(artist_name="The Beatles", shows=_shows(range(10))),
+            ArtistShows(artist_name="Beyoncé", shows=_shows(range(10))),
+        ],
+    )
+
+    rows = list_concerts(
+        db,
+        start_date=START + datetime.timedelta(days=2),
+        end_date=START + datetime.timedelta(days=4),
+        artist_query="beatles",
+    )
+    assert [(row.artist, row.date.day) for row in rows] == [
+        ("The Beatles", 3),
+        ("The Beatles", 4),
+        ("The Beatles", 5),
+    ]
+
+
+def test_version_changes_with_concerts(db):
+    versions = {get_concerts_version(db)}
+    _ = bulk_upsert_shows(db, [ArtistShows(artist_name="A", shows=_shows(range(2)))])
+    versions.add(get_concerts_version(db))
+    _ = bulk_upsert_shows(
+        db, [ArtistShows(artist_name="A", shows=_shows(range(2), venue="Olympia"))]
+    )
+    versions.add(get_concerts_version(db))
+    assert len(versions) == 3
+
+    # Details that don't fill in anything don't change the concerts.
+    _ = bulk_upsert_shows(
+        db, [ArtistShows(artist_name="A", shows=_shows(range(2), "https://a.com/new"))]
+    )
+    assert get_concerts_version(db) in versions
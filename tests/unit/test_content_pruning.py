@@ -0,0 +1,131 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from concert_checker.common.content_pruning import (
+    SKIPPED_MARKER,
+    prune_page_content,
+    split_blocks,
+)
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "pages" / "pruning"
+LABELS = json.loads((FIXTURES / "labels.json").read_text())
+
+
+def _prune(fixture: str, **kwargs):
+    content = (FIXTURES / fixture).read_text()
+    return content, prune_page_content(content, LABELS[fixture]["url"], **kwargs)
+
+
+@pytest.mark.parametrize("fixture", list(LABELS))
+def test_shows_and_links_to_them_are_kept(fixture):
+    _, pruned = _prune(fixture)
+
+    missed = [
+        show
+        for show in LABELS[fixture]["shows"]
+        if not all(s in pruned.text for s in show)
+    ] + [link for link in LABELS[fixture]["links"] if link not in pruned.text]
+    assert missed == []
+
+
+def test_the_rest_of_the_page_is_dropped():
+    _, pruned = _prune("artist_home.md")
+
+    assert pruned.tokens * 4 < pruned.original_tokens
+    for dropped in [
+        "Grammy",
+        "Pink Vinyl",
+        "Is your muffin buttered",
+        "Official Video",
+    ]:
+        assert dropped not in pruned.text
+    # Only the link to the tour of the navigation menu.
+    assert "[Store]" not in pruned.text
+    assert SKIPPED_MARKER in pruned.text
+
+
+def test_off_topic_sections_are_dropped():
+    _, pruned = _prune("../songkick_calendar_load1.md")
+
+    assert "Upcoming concerts" in pruned.text
+    assert "Fans also track" not in pruned.text
+    assert "Fontaines D.C." not in pruned.text
+
+
+@pytest.mark.parametrize(
+    "heading", ["Upcoming shows & merch", "Workshop tour", "Live in store"]
+)
+def test_shows_under_an_off_topic_word_are_kept(heading):
+    content = (
+        f"# Artist\n\n## {heading}\n\n- 12 March 2026 — Paris, Olympia\n"
+        "- 14 March 2026 — Lyon, Le Transbordeur\n\n## Festivals\n\n"
+        "- 20 March 2026 — Berlin, Lido\n"
+    )
+
+    pruned = prune_page_content(content, "https://artist.example/")
+
+    assert "12 March 2026 — Paris, Olympia" in pruned.text
+    assert "14 March 2026 — Lyon, Le Transbordeur" in pruned.text
+
+
+def test_dated_rows_of_an_off_topic_section_are_kept():
+    content = (
+        "# Artist\n\n## News\n\nWe have a new video out.\n\n"
+        "- 12 March 2026 — Paris, Olympia\n\n## Tour\n\n"
+        "- 20 March 2026 — Berlin, Lido\n"
+    )
+
+    pruned = prune_page_content(content, "https://artist.example/")
+
+    assert "12 March 2026 — Paris, Olympia" in pruned.text
+    assert "new video" not in pruned.text
+
+
+def test_kept_blocks_point_back_to_the_original():
+    content, pruned = _prune("venue_agenda.md")
+
+    for (start, end), offset in zip(pruned.spans, pruned.text_offsets, strict=True):
+        assert pruned.text[offset : offset + end - start] == content[start:end]
+    show = pruned.text.index("Japanese Breakfast")
+    assert content.index("Japanese Breakfast") == pruned.original_offset(show)
+
+
+def test_token_budget_keeps_the_best_blocks():
+    _, pruned = _prune("artist_tour_page.md", token_budget=300)
+
+    assert pruned.tokens <= 300 + 10
+    # The table of upcoming shows beats the past shows.
+    assert "Hollywood Bowl" in pruned.text
+    assert "Crystal Ballroom" not in pruned.text
+
+
+def test_pages_without_shows_are_truncated():
+    content = "Welcome to the page.\n\n" + "Some bio text.\n" * 100
+
+    pruned = prune_page_content(content, "https://a.example/", token_budget=50)
+
+    assert pruned.text.startswith("Welcome to the page.")
+    assert pruned.text.endswith(SKIPPED_MARKER)
+    assert pruned.tokens <= 50 + 5
+    assert prune_page_content("Short.", "https://a.example/").text == "Short."
+
+
+def test_list_items_and_table_rows_are_separate_blocks():
+    blocks = split_blocks(
+        "# Tour\n\n* A\n  continued\n* B\n\n| Date | City |\n|---|---|\n| 1 | X |\n"
+        "| 2 | Y |\n\nText\nmore text\n"
+    )
+
+    assert [block.text for block in blocks] == [
+        "# Tour",
+        "* A\n  continued",
+        "* B",
+        "| Date | City |\n|---|---|",
+        "| 1 | X |",
+        "| 2 | Y |",
+        "Text\nmore text",
+    ]
+    # Rows are kept with the header of their table, itself with its section heading.
+    assert [block.context for block in blocks] == [None, 0, 0, 0, 3, 3, 0]
@@ -0,0 +1,116 @@
+import asyncio
+from typing import ClassVar
+
+import pytest
+
+from concert_checker.common import crawler_pool
+from concert_checker.common.crawler_pool import CrawlerPool
+
+
+class FakeCrawler:
+    instances: ClassVar[list["FakeCrawler"]] = []
+
+    def __init__(self):
+        self.ready = False
+        self.closed = False
+        self.crawler_strategy = None
+        FakeCrawler.instances.append(self)
+
+    async def start(self):
+        self.ready = True
+        return self
+
+    async def close(self):
+        self.ready = False
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_crawler(monkeypatch):
+    FakeCrawler.instances = []
+    monkeypatch.setattr(crawler_pool, "AsyncWebCrawler", FakeCrawler)
+
+
+def test_browsers_are_reused_across_leases():
+    async def run():
+        pool = CrawlerPool(browsers=1, tabs_per_browser=2, max_pages_per_browser=100)
+        for _ in range(5):
+            async with pool.lease():
+                pass
+        await pool.close()
+
+    asyncio.run(run())
+
+    assert len(FakeCrawler.instances) == 1
+    assert FakeCrawler.instances[0].closed
+
+
+def test_concurrent_leases_are_capped():
+    active = 0
+    max_active = 0
+
+    async def fetch(pool: CrawlerPool):
+        nonlocal active, max_active
+        async with pool.lease():
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run():
+        pool = CrawlerPool(browsers=2, tabs_per_browser=3, max_pages_per_browser=100)
+        await asyncio.gather(*(fetch(pool) for _ in range(20)))
+        await pool.close()
+
+    asyncio.run(run())
+
+    assert max_active == 6
+    assert sum(crawler.ready for crawler in FakeCrawler.instances) == 0
+
+
+def test_browser_is_recycled_after_max_pages():
+    async def run():
+        pool = CrawlerPool(browsers=1, tabs_per_browser=1, max_pages_per_browser=2)
+        for _ in range(5):
+            async with pool.lease():
+                pass
+        await pool.close()
+
+    asyncio.run(run())
+
+    started = [crawler for crawler in FakeCrawler.instances if crawler.closed]
+    assert len(started) == 3
+
+
+def test_unhealthy_browser_is_replaced():
+    async def run():
+        pool = CrawlerPool(browsers=1, tabs_per_browser=1, max_pages_per_browser=100)
+        async with pool.lease() as crawler:
+            first = crawler
+        first.ready = False  # e.g. the browser crashed
+        async with pool.lease() as crawler:
+            second = crawler
+        await pool.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first is not second
+    assert first.closed and second.closed
+
+
+def test_leases_outlive_the_pool():
+    async def run():
+        pool = CrawlerPool(browsers=1, tabs_per_browser=2, max_pages_per_browser=1)
+        async with pool.lease() as crawler:
+            await pool.close()
+            # Still usable until the lease is released.
+            assert not crawler.closed
+        with pytest.raises(RuntimeError):
+            async with pool.lease():
+                pass
+        return crawler
+
+    crawler = asyncio.run(run())
+
+    assert crawler.closed
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+from concert_checker.common.dataclasses import EmailContent
+from concert_checker.common.email_classifier import (
+    classify_email,
+    drop_non_show_emails,
+)
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "emails"
+
+
+def _corpus(name: str = "corpus.jsonl") -> list[tuple[str, EmailContent]]:
+    entries = [
+        json.loads(line)
+        for line in (FIXTURES / name).read_text().splitlines()
+        if line.strip()
+    ]
+    return [
+        (
+            entry["label"],
+            EmailContent(
+                subject=entry["subject"],
+                from_addr=entry["from_addr"],
+                to_addr="me@example.com",
+                date="",
+                body=entry["body"],
+            ),
+        )
+        for entry in entries
+    ]
+
+
+def test_no_show_email_is_dropped():
+    missed = [
+        email.subject
+        for label, email in _corpus()
+        if label == "show" and not classify_email(email).is_show
+    ]
+    assert missed == []
+
+
+def test_most_other_emails_are_dropped():
+    corpus = _corpus()
+    others = [email for label, email in corpus if label == "other"]
+    kept = drop_non_show_emails([email for _, email in corpus])
+
+    assert len(kept) <= len(corpus) / 2
+    assert sum(email in kept for email in others) <= len(others) / 10
+
+
+def test_held_out_emails():
+    # Labelled without looking at the weights, and never used to tune them (add the
+    # emails that motivate a change to corpus.jsonl instead). Known miss: an in-store
+    # signing that is only reachable with an album pre-order.
+    corpus = _corpus("heldout.jsonl")
+    shows = [email for label, email in corpus if label == "show"]
+    others = [email for label, email in corpus if label == "other"]
+
+    assert len(drop_non_show_emails(shows)) >= 0.9 * len(shows)
+    assert len(drop_non_show_emails(others)) <= 0.1 * len(others)
+
+
+def test_classification_explains_its_score():
+    email = EmailContent(
+        subject="Paris, we're coming",
+        from_addr="news@band.com",
+        to_addr="me@example.com",
+        date="",
+        body="See you on 12 May 2026!\n\n[Tickets](https://www.dice.fm/event/abc)",
+    )
+    classification = classify_email(email)
+
+    assert classification.is_show
+    assert "1 date(s)" in classification.reasons
+    assert "ticketing link" in classification.reasons
+
+
+def test_merch_email_is_dropped():
+    email = EmailContent(
+        subject="New hoodies in the store",
+        from_addr="store@band.com",
+        to_addr="me@example.com",
+        date="",
+        body="Our winter merch is here: hoodies, t-shirts and tote bags. Free shipping"
+        " on orders over 50€.",
+    )
+    assert drop_non_show_emails([email]) == []
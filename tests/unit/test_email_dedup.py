@@ -0,0 +1,121 @@
+from concert_checker.common.dataclasses import EmailContent
+from concert_checker.common.email_dedup import (
+    drop_seen_emails,
+    email_signature,
+    is_duplicate,
+    record_seen_emails,
+)
+
+NEWSLETTER = """\
+# Hello {name}!
+
+We're heading back on the road this spring, and we can't wait to see you all again.
+It has been a long winter in the studio, and the new songs are finally ready to be
+played live. Here are the dates of the European leg of the tour:
+
+- 12 May 2026 - Paris, La Cigale
+- 14 May 2026 - Brussels, Ancienne Belgique
+- 17 May 2026 - Amsterdam, Paradiso
+- 20 May 2026 - Berlin, Astra Kulturhaus
+
+Tickets go on sale Friday at 10am local time. Fan club members get a presale code
+on Wednesday: check your inbox!
+
+[Get tickets]({tickets_url})
+
+See you down the front,
+The band
+
+[Unsubscribe]({unsubscribe_url}) | [View in browser]({browser_url})
+"""
+
+
+def _email(
+    name="Romain",
+    token="a1",
+    dates="",
+    message_id="<campaign-1@mail.example.com>",
+) -> EmailContent:
+    body = NEWSLETTER.format(
+        name=name,
+        tickets_url=f"https://click.example.com/track/{token}?utm_source=newsletter",
+        unsubscribe_url=f"https://mail.example.com/unsubscribe/{token}",
+        browser_url=f"https://mail.example.com/view/{token}",
+    )
+    return EmailContent(
+        subject="Spring tour!",
+        from_addr="news@band.example.com",
+        to_addr="shows@example.com",
+        date="Mon, 12 Jan 2026 10:00:00 +0000",
+        body=body + dates,
+        message_id=message_id,
+    )
+
+
+def test_tracking_links_and_tokens_dont_change_the_body_hash():
+    first = email_signature(_email(token="a1b2c3"))
+    second = email_signature(_email(token="zz9", message_id=""))
+
+    assert first.body_hash == second.body_hash
+    assert second.message_id is None
+
+
+def test_personalized_copies_are_near_duplicates(async_db, runner):
+    original = _email(name="Romain")
+    copy = _email(name="Alex", token="b2", message_id="<campaign-1-alias@mail>")
+    assert email_signature(original).body_hash != email_signature(copy).body_hash
+
+    assert runner.run(drop_seen_emails(async_db, [original, copy])) == [original]
+
+
+def test_added_dates_are_not_duplicates(async_db, runner):
+    original = _email()
+    update = _email(
+        token="b2",
+        dates="- 22 May 2026 - Prague, Lucerna\n",
+        message_id="<campaign-2@mail.example.com>",
+    )
+
+    assert runner.run(drop_seen_emails(async_db, [original, update])) == [
+        original,
+        update,
+    ]
+
+
+def test_seen_emails_are_remembered(async_db, runner):
+    assert runner.run(drop_seen_emails(async_db, [_email()])) == [_email()]
+    # Not until they are recorded.
+    assert runner.run(drop_seen_emails(async_db, [_email()])) == [_email()]
+
+    runner.run(record_seen_emails(async_db, [_email()]))
+    runner.run(async_db.commit())
+
+    # Same Message-ID, even if the body was converted differently.
+    resent = _email(name="Someone else entirely, with a much longer name")
+    assert runner.run(drop_seen_emails(async_db, [resent])) == []
+
+
+def test_short_emails_are_only_compared_on_their_hash():
+    first = EmailContent("Tour", "a@b.c", "d@e.f", "", "Playing Paris on 12 May.")
+    second = EmailContent("Tour", "a@b.c", "d@e.f", "", "Playing Lyon on 12 May.")
+    signature = email_signature(second)
+    seen = email_signature(first)
+
+    class SeenEmail:
+        message_id = seen.message_id
+        body_hash = seen.body_hash
+        dates_hash = seen.dates_hash
+        simhash = signature.simhash  # Even with the same SimHash
+
+    assert not is_duplicate(signature, SeenEmail())
+
+
+def test_near_duplicates_are_looked_for_among_the_same_sender(async_db, runner):
+    original = _email(name="Romain")
+    copy = _email(name="Alex", message_id="<campaign-1-alias@mail>")
+    copy.from_addr = "Other Band <news@other.example.com>"
+
+    assert runner.run(drop_seen_emails(async_db, [original, copy])) == [
+        original,
+        copy,
+    ]
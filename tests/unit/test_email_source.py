@@ -0,0 +1,198 @@
+import asyncio
+import re
+
+import pytest
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelResponse, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from concert_checker.app.async_crud import get_mailbox_cursors
+from concert_checker.common.constants import IMAP_HOST, IMAP_USER
+from concert_checker.common.dataclasses import EmailContent, MailboxCursor
+from concert_checker.sources import email as email_source
+from concert_checker.sources.email import EmailSource
+
+
+def _email(i: int, body: str = "") -> EmailContent:
+    return EmailContent(
+        subject=f"Artist {i} on tour",
+        from_addr="news@example.com",
+        to_addr="shows@example.com",
+        date="Mon, 12 May 2025 10:00:00 +0000",
+        body=body or f"Artist {i} plays Paris on 12 May 2026.",
+    )
+
+
+def _shows(prompt: str) -> dict:
+    artist = re.search(r"Subject: (Artist \d+)", prompt)[1]
+    return {
+        "artist_name": artist,
+        "shows": [
+            {
+                "date": "2026-05-12",
+                "city": "Paris",
+                "state": None,
+                "country": "France",
+                "country_code": "FR",
+                "venue": None,
+                "source_url": "news@example.com",
+            }
+        ],
+    }
+
+
+class FakeModel:
+    """Answers like the extraction agents, recording calls and their concurrency."""
+
+    def __init__(self):
+        self.prompts: list[str] = []
+        self.running = 0
+        self.max_running = 0
+        self.errors: list[Exception] = []
+        self.drop_last_output = False
+        self.reverse_outputs = False
+        # Emails (by subject) that the model fails to extract.
+        self.failing_subjects: set[str] = set()
+
+    async def __call__(self, messages, info: AgentInfo) -> ModelResponse:
+        prompt = next(
+            part.content
+            for message in messages
+            for part in message.parts
+            if isinstance(part, UserPromptPart)
+        )
+        self.prompts.append(prompt)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if self.errors:
+                raise self.errors.pop(0)
+            if any(subject in prompt for subject in self.failing_subjects):
+                raise ModelHTTPError(400, "model")
+        finally:
+            self.running -= 1
+
+        tool_name = info.output_tools[0].name
+        emails = re.split(r"=== Email \d+ ===\n", prompt)[1:]
+        if not emails:
+            return ModelResponse(parts=[ToolCallPart(tool_name, _shows(prompt))])
+        outputs = [
+            {"email_number": i, "artist_shows": _shows(email)}
+            for i, email in enumerate(emails, start=1)
+        ]
+        if self.drop_last_output:
+            outputs.pop()
+        if self.reverse_outputs:
+            outputs.reverse()
+        return ModelResponse(parts=[ToolCallPart(tool_name, {"response": outputs})])
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(email_source, "LLM_MODEL_NAME", FunctionModel(model))
+    return model
+
+
+@pytest.fixture
+def inbox(monkeypatch):
+    emails: list[EmailContent] = []
+
+    def fetch_new_emails(cursors):
+        return emails, {"INBOX": MailboxCursor(uid_validity=1, last_uid=len(emails))}
+
+    monkeypatch.setattr(email_source, "fetch_new_emails", fetch_new_emails)
+    return emails
+
+
+def _fetch_shows(runner, async_db):
+    source = EmailSource()
+    artist_shows = runner.run(source.fetch_shows(async_db))
+    runner.run(source.on_shows_saved(async_db))
+    return artist_shows
+
+
+def test_emails_are_extracted_concurrently(async_db, runner, model, inbox, monkeypatch):
+    monkeypatch.setattr(email_source, "EMAIL_EXTRACTION_CONCURRENCY", 3)
+    inbox.extend(_email(i) for i in range(10))
+
+    artist_shows = _fetch_shows(runner, async_db)
+
+    assert [shows.artist_name for shows in artist_shows] == [
+        f"Artist {i}" for i in range(10)
+    ]
+    assert len(model.prompts) == 10
+    assert model.max_running == 3
+    cursors = runner.run(get_mailbox_cursors(async_db, IMAP_HOST, IMAP_USER))
+    assert cursors["INBOX"].last_uid == 10
+
+
+def test_rate_limited_extractions_are_retried(async_db, runner, model, inbox):
+    model.errors = [ModelHTTPError(429, "model", headers={"Retry-After": "0"})]
+    inbox.append(_email(1))
+
+    assert len(_fetch_shows(runner, async_db)) == 1
+    assert len(model.prompts) == 2
+
+
+def test_short_emails_are_batched(async_db, runner, model, inbox, monkeypatch):
+    monkeypatch.setattr(email_source, "EMAIL_EXTRACTION_BATCH_SIZE", 4)
+    monkeypatch.setattr(email_source, "EMAIL_EXTRACTION_BATCH_MAX_CHARS", 1000)
+    inbox.extend(_email(i) for i in range(9))
+    inbox.append(_email(9, body="Artist 9 plays Paris on 12 May 2026. " * 100))
+
+    artist_shows = _fetch_shows(runner, async_db)
+
+    assert sorted(shows.artist_name for shows in artist_shows) == sorted(
+        f"Artist {i}" for i in range(10)
+    )
+    # 9 short emails in batches of 4, the last short one and the long one on their
+    # own (a batch of 1 uses the regular prompt).
+    assert sorted(prompt.count("=== Email") for prompt in model.prompts) == [0, 0, 4, 4]
+
+
+def test_incomplete_batches_are_extracted_one_by_one(
+    async_db, runner, model, inbox, monkeypatch
+):
+    monkeypatch.setattr(email_source, "EMAIL_EXTRACTION_BATCH_SIZE", 3)
+    model.drop_last_output = True
+    inbox.extend(_email(i) for i in range(3))
+
+    artist_shows = _fetch_shows(runner, async_db)
+
+    assert [shows.artist_name for shows in artist_shows] == [
+        f"Artist {i}" for i in range(3)
+    ]
+    assert len(model.prompts) == 1 + 3
+
+
+def test_batch_answers_are_matched_by_email_number(
+    async_db, runner, model, inbox, monkeypatch
+):
+    monkeypatch.setattr(email_source, "EMAIL_EXTRACTION_BATCH_SIZE", 3)
+    model.reverse_outputs = True
+    inbox.extend(_email(i) for i in range(3))
+
+    artist_shows = _fetch_shows(runner, async_db)
+
+    assert [shows.artist_name for shows in artist_shows] == [
+        f"Artist {i}" for i in range(3)
+    ]
+    assert len(model.prompts) == 1
+
+
+def test_failed_emails_dont_hold_back_the_others(async_db, runner, model, inbox):
+    model.failing_subjects = {"Artist 1 on tour"}
+    inbox.extend(_email(i) for i in range(3))
+
+    artist_shows = _fetch_shows(runner, async_db)
+
+    assert [shows.artist_name for shows in artist_shows] == ["Artist 0", "Artist 2"]
+    cursors = runner.run(get_mailbox_cursors(async_db, IMAP_HOST, IMAP_USER))
+    assert cursors["INBOX"].last_uid == 3
+
+    # Not extracted again on the next run.
+    model.prompts.clear()
+    assert _fetch_shows(runner, async_db) == []
+    assert model.prompts == []
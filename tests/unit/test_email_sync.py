@@ -0,0 +1,349 @@
+import imaplib
+import re
+from email.message import EmailMessage, Message
+
+import pytest
+
+from concert_checker.common.dataclasses import MailboxCursor
+from concert_checker.tools import email as email_module
+from concert_checker.tools.email import (
+    _parse_fetch_response,
+    _pick_text_part,
+    _text_parts,
+    _uid_set,
+    fetch_new_emails,
+)
+
+ADDRESS = "shows@example.com"
+
+
+def _email(uid: int, to: str = ADDRESS) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = f"Newsletter {uid}"
+    message["From"] = "band@example.com"
+    message["To"] = to
+    message["Date"] = "Mon, 12 May 2025 10:00:00 +0000"
+    message["Message-ID"] = f"<{uid}@example.com>"
+    message.set_content(f"Tour dates, part {uid}")
+    return message
+
+
+def _bodystructure(part: Message) -> str:
+    if part.is_multipart():
+        children = "".join(_bodystructure(child) for child in part.get_payload())
+        return f'({children} "{part.get_content_subtype().upper()}")'
+    charset = part.get_content_charset()
+    params = f'("CHARSET" "{charset}")' if charset else "NIL"
+    encoding = part.get("Content-Transfer-Encoding", "7bit").upper()
+    size = len(_payload(part))
+    disposition = part.get_content_disposition()
+    disposition = f'("{disposition.upper()}" NIL)' if disposition else "NIL"
+    fields = f'"{part.get_content_maintype().upper()}" "{part.get_content_subtype().upper()}" {params} NIL NIL "{encoding}" {size}'
+    lines = (
+        f" {_payload(part).count(b'\n')}"
+        if part.get_content_maintype() == "text"
+        else ""
+    )
+    return f"({fields}{lines} NIL {disposition} NIL)"
+
+
+def _payload(part: Message) -> bytes:
+    """The payload of a part, as sent on the wire."""
+    return part.as_bytes().split(b"\n\n", 1)[1]
+
+
+def _section(message: Message, section: str) -> Message:
+    for index in section.split("."):
+        if message.is_multipart():
+            message = message.get_payload()[int(index) - 1]
+    return message
+
+
+class FakeIMAP:
+    """A mailbox server holding `messages` (UID -> email), recording commands."""
+
+    def __init__(self, messages: dict[int, EmailMessage], uid_validity: int = 7):
+        self.messages = messages
+        self.uid_validity = uid_validity
+        self.commands: list[tuple] = []
+        self.bytes_sent = 0
+        # UIDs that are found by SEARCH, but not returned by FETCH.
+        self.unfetchable: set[int] = set()
+
+    def __call__(self, host):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def login(self, user, password):
+        return "OK", [b""]
+
+    def select(self, mailbox, readonly=False):
+        assert readonly, "flags must be left alone"
+        self.commands.append(("SELECT", mailbox))
+        return "OK", [str(len(self.messages)).encode()]
+
+    def response(self, code):
+        return code, [str(self.uid_validity).encode()]
+
+    def uid(self, command, *args):
+        self.commands.append((command, *args))
+        if command == "SEARCH":
+            uids = sorted(self.messages)
+            if match := re.match(r"UID (\d+):\*", args[0]):
+                # Like real servers, "n:*" matches the last email even if below n.
+                uids = [u for u in uids if u >= int(match[1])] or uids[-1:]
+            return "OK", [" ".join(map(str, uids)).encode()]
+
+        assert command == "FETCH"
+        assert "PEEK" in args[1], "flags must be left alone"
+        data = []
+        for uid in self._uids(args[0]):
+            message = self.messages[uid]
+            if "BODYSTRUCTURE" in args[1]:
+                fields = ("Subject", "From", "To", "Date", "Message-ID")
+                headers = "".join(f"{f}: {message[f]}\r\n" for f in fields) + "\r\n"
+                prefix = f"BODYSTRUCTURE {_bodystructure(message)} BODY[HEADER.FIELDS (SUBJECT FROM TO DATE MESSAGE-ID)]"
+                literal = headers.encode()
+            elif match := re.search(r"BODY\.PEEK\[([\d.]+)\]<0\.(\d+)>", args[1]):
+                prefix = f"BODY[{match[1]}]<0>"
+                literal = _payload(_section(message, match[1]))[: int(match[2])]
+            else:
+                assert "BODY.PEEK[]" in args[1]
+                prefix, literal = "BODY[]", message.as_bytes()
+            self.bytes_sent += len(literal)
+            data.append((f"1 (UID {uid} {prefix} {{{len(literal)}}}".encode(), literal))
+            data.append(b")")
+        return "OK", data
+
+    def _uids(self, uid_set: str) -> list[int]:
+        uids = []
+        for part in uid_set.split(","):
+            first, _, last = part.partition(":")
+            uids.extend(range(int(first), int(last or first) + 1))
+        return [
+            uid for uid in uids if uid in self.messages and uid not in self.unfetchable
+        ]
+
+
+@pytest.fixture
+def imap(monkeypatch):
+    server = FakeIMAP({uid: _email(uid) for uid in range(1, 251)})
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", server)
+    monkeypatch.setattr(email_module, "IMAP_TO_ADDRESSES", [ADDRESS])
+    monkeypatch.setattr(email_module, "IMAP_MAILBOXES", ["INBOX"])
+    monkeypatch.setattr(email_module, "IMAP_FETCH_BATCH_SIZE", 100)
+    return server
+
+
+def test_first_sync_fetches_in_batches(imap):
+    emails, cursors = fetch_new_emails({})
+
+    assert len(emails) == 250
+    assert emails[0].subject == "Newsletter 1"
+    assert cursors == {"INBOX": MailboxCursor(uid_validity=7, last_uid=250)}
+    fetches = [c for c in imap.commands if c[0] == "FETCH"]
+    # Structure and headers, then the text part, for each batch
+    assert [c[1] for c in fetches] == [
+        "1:100",
+        "1:100",
+        "101:200",
+        "101:200",
+        "201:250",
+        "201:250",
+    ]
+
+
+def test_next_sync_only_fetches_new_emails(imap):
+    _, cursors = fetch_new_emails({})
+    imap.commands.clear()
+
+    assert fetch_new_emails(cursors) == ([], cursors)
+    assert not [c for c in imap.commands if c[0] == "FETCH"]
+
+    imap.messages[260] = _email(260)
+    emails, cursors = fetch_new_emails(cursors)
+    assert [e.subject for e in emails] == ["Newsletter 260"]
+    assert cursors["INBOX"].last_uid == 260
+
+
+def test_cursor_stops_before_the_first_failed_fetch(imap):
+    imap.unfetchable = {120, 180}
+    emails, cursors = fetch_new_emails({})
+
+    assert len(emails) == 248
+    assert cursors["INBOX"].last_uid == 119
+
+    imap.unfetchable.clear()
+    emails, cursors = fetch_new_emails(cursors)
+    assert emails[0].subject == "Newsletter 120"
+    assert len(emails) == 131
+    assert cursors["INBOX"] == MailboxCursor(uid_validity=7, last_uid=250)
+
+
+def test_emails_that_never_fetch_are_skipped(imap, monkeypatch):
+    monkeypatch.setattr(email_module, "IMAP_MAX_FETCH_ATTEMPTS", 2)
+    imap.unfetchable = {120, 180}
+    _, cursors = fetch_new_emails({})
+    assert cursors["INBOX"].last_uid == 119
+    assert cursors["INBOX"].fetch_attempts == 1
+
+    # Skipped on its second attempt, the cursor stops at the next failure.
+    emails, cursors = fetch_new_emails(cursors)
+    assert emails[0].subject == "Newsletter 121"
+    assert cursors["INBOX"].last_uid == 179
+    assert cursors["INBOX"].failed_uid == 180
+
+    imap.unfetchable = {180}
+    emails, cursors = fetch_new_emails(cursors)
+    assert emails[0].subject == "Newsletter 181"
+    assert cursors["INBOX"] == MailboxCursor(uid_validity=7, last_uid=250)
+
+
+def test_uid_validity_change_restarts_the_sync(imap):
+    imap.uid_validity = 8
+    _, cursors = fetch_new_emails(
+        {"INBOX": MailboxCursor(uid_validity=7, last_uid=250)}
+    )
+
+    assert cursors["INBOX"] == MailboxCursor(uid_validity=8, last_uid=250)
+    search = next(c for c in imap.commands if c[0] == "SEARCH")
+    assert search[1].startswith("SINCE ")
+
+
+def test_uid_set():
+    assert _uid_set([1, 2, 3, 7, 9, 10]) == "1:3,7,9:10"
+    assert _uid_set([5]) == "5"
+
+
+def test_parse_fetch_response_with_uid_after_literal():
+    data = [
+        (b"1 (BODY[] {3}", b"abc"),
+        b" UID 42)",
+        (b"2 (UID 43 BODY[] {3}", b"def"),
+        b")",
+    ]
+    responses = _parse_fetch_response(data)
+    assert {uid: items["BODY[]"] for uid, items in responses.items()} == {
+        42: b"abc",
+        43: b"def",
+    }
+
+
+def test_parse_bodystructure():
+    data = [
+        (
+            b'1 (UID 5 BODYSTRUCTURE ((("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 12 1'
+            b' NIL NIL NIL)("TEXT" "HTML" ("CHARSET" "iso-8859-1") NIL NIL "BASE64" 900 12'
+            b' NIL NIL NIL) "ALTERNATIVE")("APPLICATION" "PDF" ("NAME" "tour.pdf") NIL NIL'
+            b' "BASE64" 2000000 NIL ("ATTACHMENT" ("FILENAME" "tour.pdf")) NIL) "MIXED"))'
+        )
+    ]
+    structure = _parse_fetch_response(data)[5]["BODYSTRUCTURE"]
+
+    assert [(p.section, p.subtype, p.charset) for p in _text_parts(structure)] == [
+        ("1.1", "plain", "utf-8"),
+        ("1.2", "html", "iso-8859-1"),
+    ]
+    assert _pick_text_part(structure).section == "1.1"
+
+
+def _newsletter_with_attachments(uid: int, text_attachment: bool) -> EmailMessage:
+    message = _email(uid)
+    message.set_content(
+        "<html><body><h1>Tour</h1>"
+        + "<p>12 May 2026 - Paris, La Cigale</p>" * 20
+        + "</body></html>",
+        subtype="html",
+    )
+    message.add_attachment(
+        b"%PDF" + bytes(1_000_000),
+        maintype="application",
+        subtype="pdf",
+        filename="tour.pdf",
+    )
+    if text_attachment:
+        message.add_attachment(
+            b"Shows: 01 June", maintype="text", subtype="plain", filename="shows.txt"
+        )
+    return message
+
+
+def test_text_mode_skips_attachments(imap):
+    imap.messages = {1: _newsletter_with_attachments(1, text_attachment=True)}
+    imap.messages[2] = _email(2)
+    imap.messages[2].set_content("Le Zénith, Paris", charset="iso-8859-1")
+
+    emails, _ = fetch_new_emails({})
+
+    assert [e.subject for e in emails] == ["Newsletter 1", "Newsletter 2"]
+    assert "12 May 2026 - Paris, La Cigale" in emails[0].body
+    assert "Shows: 01 June" not in emails[0].body
+    assert "Le Zénith, Paris" in emails[1].body
+    assert imap.bytes_sent < 10_000
+
+
+def test_text_mode_matches_full_mode(imap, monkeypatch):
+    imap.messages = {1: _newsletter_with_attachments(1, text_attachment=False)}
+    imap.messages[2] = _email(2)
+    text_emails, _ = fetch_new_emails({})
+
+    monkeypatch.setattr(email_module, "IMAP_FETCH_MODE", "full")
+    full_emails, _ = fetch_new_emails({})
+
+    assert text_emails == full_emails
+
+
+def test_text_mode_truncates_huge_parts(imap, monkeypatch):
+    monkeypatch.setattr(email_module, "IMAP_MAX_BODY_BYTES", 1000)
+    imap.messages = {1: _email(1)}
+    imap.messages[1].set_content("Tour dates " * 10_000, cte="base64")
+
+    emails, _ = fetch_new_emails({})
+
+    assert emails[0].body.startswith("Tour dates Tour dates")
+    assert 500 < len(emails[0].body) <= 1000
+
+
+def test_mailbox_cursors_round_trip(db):
+    from concert_checker.app import crud
+
+    assert crud.get_mailbox_cursors(db, "imap.example.com", "me") == {}
+    crud.set_mailbox_cursors(
+        db,
+        "imap.example.com",
+        "me",
+        {"INBOX": MailboxCursor(uid_validity=7, last_uid=10)},
+    )
+    crud.set_mailbox_cursors(
+        db,
+        "imap.example.com",
+        "me",
+        {"INBOX": MailboxCursor(uid_validity=7, last_uid=25)},
+    )
+    db.commit()
+
+    assert crud.get_mailbox_cursors(db, "imap.example.com", "me") == {
+        "INBOX": MailboxCursor(uid_validity=7, last_uid=25)
+    }
+    assert crud.get_mailbox_cursors(db, "imap.example.com", "someone-else") == {}
+
+
+@pytest.mark.parametrize("fetch_mode", ["text", "full"])
+def test_copies_in_other_mailboxes_are_skipped(imap, monkeypatch, fetch_mode):
+    monkeypatch.setattr(email_module, "IMAP_FETCH_MODE", fetch_mode)
+    # The fake server serves the same emails in both mailboxes.
+    monkeypatch.setattr(email_module, "IMAP_MAILBOXES", ["INBOX", "Newsletters"])
+    imap.messages = {1: _email(1), 2: _email(2)}
+
+    emails, cursors = fetch_new_emails({})
+
+    assert [e.message_id for e in emails] == ["<1@example.com>", "<2@example.com>"]
+    assert set(cursors) == {"INBOX", "Newsletters"}
+    if fetch_mode == "text":
+        body_fetches = [c for c in imap.commands if c[0] == "FETCH" and "[1]" in c[2]]
+        assert len(body_fetches) == 1
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+
+from concert_checker.common.fingerprint import (
+    canonicalize_url,
+    content_fingerprint,
+    normalize_page_content,
+)
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "pages"
+
+SONGKICK_URL = "https://www.songkick.com/artists/123456-men-i-trust/calendar"
+ARTIST_URL = "https://menitrust.com/tour"
+
+
+def _fingerprint(fixture: str, url: str) -> str:
+    return content_fingerprint((FIXTURES / fixture).read_text(), url)
+
+
+@pytest.mark.parametrize(
+    ("first", "second", "url"),
+    [
+        ("songkick_calendar_load1.md", "songkick_calendar_load2.md", SONGKICK_URL),
+        ("artist_tour_load1.md", "artist_tour_load2.md", ARTIST_URL),
+    ],
+)
+def test_reloads_of_the_same_page_have_the_same_fingerprint(first, second, url):
+    assert (FIXTURES / first).read_text() != (FIXTURES / second).read_text()
+    assert _fingerprint(first, url) == _fingerprint(second, url)
+
+
+@pytest.mark.parametrize(
+    ("before", "after", "url"),
+    [
+        ("songkick_calendar_load2.md", "songkick_calendar_new_show.md", SONGKICK_URL),
+        ("artist_tour_load2.md", "artist_tour_changed.md", ARTIST_URL),
+    ],
+)
+def test_changes_to_shows_change_the_fingerprint(before, after, url):
+    assert _fingerprint(before, url) != _fingerprint(after, url)
+
+
+def test_songkick_rule_only_keeps_upcoming_concerts():
+    content = (FIXTURES / "songkick_calendar_load1.md").read_text()
+    normalized = normalize_page_content(content, SONGKICK_URL)
+
+    assert "Le Trianon" in normalized
+    assert "Fox Theater" not in normalized  # past concert
+    assert "Crumb" not in normalized  # recommendation rail
+    assert "Fontaines D.C." not in normalized  # trending rail
+    assert "people going" not in normalized
+
+
+@pytest.mark.parametrize(
+    "heading", ["Tour dates & merch", "Upcoming shows & merch", "Workshop tour"]
+)
+def test_show_sections_with_an_off_topic_word_are_fingerprinted(heading):
+    page = "# Artist\n\n## {heading}\n\n- 12 March 2026 — Paris, {venue}\n"
+
+    assert content_fingerprint(
+        page.format(heading=heading, venue="Olympia"), ARTIST_URL
+    ) != content_fingerprint(page.format(heading=heading, venue="Zénith"), ARTIST_URL)
+
+
+def test_only_cookie_banners_are_dropped():
+    normalized = normalize_page_content(
+        "# Tour\n\n- 12 March 2026 — Milk & Cookies Festival, Paris\n\n"
+        "This site uses cookies. [Accept all cookies](https://a.example/cookies)\n",
+        ARTIST_URL,
+    )
+
+    assert "Milk & Cookies Festival" in normalized
+    assert "This site uses cookies" not in normalized
+
+
+def test_pages_without_dates_are_still_fingerprinted():
+    assert content_fingerprint("# About\n\nHello", ARTIST_URL) != content_fingerprint(
+        "# About\n\nGoodbye", ARTIST_URL
+    )
+
+
+def test_canonicalize_url_drops_tracking_parameters():
+    assert (
+        canonicalize_url("HTTPS://Example.com/tour/?utm_source=x&b=2&a=1&fbclid=y#top")
+        == "https://example.com/tour?a=1&b=2"
+    )
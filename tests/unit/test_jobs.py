@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from concert_checker.app.crud import (
+    claim_job,
+    enqueue_jobs,
+    extend_job_lease,
+    fail_job,
+    finish_job,
+    get_or_create_artist,
+)
+from concert_checker.app.models import Job
+from concert_checker.app.schemas import ArtistCreate
+
+NOW = datetime(2026, 3, 1, 12)
+LEASE = timedelta(minutes=5)
+
+
+def _enqueue(db, checks, now=NOW) -> int:
+    return enqueue_jobs(db, checks, now, finished_before=now - timedelta(minutes=10))
+
+
+def _claim(db, worker, now=NOW):
+    job = claim_job(db, worker, now, now + LEASE)
+    db.commit()
+    return job
+
+
+def test_jobs_are_queued_once(db):
+    artist = get_or_create_artist(db, ArtistCreate(name="Artist"))
+    checks = [(artist.id, "website"), (artist.id, "songkick"), (None, "email")]
+
+    assert _enqueue(db, checks) == 3
+    assert _enqueue(db, checks) == 0
+    job = _claim(db, "w1")
+    # Running jobs aren't queued again either.
+    assert _enqueue(db, checks) == 0
+    assert db.query(Job).count() == 3
+
+    # Nor the ones that just finished, until the next tick.
+    assert finish_job(db, job.id, "w1", NOW)
+    assert _enqueue(db, checks) == 0
+    assert _enqueue(db, checks, now=NOW + timedelta(minutes=10)) == 1
+
+
+def test_each_job_is_claimed_once(db):
+    artist = get_or_create_artist(db, ArtistCreate(name="Artist"))
+    _ = _enqueue(db, [(artist.id, "website"), (None, "email")])
+
+    first, second = _claim(db, "w1"), _claim(db, "w2")
+
+    assert {first.source, second.source} == {"website", "email"}
+    assert {first.artist_name, second.artist_name} == {"Artist", None}
+    assert _claim(db, "w3") is None
+
+
+def test_expired_leases_are_taken_over(db):
+    _ = _enqueue(db, [(None, "email")])
+    job = _claim(db, "crashed")
+
+    assert _claim(db, "w2", now=NOW + LEASE / 2) is None
+    taken_over = _claim(db, "w2", now=NOW + 2 * LEASE)
+    assert taken_over.id == job.id
+    assert taken_over.attempts == 2
+
+    # The first worker lost the job.
+    assert not extend_job_lease(db, job.id, "crashed", NOW + 3 * LEASE)
+    assert not finish_job(db, job.id, "crashed", NOW)
+    assert finish_job(db, job.id, "w2", NOW)
+
+
+def test_failed_jobs_are_retried_later_then_given_up(db):
+    _ = _enqueue(db, [(None, "email")])
+    job = _claim(db, "w1")
+
+    retry_at = NOW + timedelta(minutes=1)
+    assert fail_job(db, job.id, "w1", NOW, "boom", retry_at)
+    assert _claim(db, "w1") is None
+    job = _claim(db, "w1", now=retry_at)
+    assert job.attempts == 2
+
+    assert fail_job(db, job.id, "w1", retry_at, "boom again", None)
+    stored = db.get(Job, job.id)
+    assert (stored.state, stored.last_error) == ("failed", "boom again")
+    assert _claim(db, "w1", now=NOW + timedelta(days=1)) is None
+
+
+def test_concurrent_workers_never_claim_the_same_job(db, tmp_path):
+    artists = [get_or_create_artist(db, ArtistCreate(name=f"A{i}")) for i in range(20)]
+    _ = _enqueue(db, [(artist.id, "website") for artist in artists])
+    db.commit()
+
+    def work(worker: str) -> list[int]:
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'concerts.db'}",
+            connect_args={"timeout": 30},
+        )
+        claimed = []
+        with Session(engine) as session:
+            while (job := _claim(session, worker)) is not None:
+                claimed.append(job.id)
+        engine.dispose()
+        return claimed
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        claimed = list(executor.map(work, [f"w{i}" for i in range(4)]))
+
+    ids = [job_id for worker_ids in claimed for job_id in worker_ids]
+    assert len(ids) == len(set(ids)) == 20
@@ -0,0 +1,98 @@
+import datetime
+
+from concert_checker.app.async_crud import run_sync
+from concert_checker.app.crud import create_extraction_cache, evict_extraction_caches
+from concert_checker.app.models import ExtractionCache
+from concert_checker.common import llm_cache
+from concert_checker.common.dataclasses import ArtistShows, ShowDetails
+from concert_checker.common.llm_cache import cached_extraction, extraction_cache_key
+
+SHOWS = [
+    ShowDetails(
+        date=datetime.date.today() + datetime.timedelta(days=1),
+        city="Paris",
+        state=None,
+        country="France",
+        country_code="FR",
+        venue="Olympia",
+        source_url="https://example.com/tour",
+    )
+]
+
+
+def _run(runner, db, content, prompt_version="test:v1"):
+    calls = []
+
+    async def extract():
+        calls.append(1)
+        return SHOWS
+
+    output = runner.run(
+        cached_extraction(db, prompt_version, content, list[ShowDetails], extract)
+    )
+    return output, len(calls)
+
+
+def _entry(runner, db) -> ExtractionCache:
+    return runner.run(
+        run_sync(db, lambda session: session.query(ExtractionCache).one())
+    )
+
+
+def test_second_extraction_is_served_from_cache(async_db, runner):
+    assert _run(runner, async_db, "page content") == (SHOWS, 1)
+    assert _run(runner, async_db, "page content") == (SHOWS, 0)
+    assert _entry(runner, async_db).hits == 1
+
+
+def test_key_depends_on_prompt_version_and_content(async_db, runner):
+    _ = _run(runner, async_db, "page content")
+    assert _run(runner, async_db, "other content")[1] == 1
+    assert _run(runner, async_db, "page content", prompt_version="test:v2")[1] == 1
+    assert extraction_cache_key("a", "v1", "x") != extraction_cache_key("b", "v1", "x")
+
+
+def test_shows_that_have_passed_are_dropped_from_cached_outputs(
+    async_db, runner, monkeypatch
+):
+    class Later(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.datetime.now(tz) + datetime.timedelta(days=2)
+
+    _ = _run(runner, async_db, "page content")
+    monkeypatch.setattr(llm_cache, "datetime", Later)
+
+    assert _run(runner, async_db, "page content") == ([], 0)
+
+
+def test_drop_past_shows_of_artist_shows():
+    today = datetime.date.today()
+    past = ShowDetails(**{**vars(SHOWS[0]), "date": datetime.datetime(2000, 1, 1)})
+    unparsed = ShowDetails(**{**vars(SHOWS[0]), "date": "TBA"})
+    output = ArtistShows(artist_name="A", shows=[past, *SHOWS, unparsed])
+
+    assert llm_cache.drop_past_shows(output, today) == ArtistShows(
+        artist_name="A", shows=[*SHOWS, unparsed]
+    )
+    assert llm_cache.drop_past_shows(None, today) is None
+
+
+def test_expired_entry_is_refreshed(async_db, runner):
+    _ = _run(runner, async_db, "page content")
+    _entry(runner, async_db).created_at = datetime.datetime(2000, 1, 1)
+    assert _run(runner, async_db, "page content")[1] == 1
+    assert _entry(runner, async_db).created_at.year > 2000
+
+
+def test_eviction_drops_expired_then_least_recently_used(db):
+    now = datetime.datetime.now()
+    for i in range(4):
+        entry = create_extraction_cache(db, f"key{i}", "model", "v1", "[]")
+        entry.last_used_at = now + datetime.timedelta(seconds=i)
+    db.query(ExtractionCache).filter_by(key="key3").one().created_at = (
+        now - datetime.timedelta(days=365)
+    )
+
+    assert evict_extraction_caches(db, now - datetime.timedelta(days=1), 2) == 2
+    assert {e.key for e in db.query(ExtractionCache)} == {"key1", "key2"}
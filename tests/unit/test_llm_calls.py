@@ -0,0 +1,126 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import pytest
+from pydantic_ai.exceptions import ModelHTTPError
+
+from concert_checker.common import llm_calls
+from concert_checker.common.llm_calls import MicroBatcher, run_with_retries
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays: list[float] = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(llm_calls.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def _flaky(errors: list[ModelHTTPError]):
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return call, calls
+
+
+def test_rate_limited_calls_are_retried_with_backoff(sleeps):
+    call, calls = _flaky([ModelHTTPError(429, "model"), ModelHTTPError(503, "model")])
+
+    output = asyncio.run(run_with_retries(call, base_delay=1, max_delay=60))
+
+    assert output == "ok"
+    assert len(calls) == 3
+    assert 0.5 <= sleeps[0] <= 1
+    assert 1 <= sleeps[1] <= 2
+
+
+def test_retry_after_header_is_honored(sleeps):
+    retry_at = datetime.now(UTC) + timedelta(seconds=30)
+    call, _ = _flaky(
+        [
+            ModelHTTPError(429, "model", headers={"Retry-After": "7"}),
+            ModelHTTPError(
+                429, "model", headers={"retry-after": format_datetime(retry_at)}
+            ),
+        ]
+    )
+
+    assert asyncio.run(run_with_retries(call, max_delay=60)) == "ok"
+    assert sleeps[0] == 7
+    assert 25 < sleeps[1] <= 30
+
+
+def test_other_errors_are_not_retried(sleeps):
+    call, calls = _flaky([ModelHTTPError(400, "model")])
+
+    with pytest.raises(ModelHTTPError):
+        asyncio.run(run_with_retries(call))
+    assert len(calls) == 1
+
+
+def test_gives_up_after_max_attempts(sleeps):
+    call, calls = _flaky([ModelHTTPError(429, "model")] * 5)
+
+    with pytest.raises(ModelHTTPError):
+        asyncio.run(run_with_retries(call, max_attempts=3))
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    batches: list[list[int]] = []
+
+    async def run_batch(items: list[int]) -> list[int]:
+        batches.append(items)
+        return [item * 10 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_size=2)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert asyncio.run(main()) == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_micro_batcher_fails_the_whole_batch():
+    async def run_batch(items: list[int]) -> list[int]:
+        return items[:1]
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_size=2)
+        return await asyncio.gather(
+            *(batcher.submit(i) for i in range(2)), return_exceptions=True
+        )
+
+    assert [type(output) for output in asyncio.run(main())] == [ValueError] * 2
+
+
+def test_micro_batcher_forwards_cancellation():
+    started = asyncio.Event()
+
+    async def run_batch(items: list[int]) -> list[int]:
+        started.set()
+        await asyncio.sleep(10)
+        return items
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_size=2)
+        outputs = asyncio.gather(
+            *(batcher.submit(i) for i in range(2)), return_exceptions=True
+        )
+        await started.wait()
+        await batcher.aclose()
+        return await outputs
+
+    assert [type(output) for output in asyncio.run(main())] == [
+        asyncio.CancelledError
+    ] * 2
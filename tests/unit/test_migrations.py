@@ -0,0 +1,70 @@
+from sqlalchemy import create_engine, inspect, text
+
+from concert_checker.app.migrations import init_db
+
+
+def test_init_db_adds_missing_columns_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'concerts.db'}")
+    with engine.begin() as conn:
+        _ = conn.execute(
+            text(
+                "CREATE TABLE page_caches ("
+                "id INTEGER PRIMARY KEY, url VARCHAR NOT NULL UNIQUE, "
+                "content_hash VARCHAR, last_fetched_at DATETIME, "
+                "last_updated_at DATETIME)"
+            )
+        )
+        _ = conn.execute(
+            text("INSERT INTO page_caches (url, content_hash) VALUES ('u', 'h')")
+        )
+
+    init_db(engine)
+
+    columns = {column["name"] for column in inspect(engine).get_columns("page_caches")}
+    assert {"etag", "last_modified"} <= columns
+    with engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT url, content_hash, etag FROM page_caches")
+        ).one()
+    assert tuple(row) == ("u", "h", None)
+
+
+def test_init_db_merges_duplicates_before_creating_unique_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'concerts.db'}")
+    with engine.begin() as conn:
+        for statement in [
+            (
+                "CREATE TABLE artists (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+                "website_base_url VARCHAR, songkick_url VARCHAR)"
+            ),
+            (
+                "CREATE TABLE concerts (id INTEGER PRIMARY KEY, date DATE NOT NULL, "
+                "city VARCHAR NOT NULL, country VARCHAR, country_code VARCHAR, "
+                "source_url VARCHAR NOT NULL, artist_id INTEGER NOT NULL, venue_id INTEGER)"
+            ),
+            "INSERT INTO artists (id, name) VALUES (1, 'A'), (2, 'A'), (3, 'B')",
+            (
+                "INSERT INTO concerts (date, city, source_url, artist_id) VALUES "
+                "('2026-05-01', 'Paris', 'u', 1), ('2026-05-01', 'Paris', 'u', 2), "
+                "('2026-05-02', 'Lyon', 'u', 2), ('2026-05-01', 'Paris', 'u', 3)"
+            ),
+        ]:
+            _ = conn.execute(text(statement))
+
+    init_db(engine)
+
+    indexes = {
+        index["name"]: index for index in inspect(engine).get_indexes("concerts")
+    }
+    assert indexes["ix_concerts_artist_id_date"]["unique"]
+    with engine.connect() as conn:
+        artists = conn.execute(text("SELECT id, name FROM artists ORDER BY id")).all()
+        concerts = conn.execute(
+            text("SELECT artist_id, date FROM concerts ORDER BY artist_id, date")
+        ).all()
+    assert [tuple(row) for row in artists] == [(1, "A"), (3, "B")]
+    assert [tuple(row) for row in concerts] == [
+        (1, "2026-05-01"),
+        (1, "2026-05-02"),
+        (3, "2026-05-01"),
+    ]
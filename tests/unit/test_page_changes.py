@@ -0,0 +1,102 @@
+import httpx
+import pytest
+
+from concert_checker.app.async_crud import get_or_create_page_cache
+from concert_checker.app.schemas import PageCacheCreate
+from concert_checker.common import http
+from concert_checker.common.fingerprint import content_fingerprint
+from concert_checker.tools import web
+from concert_checker.tools.web import page_has_changed
+
+URL = "https://artist.example/tour"
+CONTENT = "# Tour\n\n- 12 March 2026 — Paris, Olympia\n"
+
+
+class FakeServer:
+    """Answers the conditional requests, and records their headers."""
+
+    def __init__(self):
+        self.response: httpx.Response | Exception = httpx.Response(200)
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+@pytest.fixture
+def server(monkeypatch, runner):
+    server = FakeServer()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    monkeypatch.setattr(http, "_http_client", client)
+    yield server
+    runner.run(client.aclose())
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """The URLs rendered by the browser."""
+    urls: list[str] = []
+
+    async def fake_fetch_page_content(url: str) -> str:
+        urls.append(url)
+        return CONTENT
+
+    monkeypatch.setattr(web, "fetch_page_content", fake_fetch_page_content)
+    return urls
+
+
+def _page_cache(async_db, runner, **values):
+    page_cache = runner.run(
+        get_or_create_page_cache(async_db, PageCacheCreate(url=URL))
+    )
+    for name, value in values.items():
+        setattr(page_cache, name, value)
+    return page_cache
+
+
+def test_not_modified_pages_are_not_rendered(async_db, runner, server, rendered):
+    _ = _page_cache(
+        async_db,
+        runner,
+        content_hash=content_fingerprint(CONTENT, URL),
+        etag='"v1"',
+        last_modified="Mon, 12 May 2025 10:00:00 GMT",
+    )
+    server.response = httpx.Response(304)
+
+    assert not runner.run(page_has_changed(async_db, URL))
+    assert server.requests[0].headers["If-None-Match"] == '"v1"'
+    assert server.requests[0].headers["If-Modified-Since"] == (
+        "Mon, 12 May 2025 10:00:00 GMT"
+    )
+    assert rendered == []
+
+
+def test_new_validators_are_stored_with_the_fingerprint(
+    async_db, runner, server, rendered
+):
+    page_cache = _page_cache(async_db, runner, content_hash="old", etag='"v1"')
+    server.response = httpx.Response(200, headers={"ETag": '"v2"'})
+
+    assert runner.run(page_has_changed(async_db, URL))
+    assert rendered == [URL]
+    assert page_cache.etag == '"v2"'
+    assert page_cache.last_modified is None
+    assert page_cache.content_hash == content_fingerprint(CONTENT, URL)
+
+
+def test_failed_conditional_requests_fall_back_to_the_fingerprint(
+    async_db, runner, server, rendered
+):
+    page_cache = _page_cache(
+        async_db, runner, content_hash=content_fingerprint(CONTENT, URL), etag='"v1"'
+    )
+    server.response = httpx.ConnectError("unreachable")
+
+    assert not runner.run(page_has_changed(async_db, URL))
+    assert rendered == [URL]
+    # Validators that couldn't be checked aren't kept.
+    assert page_cache.etag is None
@@ -0,0 +1,211 @@
+import asyncio
+
+import httpx
+import pytest
+
+from concert_checker.common import http, rate_limit
+from concert_checker.common.http import RateLimitedTransport
+from concert_checker.common.rate_limit import DomainRateLimiter, registrable_domain
+
+_yield = asyncio.sleep
+
+
+class FakeClock:
+    """Stands in for `time` and `asyncio.sleep`: sleeping moves the clock forward.
+
+    Sleepers let the other tasks run first, so concurrent waiters wake in turn.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float):
+        self.sleeps.append(round(delay, 6))
+        wake_at = self.now + delay
+        await _yield(0)
+        self.now = max(self.now, wake_at)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def _acquire(limiter: DomainRateLimiter, *urls: str):
+    async def run():
+        for url in urls:
+            await limiter.acquire(url)
+
+    asyncio.run(run())
+
+
+def test_registrable_domain():
+    assert registrable_domain("https://www.songkick.com/artists/1") == "songkick.com"
+    assert registrable_domain("https://api.songkick.com/") == "songkick.com"
+    assert registrable_domain("https://songkick.com") == "songkick.com"
+    assert registrable_domain("https://www.bbc.co.uk/music") == "bbc.co.uk"
+    assert registrable_domain("http://127.0.0.1:8000/") == "127.0.0.1"
+
+
+def test_requests_are_spaced_after_a_burst(clock):
+    limiter = DomainRateLimiter(requests_per_second=2, burst=2, domain_rates={})
+
+    _acquire(limiter, *["https://www.songkick.com/a"] * 4)
+
+    assert clock.sleeps == [0.5, 0.5]
+    assert limiter.stats["songkick.com"].requests == 4
+    assert limiter.stats["songkick.com"].waited_seconds == pytest.approx(1.0)
+
+
+def test_domains_have_their_own_rates(clock):
+    limiter = DomainRateLimiter(
+        requests_per_second=10, burst=1, domain_rates={"songkick.com": 0.25}
+    )
+
+    _acquire(
+        limiter, "https://songkick.com/a", "https://a.example/", "https://b.example"
+    )
+    assert clock.sleeps == []
+
+    _acquire(limiter, "https://www.songkick.com/b")
+    assert clock.sleeps == [4]
+
+
+def test_throttled_domains_are_paused(clock):
+    limiter = DomainRateLimiter(
+        requests_per_second=100, burst=5, domain_rates={}, backoff_seconds=10
+    )
+    url = "https://www.songkick.com/a"
+
+    assert not limiter.record_response(url, 200, {})
+    assert limiter.record_response(url, 429, {"Retry-After": "30"})
+    _acquire(limiter, url)
+    assert clock.sleeps == [30]
+
+    # Without Retry-After: backoff, doubled while the domain keeps throttling us.
+    assert not limiter.record_response(url, 200, {})
+    clock.sleeps.clear()
+    for _ in range(2):
+        assert limiter.record_response(url, 429, None)
+        _acquire(limiter, url)
+    assert clock.sleeps == [10, 20]
+    assert limiter.stats["songkick.com"].throttled == 3
+
+    # Other domains aren't affected.
+    clock.sleeps.clear()
+    _acquire(limiter, "https://a.example/")
+    assert clock.sleeps == []
+
+
+def test_requests_queued_across_a_pause_are_spaced(clock):
+    limiter = DomainRateLimiter(requests_per_second=1, burst=1, domain_rates={})
+    url = "https://www.songkick.com/a"
+    released: list[float] = []
+
+    async def request():
+        await limiter.acquire(url)
+        released.append(clock.now - 1000)
+
+    async def run():
+        _ = limiter.record_response(url, 429, {"Retry-After": "2"})
+        await asyncio.gather(*(request() for _ in range(4)))
+
+    asyncio.run(run())
+
+    assert released == [2, 3, 4, 5]
+
+
+def test_requests_waiting_when_a_pause_starts_are_spaced(clock):
+    limiter = DomainRateLimiter(requests_per_second=1, burst=1, domain_rates={})
+    url = "https://www.songkick.com/a"
+    released: list[float] = []
+
+    async def request():
+        await limiter.acquire(url)
+        released.append(clock.now - 1000)
+
+    async def run():
+        # Three requests waiting for the rate, when the first one gets throttled.
+        tasks = [asyncio.create_task(request()) for _ in range(3)]
+        await _yield(0)
+        _ = limiter.record_response(url, 429, {"Retry-After": "5"})
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    assert released == [0, 5, 6]
+
+
+def test_robots_txt_crawl_delay_is_honored(clock):
+    fetched: list[str] = []
+
+    async def fetch_robots_txt(url: str) -> str | None:
+        fetched.append(url)
+        return "User-agent: *\nCrawl-delay: 5\nDisallow: /private\n"
+
+    limiter = DomainRateLimiter(
+        requests_per_second=10,
+        burst=3,
+        domain_rates={},
+        fetch_robots_txt=fetch_robots_txt,
+        max_crawl_delay=30,
+    )
+
+    _acquire(limiter, *["https://www.example.com/tour"] * 3)
+
+    assert fetched == ["https://www.example.com/robots.txt"]
+    assert clock.sleeps == [5, 5]
+
+
+def test_unreadable_robots_txt_keeps_the_default_rate(clock):
+    async def fetch_robots_txt(url: str) -> str | None:
+        raise httpx.ConnectError("unreachable")
+
+    limiter = DomainRateLimiter(
+        requests_per_second=2,
+        burst=2,
+        domain_rates={},
+        fetch_robots_txt=fetch_robots_txt,
+        max_crawl_delay=30,
+    )
+
+    _acquire(limiter, *["https://www.example.com/tour"] * 3)
+
+    assert clock.sleeps == [0.5]
+
+
+def test_stats_are_reset_once_logged(clock):
+    limiter = DomainRateLimiter(requests_per_second=2, burst=1, domain_rates={})
+    _acquire(limiter, *["https://www.songkick.com/a"] * 2)
+    assert limiter.stats["songkick.com"].waited_seconds == pytest.approx(0.5)
+
+    limiter.log_stats()
+
+    assert not limiter.stats
+
+
+def test_http_requests_are_retried_when_throttled(clock, monkeypatch):
+    limiter = DomainRateLimiter(requests_per_second=100, burst=5, domain_rates={})
+    monkeypatch.setattr(http, "_rate_limiter", limiter)
+    answers = [
+        httpx.Response(429, headers={"Retry-After": "3"}),
+        httpx.Response(200, text="ok"),
+    ]
+
+    async def run() -> httpx.Response:
+        transport = RateLimitedTransport(httpx.MockTransport(lambda _: answers.pop(0)))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.get("https://www.songkick.com/artists/1")
+
+    response = asyncio.run(run())
+
+    assert response.text == "ok"
+    assert clock.sleeps == [3]
+    assert limiter.stats["songkick.com"].requests == 2
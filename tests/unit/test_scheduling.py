@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import concert_checker.common.scheduling as scheduling_module
+from concert_checker.app.async_crud import (
+    commit,
+    get_due_checks,
+    get_or_create_artist,
+)
+from concert_checker.app.schemas import ArtistCreate
+from concert_checker.common.scheduling import check_interval, schedule_next_check
+
+NOW = datetime(2026, 3, 1, 12)
+HOUR = timedelta(hours=1)
+WEEK = timedelta(days=7)
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(scheduling_module, "SCHEDULER_JITTER", 0)
+
+
+def test_recently_changed_artists_are_checked_hourly():
+    assert check_interval(NOW, NOW - timedelta(hours=2), None) == HOUR
+
+
+def test_dormant_artists_are_checked_weekly():
+    assert check_interval(NOW, None, None) == WEEK
+    assert check_interval(NOW, NOW - timedelta(days=365), None) == WEEK
+
+
+def test_interval_grows_with_the_time_since_the_last_change():
+    intervals = [
+        check_interval(NOW, NOW - timedelta(days=days), None) for days in (1, 5, 20)
+    ]
+    assert intervals == sorted(intervals)
+    assert HOUR < intervals[0] < intervals[-1] < WEEK
+
+
+def test_upcoming_concerts_make_checks_more_frequent():
+    assert check_interval(NOW, None, date(2026, 3, 4)) < timedelta(days=3) / 12
+    assert check_interval(NOW, None, date(2026, 3, 1)) == HOUR
+    assert check_interval(NOW, None, date(2027, 3, 1)) == WEEK
+
+
+def test_jitter_spreads_checks(monkeypatch):
+    monkeypatch.setattr(scheduling_module, "SCHEDULER_JITTER", 0.1)
+    intervals = {scheduling_module.jittered(WEEK) for _ in range(20)}
+
+    assert len(intervals) > 1
+    assert all(0.9 * WEEK <= interval <= 1.1 * WEEK for interval in intervals)
+
+
+def _due(async_db, runner, limit=100) -> list[tuple[str, str]]:
+    rows = runner.run(get_due_checks(async_db, ["website"], datetime.now(), limit))
+    return [(row.artist_name, row.source) for row in rows]
+
+
+def test_new_artists_are_due_straight_away(async_db, runner):
+    for name in ["A", "B", "C"]:
+        runner.run(get_or_create_artist(async_db, ArtistCreate(name=name)))
+
+    assert _due(async_db, runner) == [
+        ("A", "website"),
+        ("B", "website"),
+        ("C", "website"),
+    ]
+    # The budget of the cycle.
+    assert _due(async_db, runner, limit=2) == [("A", "website"), ("B", "website")]
+
+
+def test_checked_artists_are_due_later(async_db, runner):
+    for name in ["Hot", "Dormant"]:
+        runner.run(get_or_create_artist(async_db, ArtistCreate(name=name)))
+    _ = _due(async_db, runner)
+
+    hot = runner.run(schedule_next_check(async_db, "Hot", "website", changed=True))
+    dormant = runner.run(
+        schedule_next_check(async_db, "Dormant", "website", changed=False)
+    )
+    runner.run(commit(async_db))
+
+    assert _due(async_db, runner) == []
+    assert hot - datetime.now() == pytest.approx(HOUR, abs=timedelta(seconds=5))
+    assert dormant - datetime.now() == pytest.approx(WEEK, abs=timedelta(seconds=5))
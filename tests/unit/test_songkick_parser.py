@@ -0,0 +1,71 @@
+import asyncio
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from concert_checker.extractors import songkick
+from concert_checker.extractors.songkick import (
+    SongkickParseError,
+    fetch_calendar_shows,
+    parse_calendar_page,
+)
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "songkick"
+
+CALENDAR_URL = "https://www.songkick.com/artists/123456-men-i-trust/calendar"
+
+
+def _html(fixture: str) -> str:
+    return (FIXTURES / fixture).read_text()
+
+
+def test_parse_calendar_page_extracts_shows_and_next_page():
+    shows, next_url = parse_calendar_page(_html("calendar_page1.html"), CALENDAR_URL)
+
+    assert next_url == f"{CALENDAR_URL}?page=2"
+    assert [
+        (s.date, s.venue, s.city, s.state, s.country, s.country_code) for s in shows
+    ] == [
+        (date(2025, 3, 14), "Le Trianon", "Paris", None, "France", None),
+        (date(2025, 4, 2), "Fox Theater", "Oakland", "CA", "US", "US"),
+        (date(2025, 4, 12), "Empire Polo Club", "Indio", "CA", "US", "US"),
+    ]
+    assert all(show.source_url == CALENDAR_URL for show in shows)
+
+
+def test_parse_calendar_page_skips_events_without_a_city():
+    shows, next_url = parse_calendar_page(
+        _html("calendar_page2.html"), f"{CALENDAR_URL}?page=2"
+    )
+
+    assert next_url is None
+    assert [(s.date, s.city) for s in shows] == [(date(2025, 5, 20), "Mexico City")]
+
+
+def test_parse_calendar_page_without_concerts():
+    assert parse_calendar_page(_html("calendar_no_concerts.html"), CALENDAR_URL) == (
+        [],
+        None,
+    )
+
+
+def test_parse_calendar_page_raises_on_unknown_pages():
+    with pytest.raises(SongkickParseError):
+        _ = parse_calendar_page(_html("not_a_calendar.html"), CALENDAR_URL)
+
+
+def test_fetch_calendar_shows_follows_pagination(monkeypatch):
+    pages = {
+        CALENDAR_URL: _html("calendar_page1.html"),
+        f"{CALENDAR_URL}?page=2": _html("calendar_page2.html"),
+    }
+
+    async def fake_fetch_html(url: str) -> str:
+        return pages[url]
+
+    monkeypatch.setattr(songkick, "fetch_html", fake_fetch_html)
+
+    shows = asyncio.run(fetch_calendar_shows(CALENDAR_URL))
+
+    assert [show.city for show in shows] == ["Paris", "Oakland", "Indio", "Mexico City"]
@@ -0,0 +1,120 @@
+import pytest
+from sqlalchemy import select
+
+import concert_checker.sources as sources_module
+from concert_checker.app.models import PageCache
+from concert_checker.common.dataclasses import ArtistShows, ShowDetails
+from concert_checker.extractors.artist_website import StructuredShows
+from concert_checker.sources import ArtistBoundSource
+from concert_checker.sources import artist_website as artist_website_module
+from concert_checker.sources.artist_website import ArtistWebsiteSource
+
+BASE_URL = "https://artist.example/"
+TOUR_URL = "https://artist.example/tour"
+
+
+class FakeSource(ArtistBoundSource):
+    name = "fake"
+
+    async def resolve(self, db):
+        pass
+
+    async def fetch_shows(self, db):
+        return [ArtistShows(artist_name=self.artist_name, shows=[])]
+
+
+class FakePages:
+    """Stands in for `page_has_changed`, and records the checked URLs."""
+
+    def __init__(self):
+        self.changed: set[str] = set()
+        self.checked: list[str] = []
+
+    async def page_has_changed(self, db, url):
+        self.checked.append(url)
+        return url in self.changed
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    fake_pages = FakePages()
+    monkeypatch.setattr(sources_module, "page_has_changed", fake_pages.page_has_changed)
+    return fake_pages
+
+
+def _show(source_url: str) -> ShowDetails:
+    return ShowDetails(
+        date="2025-05-12",
+        city="Paris",
+        state=None,
+        country="France",
+        country_code="FR",
+        venue=None,
+        source_url=source_url,
+    )
+
+
+def test_base_url_is_checked_when_no_page_is_tracked(async_db, runner, pages):
+    source = FakeSource("Artist")
+    pages.changed.add(BASE_URL)
+
+    assert runner.run(source.pages_have_changed(async_db, BASE_URL))
+    assert pages.checked == [BASE_URL]
+
+
+def test_tracked_pages_are_checked_on_the_next_run(async_db, runner, pages):
+    source = FakeSource("Artist")
+    runner.run(
+        source.track_pages(async_db, BASE_URL, [_show(TOUR_URL), _show("me@x.com")])
+    )
+    pages.checked.clear()
+
+    assert not runner.run(source.pages_have_changed(async_db, BASE_URL))
+    assert sorted(pages.checked) == [BASE_URL, TOUR_URL]
+
+    pages.changed.add(TOUR_URL)
+    assert runner.run(source.pages_have_changed(async_db, BASE_URL))
+
+
+def test_invalidate_checked_pages_forgets_fingerprints(async_db, runner, pages):
+    source = FakeSource("Artist")
+    runner.run(source.track_pages(async_db, BASE_URL, []))
+    runner.run(source.pages_have_changed(async_db, BASE_URL))
+
+    page_cache = runner.run(async_db.scalar(select(PageCache).filter_by(url=BASE_URL)))
+    page_cache.content_hash = "abc"
+
+    runner.run(source.invalidate_checked_pages(async_db))
+
+    assert page_cache.content_hash is None
+
+
+def test_model_only_reads_the_pages_without_structured_data(
+    async_db, runner, pages, monkeypatch
+):
+    extracted_pages: list[list[str] | None] = []
+
+    async def extract_structured_shows(base_url):
+        return StructuredShows(shows=[_show(BASE_URL)], pages_without_data=[TOUR_URL])
+
+    async def extract_shows(self, db, pages=None):
+        extracted_pages.append(pages)
+        return [_show(TOUR_URL)]
+
+    async def fetch_page_content(url):
+        raise OSError("offline")
+
+    monkeypatch.setattr(
+        artist_website_module, "extract_structured_shows", extract_structured_shows
+    )
+    monkeypatch.setattr(ArtistWebsiteSource, "_extract_shows", extract_shows)
+    monkeypatch.setattr(sources_module, "fetch_page_content", fetch_page_content)
+    source = ArtistWebsiteSource("Artist")
+    source._base_url = BASE_URL
+    pages.changed.add(TOUR_URL)
+
+    [artist_shows] = runner.run(source.fetch_shows(async_db))
+
+    assert [show.source_url for show in artist_shows.shows] == [BASE_URL, TOUR_URL]
+    assert extracted_pages == [[TOUR_URL]]
+    assert pages.checked[0] == TOUR_URL
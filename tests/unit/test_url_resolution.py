@@ -0,0 +1,168 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic_ai.exceptions import UnexpectedModelBehavior
+from sqlalchemy import select, update
+
+import concert_checker.common.url_resolution as url_resolution_module
+from concert_checker.app.async_crud import get_or_create_artist, run_sync
+from concert_checker.app.models import Artist, ArtistUrlResolution
+from concert_checker.app.schemas import ArtistCreate
+from concert_checker.common.url_resolution import (
+    ArtistUrlNotFound,
+    get_artist_url,
+    recheck_delay,
+    resolve_artist_urls,
+)
+
+
+class FakeSearch:
+    """Stands in for `find_artist_website`, and records the searched artists."""
+
+    def __init__(self, urls: dict[str, str | None]):
+        self.urls = urls
+        self.searched: list[str] = []
+
+    async def __call__(self, artist_name: str) -> str | None:
+        self.searched.append(artist_name)
+        if artist_name not in self.urls:
+            raise UnexpectedModelBehavior("search failed")
+        return self.urls[artist_name]
+
+
+def _add_artists(async_db, runner, names: list[str]):
+    for name in names:
+        runner.run(get_or_create_artist(async_db, ArtistCreate(name=name)))
+
+
+def _resolutions(async_db, runner) -> dict[str, ArtistUrlResolution]:
+    rows = runner.run(
+        run_sync(
+            async_db,
+            lambda db: db.execute(
+                select(Artist.name, ArtistUrlResolution).join(
+                    ArtistUrlResolution, ArtistUrlResolution.artist_id == Artist.id
+                )
+            ).all(),
+        )
+    )
+    return {name: resolution for name, resolution in rows}
+
+
+def _make_due(async_db, runner):
+    runner.run(
+        run_sync(
+            async_db,
+            lambda db: db.execute(
+                update(ArtistUrlResolution).values(
+                    next_check_at=datetime.now() - timedelta(seconds=1)
+                )
+            ),
+        )
+    )
+
+
+def test_recheck_delay_doubles_up_to_a_maximum(monkeypatch):
+    monkeypatch.setattr(url_resolution_module, "URL_RECHECK_BASE_SECONDS", 3600)
+    monkeypatch.setattr(url_resolution_module, "URL_RECHECK_MAX_SECONDS", 4 * 3600)
+
+    delays = [recheck_delay(misses) for misses in range(1, 5)]
+    assert [delay.total_seconds() / 3600 for delay in delays] == [1, 2, 4, 4]
+
+
+def test_urls_are_searched_once(async_db, runner):
+    names = [f"Artist {i}" for i in range(10)]
+    _add_artists(async_db, runner, names)
+    search = FakeSearch({name: f"https://{i}.example" for i, name in enumerate(names)})
+
+    assert runner.run(resolve_artist_urls(async_db, "website", search)) == 10
+    assert sorted(search.searched) == names
+
+    # Steady state: no search at all.
+    search.searched.clear()
+    assert runner.run(resolve_artist_urls(async_db, "website", search)) == 0
+    assert (
+        runner.run(get_artist_url(async_db, "website", "Artist 3", search))
+        == "https://3.example"
+    )
+    assert search.searched == []
+
+
+def test_searches_are_bounded(async_db, runner):
+    names = [f"Artist {i}" for i in range(10)]
+    _add_artists(async_db, runner, names)
+    running = max_running = 0
+
+    async def find_url(artist_name: str) -> str | None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return None
+
+    runner.run(resolve_artist_urls(async_db, "songkick", find_url, concurrency=3))
+
+    assert max_running == 3
+
+
+def test_misses_are_rechecked_less_and_less_often(async_db, runner):
+    _add_artists(async_db, runner, ["Unknown", "Flaky"])
+    search = FakeSearch({"Unknown": None})
+
+    runner.run(resolve_artist_urls(async_db, "website", search))
+    resolutions = _resolutions(async_db, runner)
+    assert resolutions["Unknown"].status == "not_found"
+    assert resolutions["Flaky"].status == "error"
+    first_delay = (
+        resolutions["Unknown"].next_check_at - resolutions["Unknown"].checked_at
+    )
+
+    # Not due yet: the misses are cached.
+    search.searched.clear()
+    assert runner.run(resolve_artist_urls(async_db, "website", search)) == 0
+    with pytest.raises(ArtistUrlNotFound):
+        runner.run(get_artist_url(async_db, "website", "Unknown", search))
+    assert search.searched == []
+
+    _make_due(async_db, runner)
+    assert runner.run(resolve_artist_urls(async_db, "website", search)) == 2
+    resolutions = _resolutions(async_db, runner)
+    assert resolutions["Unknown"].misses == 2
+    second_delay = (
+        resolutions["Unknown"].next_check_at - resolutions["Unknown"].checked_at
+    )
+    assert second_delay.total_seconds() == pytest.approx(
+        2 * first_delay.total_seconds(), rel=0.01
+    )
+
+
+def test_url_found_on_a_recheck_is_kept(async_db, runner):
+    _add_artists(async_db, runner, ["Artist"])
+    runner.run(resolve_artist_urls(async_db, "songkick", FakeSearch({"Artist": None})))
+    _make_due(async_db, runner)
+
+    url = "https://www.songkick.com/artists/1-artist/calendar"
+    assert (
+        runner.run(
+            get_artist_url(async_db, "songkick", "Artist", FakeSearch({"Artist": url}))
+        )
+        == url
+    )
+
+    artist = runner.run(get_or_create_artist(async_db, ArtistCreate(name="Artist")))
+    assert artist.songkick_url == url
+    assert _resolutions(async_db, runner)["Artist"].misses == 0
+
+
+def test_known_urls_are_not_searched(async_db, runner):
+    runner.run(
+        get_or_create_artist(
+            async_db, ArtistCreate(name="Artist", website_base_url="https://a.example")
+        )
+    )
+    search = FakeSearch({})
+
+    assert runner.run(resolve_artist_urls(async_db, "website", search)) == 0
+    assert search.searched == []